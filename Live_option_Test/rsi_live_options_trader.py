@@ -52,6 +52,7 @@ FIRST_TARGET_MULT = 2.0     # First target = 2x risk
 TRAIL_LOCK_PCT = 0.60       # Lock 60% of profit when target hit
 
 # Options Configuration
+UNDERLYING_SYMBOL = "BTCUSD"  # Position book reports the underlying direction
 EXPIRY_DAYS_AHEAD = 2       # Expiry X days from today
 ORDER_SIZE = 10              # Contracts per order
 
@@ -69,6 +70,13 @@ import sys
 parent_dir = os.path.dirname(SCRIPT_DIR)
 sys.path.insert(0, parent_dir)
 from utils.trade_storage import TradeStorage
+from utils.indicators import rsi
+from utils.exit_policies import ExitEngine, RLadder, StopLoss
+from utils.position_book import get_book
+
+# Stop check on the BTC price, then the R-multiple target ladder
+exit_engine = ExitEngine(StopLoss("TRAIL_SL_{max_level:g}X", fill="close"),
+                         RLadder(FIRST_TARGET_MULT, TRAIL_LOCK_PCT))
 
 # Initialize storage handler (JSON + MongoDB if configured)
 storage = TradeStorage(
@@ -100,6 +108,7 @@ def log_to_ui(message, level="info"):
 # CURRENT STATE
 # =============================================================================
 current_position = None
+exit_state = None  # exit_policies.OpenPosition of current_position
 candles = []
 prev_rsi = None
 
@@ -289,33 +298,11 @@ RSI_SMOOTHING_LENGTH = 14   # Smoothing length for RSI line
 rsi_history = []
 
 def calculate_rsi(closes, period=14):
-    """Calculate RSI using Wilder's smoothing method"""
+    """Calculate RSI using Wilder's smoothing method (shared indicator library)"""
     if len(closes) < period + 1:
         return None
     
-    closes = np.array(closes)
-    deltas = np.diff(closes)
-    
-    gains = np.where(deltas > 0, deltas, 0)
-    losses = np.where(deltas < 0, -deltas, 0)
-    
-    # Wilder's smoothing for average gain/loss
-    avg_gain = np.zeros_like(closes[1:])
-    avg_loss = np.zeros_like(closes[1:])
-    
-    # First average
-    avg_gain[period-1] = np.mean(gains[:period])
-    avg_loss[period-1] = np.mean(losses[:period])
-    
-    # Subsequent averages using Wilder's smoothing
-    for i in range(period, len(gains)):
-        avg_gain[i] = (avg_gain[i-1] * (period-1) + gains[i]) / period
-        avg_loss[i] = (avg_loss[i-1] * (period-1) + losses[i]) / period
-    
-    rs = avg_gain / (avg_loss + 1e-10)  # Avoid division by zero
-    rsi = 100 - (100 / (1 + rs))
-    
-    return rsi[-1]
+    return rsi(closes, period)[-1]
 
 
 def get_current_rsi():
@@ -464,7 +451,7 @@ def place_option_order(product_id, symbol, side, size):
 
 def execute_signal(signal):
     """Execute trade based on signal"""
-    global current_position
+    global current_position, exit_state
     
     option_type = signal['option']  # CALL or PUT
     
@@ -493,11 +480,8 @@ def execute_signal(signal):
         # Calculate risk and targets
         entry_price = signal['price']
         stop_loss = signal['stop_loss']
-        
-        if signal['type'] == 'LONG':
-            risk = entry_price - stop_loss
-        else:
-            risk = stop_loss - entry_price
+        exit_state = exit_engine.open(signal['type'], entry_price, stop_loss)
+        risk = exit_state.risk
         
         current_position = {
             'type': signal['type'],
@@ -511,17 +495,18 @@ def execute_signal(signal):
             'entry_rsi': signal['rsi'],
             'order_id': order.get('id'),
             'entry_time': datetime.now().isoformat(),
-            'target_level': 2,
-            'max_target': 0
+            'target_level': exit_state.level,
+            'max_target': exit_state.max_level
         }
         
         save_trade(current_position, 'OPEN')
+        get_book().open(STRATEGY_NAME, UNDERLYING_SYMBOL, signal['type'], entry_price, stop_loss=stop_loss)
         
         print(f"✅ Position opened!")
         print(f"   Entry: ${entry_price:,.2f}")
         print(f"   Stop Loss: ${stop_loss:,.2f}")
         print(f"   Risk: ${risk:,.2f}")
-        print(f"   Target (2x): ${entry_price + (2*risk if signal['type']=='LONG' else -2*risk):,.2f}")
+        print(f"   Target ({FIRST_TARGET_MULT:g}x): ${entry_price + exit_state.direction * FIRST_TARGET_MULT * risk:,.2f}")
         
         return True
     
@@ -538,54 +523,26 @@ def check_exit():
     current_price = get_btc_price()
     if current_price <= 0:
         return
+    get_book().mark(UNDERLYING_SYMBOL, current_price)
     
-    entry_price = current_position['entry_price']
-    stop_loss = current_position['stop_loss']
-    risk = current_position['risk']
-    target_level = current_position['target_level']
-    
-    if current_position['type'] == 'LONG':
-        # Check stop loss
-        if current_price <= stop_loss:
-            close_position(current_price, f'TRAIL_SL_{current_position["max_target"]}X')
-            return
-        
-        # Check target
-        target_price = entry_price + (target_level * risk)
-        if current_price >= target_price:
-            # Update trailing stop
-            profit_at_level = target_price - entry_price
-            new_sl = entry_price + (TRAIL_LOCK_PCT * profit_at_level)
-            
-            current_position['stop_loss'] = new_sl
-            current_position['max_target'] = target_level
-            current_position['target_level'] = target_level + 1
-            
-            print(f"🎯 {target_level}X HIT! Trail SL → ${new_sl:,.2f}, aiming for {target_level+1}X")
+    result = exit_engine.update(exit_state, current_price, on_stop=trail_stop_moved)
+    if result:
+        close_position(*result)
+
+
+def trail_stop_moved(policy, old_stop, pos):
+    """A ladder level was reached: the stop now locks part of its profit"""
+    current_position['stop_loss'] = pos.stop
+    current_position['max_target'] = pos.max_level
+    current_position['target_level'] = pos.level
+    get_book().move_stop(STRATEGY_NAME, pos.stop)
     
-    else:  # SHORT
-        # Check stop loss
-        if current_price >= stop_loss:
-            close_position(current_price, f'TRAIL_SL_{current_position["max_target"]}X')
-            return
-        
-        # Check target
-        target_price = entry_price - (target_level * risk)
-        if current_price <= target_price:
-            # Update trailing stop
-            profit_at_level = entry_price - target_price
-            new_sl = entry_price - (TRAIL_LOCK_PCT * profit_at_level)
-            
-            current_position['stop_loss'] = new_sl
-            current_position['max_target'] = target_level
-            current_position['target_level'] = target_level + 1
-            
-            print(f"🎯 {target_level}X HIT! Trail SL → ${new_sl:,.2f}, aiming for {target_level+1}X")
+    print(f"🎯 {pos.max_level:g}X HIT! Trail SL → ${pos.stop:,.2f}, aiming for {pos.level:g}X")
 
 
 def close_position(exit_price, reason):
     """Close current position"""
-    global current_position
+    global current_position, exit_state
     
     if current_position is None:
         return
@@ -609,7 +566,7 @@ def close_position(exit_price, reason):
     print(f"   Entry: ${entry_price:,.2f} → Exit: ${exit_price:,.2f}")
     print(f"   P&L: ${pnl:+,.2f} ({pnl_pct:+.2f}%)")
     print(f"   R-Multiple: {r_multiple:+.1f}R")
-    print(f"   Max Target: {current_position['max_target']}X")
+    print(f"   Max Target: {current_position['max_target']:g}X")
     print(f"{'='*60}")
     
     # Save closed trade
@@ -622,8 +579,10 @@ def close_position(exit_price, reason):
     current_position['is_win'] = is_win
     
     save_trade(current_position, 'CLOSED')
+    get_book().close(STRATEGY_NAME, exit_price)
     
     current_position = None
+    exit_state = None
 
 
 def save_trade(trade, status):
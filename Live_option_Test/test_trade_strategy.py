@@ -77,6 +77,7 @@ storage = TradeStorage(
 # =============================================================================
 current_price = 0.0
 trade_count = 0
+next_trade_id = 1        # Loaded from storage once when trading starts, then counted here
 current_position = None  # None, "LONG", or "SHORT"
 entry_price = 0
 entry_time = None
@@ -329,14 +330,8 @@ def close_position():
 
 
 def load_trades():
-    """Load existing trades from JSON"""
-    if os.path.exists(TRADES_FILE):
-        try:
-            with open(TRADES_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+    """Load existing trades (MongoDB, SQLite or the local trade log)"""
+    return storage.load_trades()
 
 
 def save_trade(trade):
@@ -347,11 +342,11 @@ def save_trade(trade):
 
 
 def get_next_trade_id():
-    """Get next trade ID"""
-    trades = load_trades()
-    if trades:
-        return max(t.get('trade_id', 0) for t in trades) + 1
-    return 1
+    """Take the next trade ID (counted in memory, no storage read per trade)"""
+    global next_trade_id
+    trade_id = next_trade_id
+    next_trade_id += 1
+    return trade_id
 
 
 def take_trade():
@@ -366,7 +361,6 @@ def take_trade():
         return
     
     trade_count += 1
-    trade_id = get_next_trade_id()
     current_time = dt.datetime.now()
     
     # Alternate between LONG and SHORT
@@ -402,7 +396,7 @@ def take_trade():
             
             # Save closed trade
             trade = {
-                'trade_id': trade_id - 1,
+                'trade_id': get_next_trade_id(),
                 'direction': current_position,
                 'entry_time': entry_time.strftime('%Y-%m-%d %H:%M:%S'),
                 'exit_time': current_time.strftime('%Y-%m-%d %H:%M:%S'),
@@ -472,6 +466,8 @@ def take_trade():
 
 def trade_timer():
     """Timer thread that takes trades every 30 seconds"""
+    global next_trade_id
+    
     # Wait for price
     while current_price <= 0:
         time.sleep(1)
@@ -484,6 +480,9 @@ def trade_timer():
     # Check balance
     balance = get_wallet_balance()
     
+    # Continue the trade IDs of the stored history
+    next_trade_id = storage.get_next_trade_id()
+    
     print(f"🚀 Starting trade timer - every {TRADE_INTERVAL_SECONDS} seconds\n")
     
     while True:
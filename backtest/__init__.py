@@ -0,0 +1 @@
+# Offline backtests over downloaded candle data (see backtest/trendline.py)
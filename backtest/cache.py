@@ -0,0 +1,234 @@
+"""
+Content-addressed on-disk cache of backtest results
+
+A result is stored under the hash of everything that determines it: the
+dataset (a fingerprint of the candle arrays, so the same data loaded from a
+CSV, resampled or sliced keys the same), the parameters and the version of
+the strategy code (a hash of the source files of the modules that compute
+it). Editing a strategy or a kernel changes the version, so stale results
+are never served, only left to age out.
+
+    cache = ResultCache()
+    table = sweep(bars, grid, cache=cache)    # Second run: read back, no backtests
+
+Each entry is one pickle file named by its key, so a lookup is a single
+open(); the in-memory index (key -> size, in last-use order) only drives
+LRU eviction once the files exceed max_bytes. File mtimes record use across
+processes: the index is rebuilt from them when a cache is opened.
+
+Usage: python -m backtest.cache [directory] [clear]
+"""
+import hashlib
+import importlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backtest.data import Bars
+
+DEFAULT_CACHE_DIR = os.environ.get('BACKTEST_CACHE_DIR', '.backtest_cache')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+BAR_FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+# Modules whose source determines trendline backtest results
+TRENDLINE_MODULES = ('backtest.trendline', 'backtest.sweep', 'btc_trendline_strategy.trendline_strategy',
+                     'utils.exit_policies', 'utils.indicators', 'utils.kernels', 'utils.trendline')
+
+_versions = {}
+
+
+def dataset_fingerprint(bars: Bars) -> str:
+    """Hash of the candle arrays and timeframe"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{bars.timeframe}:{len(bars)}".encode())
+    for field in BAR_FIELDS:
+        digest.update(np.ascontiguousarray(getattr(bars, field), dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def _source_files(module) -> List[str]:
+    """The module's file, or every .py file of a package"""
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return []
+    if os.path.basename(path) != '__init__.py':
+        return [path]
+    root = os.path.dirname(path)
+    return sorted(os.path.join(d, f) for d, _, files in os.walk(root) for f in files if f.endswith('.py'))
+
+
+def code_version(*modules: str) -> str:
+    """Hash of the source of the named modules (packages: all their files), memoized per process"""
+    names = tuple(sorted(modules))
+    if names not in _versions:
+        digest = hashlib.blake2b(digest_size=16)
+        for name in names:
+            module = importlib.import_module(name)
+            for path in _source_files(module):
+                digest.update(f"{name}:{os.path.basename(path)}".encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+        _versions[names] = digest.hexdigest()
+    return _versions[names]
+
+
+def result_key(dataset: str, params, version: str) -> str:
+    """Cache key of one result: dataset fingerprint + parameters (JSON-able) + code version"""
+    blob = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.blake2b(f"{dataset}|{version}|{blob}".encode(), digest_size=20).hexdigest()
+
+
+class ResultCache:
+    """Pickled results in `directory`, evicted least recently used first beyond max_bytes"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._index = OrderedDict()   # key -> bytes, least recently used first
+        self._bytes = 0
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.pkl')
+
+    def _load_index(self):
+        entries = []
+        for sub in os.listdir(self.directory):
+            folder = os.path.join(self.directory, sub)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                if name.endswith('.pkl'):
+                    st = os.stat(os.path.join(folder, name))
+                    entries.append((st.st_mtime_ns, name[:-4], st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _forget(self, key: str):
+        self._bytes -= self._index.pop(key, 0)
+
+    def get(self, key: str, default=None):
+        """Cached value of `key` (and mark it used), or `default`"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self._forget(key)
+            self.misses += 1
+            return default
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Truncated or from an incompatible version: drop it
+            self._remove(key)
+            self.misses += 1
+            return default
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        if key in self._index:
+            self._index.move_to_end(key)
+        else:
+            self._index[key] = os.path.getsize(path)
+            self._bytes += self._index[key]
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        """Store `value` under `key` (atomic replace), then evict down to max_bytes"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+        self._forget(key)
+        self._index[key] = os.path.getsize(path)
+        self._bytes += self._index[key]
+        self._evict()
+
+    def _remove(self, key: str):
+        self._forget(key)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            self._remove(next(iter(self._index)))
+
+    def get_or_compute(self, key: str, compute: Callable[[], object]):
+        """Cached value of `key`, computing and storing it on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def cells(self, keys: Sequence[str], compute: Callable[[List[int]], list]) -> list:
+        """
+        One result per key: cached ones read back, the rest computed together
+
+        compute(indices) gets the positions of the missing keys and returns
+        their results in that order, so a partly cached sweep only runs the
+        new combinations.
+        """
+        missing = object()
+        results = [self.get(key, missing) for key in keys]
+        todo = [i for i, value in enumerate(results) if value is missing]
+        if todo:
+            for i, value in zip(todo, compute(todo)):
+                results[i] = value
+                self.put(keys[i], value)
+        return results
+
+    def clear(self):
+        for key in list(self._index):
+            self._remove(key)
+
+    def stats(self) -> Dict:
+        return {'entries': len(self._index), 'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses}
+
+
+def open_cache(cache) -> Optional[ResultCache]:
+    """`cache` argument of the backtest functions: a ResultCache, a directory, True (default) or None"""
+    if isinstance(cache, ResultCache):
+        return cache
+    if cache is None or cache is False:
+        return None
+    return ResultCache() if cache is True else ResultCache(cache)
+
+
+if __name__ == '__main__':
+    cache = ResultCache(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CACHE_DIR)
+    if len(sys.argv) > 2 and sys.argv[2] == 'clear':
+        cache.clear()
+        print(f"🧹 Cleared {cache.directory}")
+    s = cache.stats()
+    print(f"🗄️  {cache.directory}: {s['entries']} results, {s['bytes'] / 1e6:.1f} / {s['max_bytes'] / 1e6:.0f} MB")
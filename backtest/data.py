@@ -0,0 +1,156 @@
+"""
+Candle and tick data for backtests
+
+Loads the CSVs written by crypto_data_downloader (timestamp, datetime_utc,
+datetime_ist, open, high, low, close, volume) into NumPy arrays once, so
+backtests never touch a DataFrame per bar.
+
+Tick files hold the exchange's all_trades fields: timestamp (microseconds),
+price, size and buyer_role ("taker" = aggressive buy) or a 0/1 is_buy
+column. They are CSV, or binary .npz (save_ticks(), much faster to load).
+"""
+import datetime as dt
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+CSV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class Bars:
+    """OHLCV candles as aligned arrays (time = bar open, epoch seconds)"""
+
+    def __init__(self, time, open_, high, low, close, volume, timeframe: Optional[int] = None):
+        self.time = np.asarray(time, dtype=np.int64)
+        self.open = np.asarray(open_, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.timeframe = timeframe or infer_timeframe(self.time)
+
+    def __len__(self):
+        return len(self.time)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Bars(self.time[index], self.open[index], self.high[index], self.low[index],
+                        self.close[index], self.volume[index], self.timeframe)
+        raise TypeError("Bars only support slicing")
+
+    @property
+    def close_time(self) -> np.ndarray:
+        """Epoch seconds at the end of every bar"""
+        return self.time + self.timeframe * 60
+
+    def candle(self, i: int) -> dict:
+        """Bar i as the candle dict the live strategies use (timestamp = local bar open)"""
+        return {
+            'timestamp': dt.datetime.fromtimestamp(int(self.time[i])),
+            'open': float(self.open[i]),
+            'high': float(self.high[i]),
+            'low': float(self.low[i]),
+            'close': float(self.close[i]),
+            'volume': float(self.volume[i])
+        }
+
+
+def infer_timeframe(time) -> int:
+    """Bar interval in minutes from the most common timestamp step (1 if unknown)"""
+    steps = np.diff(np.asarray(time, dtype=np.int64))
+    steps = steps[steps > 0]
+    if len(steps) == 0:
+        return 1
+    values, counts = np.unique(steps, return_counts=True)
+    return max(1, int(values[np.argmax(counts)] // 60))
+
+
+def resample(bars: Bars, minutes: int) -> Bars:
+    """
+    Aggregate bars into `minutes`-minute bars aligned to the epoch (UTC)
+
+    A trailing bucket the data does not cover to its end is dropped, since
+    that bar has not closed yet.
+    """
+    if minutes % bars.timeframe:
+        raise ValueError(f"Cannot build {minutes}-min bars from {bars.timeframe}-min bars")
+    if minutes == bars.timeframe or len(bars) == 0:
+        return bars
+
+    seconds = minutes * 60
+    bucket = bars.time // seconds
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(bars)]
+    if bars.close_time[-1] < (bucket[-1] + 1) * seconds:
+        starts, ends = starts[:-1], ends[:-1]
+    if len(starts) == 0:
+        return Bars([], [], [], [], [], [], minutes)
+
+    used = slice(0, ends[-1])
+    return Bars(bucket[starts] * seconds,
+                bars.open[starts],
+                np.maximum.reduceat(bars.high[used], starts),
+                np.minimum.reduceat(bars.low[used], starts),
+                bars.close[ends - 1],
+                np.add.reduceat(bars.volume[used], starts),
+                minutes)
+
+
+def load_csv(path: str, timeframe: Optional[int] = None) -> Bars:
+    """
+    Read a downloader CSV
+
+    Rows are sorted by timestamp and duplicate timestamps (overlapping
+    update_btc_data.py appends) keep their last row.
+    """
+    df = pd.read_csv(path, usecols=CSV_COLUMNS)
+    df = df.drop_duplicates('timestamp', keep='last').sort_values('timestamp')
+    return Bars(df['timestamp'].to_numpy(), df['open'].to_numpy(), df['high'].to_numpy(),
+                df['low'].to_numpy(), df['close'].to_numpy(), df['volume'].to_numpy(), timeframe)
+
+
+class Ticks:
+    """Trades in arrival order as aligned arrays (timestamp in microseconds)"""
+
+    def __init__(self, timestamp, price, size, is_buy):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.size = np.asarray(size, dtype=np.float64)
+        self.is_buy = np.asarray(is_buy, dtype=bool)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Ticks(self.timestamp[index], self.price[index], self.size[index], self.is_buy[index])
+        raise TypeError("Ticks only support slicing")
+
+    def trade(self, i: int) -> dict:
+        """Tick i as the all_trades message the live strategies receive"""
+        return {
+            'timestamp': int(self.timestamp[i]),
+            'price': float(self.price[i]),
+            'size': float(self.size[i]),
+            'buyer_role': 'taker' if self.is_buy[i] else 'maker'
+        }
+
+
+def load_ticks(path: str) -> Ticks:
+    """Read a tick CSV or .npz file, keeping the file's (arrival) order"""
+    if os.path.splitext(path)[1] == '.npz':
+        with np.load(path) as data:
+            return Ticks(data['timestamp'], data['price'], data['size'], data['is_buy'])
+
+    columns = pd.read_csv(path, nrows=0).columns
+    side = 'is_buy' if 'is_buy' in columns else 'buyer_role'
+    df = pd.read_csv(path, usecols=['timestamp', 'price', 'size', side])
+    is_buy = df[side].to_numpy() == 'taker' if side == 'buyer_role' else df[side].to_numpy()
+    return Ticks(df['timestamp'].to_numpy(), df['price'].to_numpy(), df['size'].to_numpy(), is_buy)
+
+
+def save_ticks(path: str, ticks: Ticks):
+    """Write ticks as binary .npz"""
+    np.savez(path, timestamp=ticks.timestamp, price=ticks.price, size=ticks.size, is_buy=ticks.is_buy)
@@ -0,0 +1,336 @@
+"""
+Options backtests of the RSI trader with Black-Scholes premiums
+
+rsi_live_options_trader buys the ATM call/put expiring EXPIRY_DAYS_AHEAD
+days out on an RSI cross, but logs P&L on the BTC price. Without
+historical option quotes this backtest prices that option instead:
+
+  - RSI signals on 45-minute bars resampled from the candle CSV (raw Wilder
+    RSI smoothed by an SMA, as get_current_rsi() does)
+  - strike = nearest STRIKE_INTERVAL to the entry price, expiry at
+    EXPIRY_HOUR_UTC on the day EXPIRY_DAYS_AHEAD after entry
+  - premium along the trade from vectorized Black-Scholes over every base
+    bar, with implied vol from an IVSurface, a flat number, or a realized
+    volatility proxy
+  - the FIRST_TARGET_MULT / TRAIL_LOCK_PCT ladder run by the live
+    ExitEngine on the premium (exit_basis="premium": 1R = entry premium
+    minus the premium at the signal candle's stop), or on the BTC price
+    exactly like the live trader (exit_basis="underlying"); an option
+    still held at expiry settles at intrinsic value
+
+Usage: python -m backtest.options <csv> [premium|underlying] [rv|<flat iv, e.g. 0.55>] [out.json]
+"""
+import datetime as dt
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    from scipy.special import ndtr
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+from backtest.data import Bars, load_csv, resample
+from utils.exit_policies import ExitEngine, RLadder, StopLoss
+from utils.indicators import rsi, sma
+
+SIGNAL_MINUTES = 45          # rsi_live_options_trader TIMEFRAME
+STRIKE_INTERVAL = 500        # BTC option strike spacing ($)
+EXPIRY_HOUR_UTC = 12         # Daily expiries settle at 12:00 UTC (17:30 IST)
+CONTRACT_BTC = 0.001         # Underlying per option contract
+YEAR_SECONDS = 365 * 24 * 3600
+EXIT_BASES = ("premium", "underlying")
+
+
+# =============================================================================
+# BLACK-SCHOLES
+# =============================================================================
+
+def _norm_cdf(x):
+    """Standard normal CDF (scipy when installed, else Abramowitz-Stegun 7.1.26, |error| < 1.5e-7)"""
+    if HAS_SCIPY:
+        return ndtr(x)
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def black_scholes(spot, strike, years, vol, is_call, rate: float = 0.0) -> np.ndarray:
+    """
+    European option prices for arrays of inputs (broadcast together)
+
+    At or after expiry (years <= 0) the price is the intrinsic value.
+    """
+    spot, strike, years, vol = (np.asarray(a, dtype=float) for a in (spot, strike, years, vol))
+    is_call = np.asarray(is_call, dtype=bool)
+    live = years > 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(live, years, 1.0)
+        sd = vol * np.sqrt(t)
+        d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * t) / sd
+        d2 = d1 - sd
+        discount = np.exp(-rate * t)
+        call = spot * _norm_cdf(d1) - strike * discount * _norm_cdf(d2)
+        put = strike * discount * _norm_cdf(-d2) - spot * _norm_cdf(-d1)
+
+    intrinsic = np.where(is_call, np.maximum(spot - strike, 0.0), np.maximum(strike - spot, 0.0))
+    return np.where(live, np.where(is_call, call, put), intrinsic)
+
+
+class IVSurface:
+    """Implied vol by days to expiry (linear term structure) with a linear skew in log-moneyness"""
+
+    def __init__(self, term: Dict[float, float], skew: float = 0.0):
+        """
+        Args:
+            term: {days to expiry: annualized vol}, e.g. {1: 0.55, 7: 0.50, 30: 0.48}
+            skew: Vol change per unit of ln(strike / spot)
+        """
+        days = sorted(term)
+        self.days = np.array(days, dtype=float)
+        self.vols = np.array([term[d] for d in days], dtype=float)
+        self.skew = skew
+
+    def vol(self, days, spot, strike) -> np.ndarray:
+        return np.interp(days, self.days, self.vols) + self.skew * np.log(np.asarray(strike) / np.asarray(spot))
+
+
+def realized_vol(bars: Bars, window_days: float = 7.0) -> np.ndarray:
+    """Annualized close-to-close volatility over the trailing window (NaN until it is full)"""
+    window = max(2, int(window_days * 1440 / bars.timeframe))
+    returns = np.r_[np.nan, np.diff(np.log(bars.close))]
+    returns[0] = 0.0
+    s1 = np.cumsum(returns)
+    s2 = np.cumsum(returns * returns)
+    out = np.full(len(bars), np.nan)
+    if len(bars) > window:
+        n = window
+        sum1 = s1[window:] - s1[:-window]
+        sum2 = s2[window:] - s2[:-window]
+        var = np.maximum(sum2 / n - (sum1 / n) ** 2, 0.0) * n / (n - 1)
+        out[window:] = np.sqrt(var * YEAR_SECONDS / (bars.timeframe * 60))
+    return out
+
+
+# =============================================================================
+# SIGNALS AND SIMULATION
+# =============================================================================
+
+def trader_params() -> Dict:
+    """Strategy constants of rsi_live_options_trader"""
+    from Live_option_Test import rsi_live_options_trader as live
+    return {
+        'rsi_period': live.RSI_PERIOD,
+        'rsi_oversold': live.RSI_OVERSOLD,
+        'rsi_overbought': live.RSI_OVERBOUGHT,
+        'rsi_smoothing_length': live.RSI_SMOOTHING_LENGTH if live.RSI_SMOOTHING_TYPE == "SMA" else 0,
+        'first_target_mult': live.FIRST_TARGET_MULT,
+        'trail_lock_pct': live.TRAIL_LOCK_PCT,
+        'expiry_days_ahead': live.EXPIRY_DAYS_AHEAD,
+        'order_size': live.ORDER_SIZE,
+    }
+
+
+def rsi_signals(signal_bars: Bars, params: Dict) -> np.ndarray:
+    """+1 (buy CALL) / -1 (buy PUT) / 0 per bar from smoothed-RSI crosses"""
+    raw = rsi(signal_bars.close, params['rsi_period'])
+    value = raw
+    if params['rsi_smoothing_length']:
+        smoothed = sma(raw, params['rsi_smoothing_length'])
+        value = np.where(np.isnan(smoothed), raw, smoothed)
+
+    prev = np.r_[np.nan, value[:-1]]
+    with np.errstate(invalid='ignore'):
+        calls = (prev <= params['rsi_oversold']) & (value > params['rsi_oversold'])
+        puts = (prev >= params['rsi_overbought']) & (value < params['rsi_overbought'])
+    return np.where(calls, 1, np.where(puts, -1, 0))
+
+
+def expiry_time(entry_time: float, days_ahead: int) -> float:
+    """Epoch seconds of the expiry EXPIRY_DAYS_AHEAD calendar days after entry"""
+    day = dt.datetime.fromtimestamp(entry_time, dt.timezone.utc).date() + dt.timedelta(days=days_ahead)
+    return dt.datetime(day.year, day.month, day.day, EXPIRY_HOUR_UTC, tzinfo=dt.timezone.utc).timestamp()
+
+
+def _vol_at(iv, days, spot, strike, rv):
+    if isinstance(iv, IVSurface):
+        return iv.vol(days, spot, strike)
+    if iv is None:
+        return rv
+    return np.full(np.shape(spot), float(iv))
+
+
+def run_backtest(bars: Bars, iv: Union[None, float, IVSurface] = None, exit_basis: str = "premium",
+                 params: Optional[Dict] = None, rv_window_days: float = 7.0, rate: float = 0.0) -> List[Dict]:
+    """
+    Backtest the RSI options trader
+
+    Args:
+        bars: Candles (any timeframe dividing 45 minutes; exits are checked on their closes)
+        iv: IVSurface, a flat annualized vol, or None for realized_vol(rv_window_days)
+        exit_basis: Ladder on the option "premium" or on the BTC price ("underlying", as live)
+        params: Overrides for trader_params()
+        rate: Risk-free rate for Black-Scholes
+
+    Returns:
+        Closed trades (live trade fields plus strike, expiry, premiums, IV and
+        option P&L for order_size contracts in 'pnl'; BTC P&L in 'underlying_pnl')
+    """
+    if exit_basis not in EXIT_BASES:
+        raise ValueError(f"Unknown exit basis: {exit_basis}")
+    base = trader_params()
+    unknown = set(params or {}) - set(base)
+    if unknown:
+        raise ValueError(f"Unknown parameter(s): {', '.join(sorted(unknown))}")
+    p = {**base, **(params or {})}
+
+    signal_bars = resample(bars, SIGNAL_MINUTES)
+    signal = rsi_signals(signal_bars, p)
+    rv = realized_vol(bars, rv_window_days) if iv is None else None
+    close_time = bars.close_time.astype(float)
+    engine = ExitEngine(StopLoss("TRAIL_SL_{max_level:g}X", fill="close"),
+                        RLadder(p['first_target_mult'], p['trail_lock_pct']))
+
+    trades = []
+    free_from = 0.0   # One position at a time
+    for i in np.flatnonzero(signal):
+        entry_time = float(signal_bars.close_time[i])
+        if entry_time < free_from:
+            continue
+        start = int(np.searchsorted(bars.time, entry_time))   # First base bar after the signal
+        entry_bar = start - 1
+        if start >= len(bars) or (rv is not None and np.isnan(rv[entry_bar])):
+            continue
+
+        direction = int(signal[i])
+        is_call = direction > 0
+        spot = signal_bars.close[i]
+        underlying_stop = signal_bars.low[i] if is_call else signal_bars.high[i]
+        strike = round(spot / STRIKE_INTERVAL) * STRIKE_INTERVAL
+        expiry = expiry_time(entry_time, p['expiry_days_ahead'])
+        end = int(np.searchsorted(close_time, expiry, side='right'))    # Bars closing by expiry
+        if end <= start:
+            continue
+
+        # Premium of this option at entry and at every base bar close until expiry
+        path = slice(start, end)
+        spots = np.r_[spot, bars.close[path]]
+        years = (expiry - np.r_[entry_time, close_time[path]]) / YEAR_SECONDS
+        vol_path = rv[entry_bar:end] if rv is not None else None
+        vols = _vol_at(iv, years * 365, spots, strike, vol_path)
+        premiums = black_scholes(spots, strike, years, vols, is_call, rate)
+        entry_premium = premiums[0]
+        stop_premium = black_scholes(underlying_stop, strike, years[0], vols[0], is_call, rate)
+
+        if exit_basis == "premium":
+            pos = engine.open(1, entry_premium, stop_premium)
+            series = premiums[1:]
+        else:
+            pos = engine.open(direction, spot, underlying_stop)
+            series = spots[1:]
+
+        exit_k, reason = None, "EXPIRY"
+        if pos.risk > 0:
+            for k in range(len(series)):
+                result = engine.update(pos, series[k], now=close_time[start + k])
+                if result:
+                    exit_k, reason = k, result[1]
+                    break
+        exit_time = None
+        if exit_k is None:
+            if end == len(bars) and close_time[end - 1] < expiry:
+                break   # Data ends before expiry: still open
+            # Settles at expiry for intrinsic value, also when a data gap hides the bar closing at expiry
+            exit_k = len(series) - 1
+            premiums[-1] = black_scholes(spots[-1], strike, 0.0, vols[-1], is_call, rate)
+            exit_time = expiry
+
+        exit_premium = premiums[1 + exit_k]
+        exit_spot = spots[1 + exit_k]
+        exit_time = close_time[start + exit_k] if exit_time is None else exit_time
+        free_from = exit_time
+        trades.append(_trade_record(len(trades) + 1, direction, p, strike, expiry, entry_time, exit_time,
+                                    spot, exit_spot, underlying_stop, entry_premium, exit_premium,
+                                    vols[0], pos, exit_basis, reason))
+    return trades
+
+
+def _format_time(epoch: float) -> str:
+    return dt.datetime.fromtimestamp(epoch).isoformat()
+
+
+def _trade_record(trade_id, direction, p, strike, expiry, entry_time, exit_time, spot, exit_spot,
+                  underlying_stop, entry_premium, exit_premium, entry_iv, pos, exit_basis, reason) -> Dict:
+    option = "CALL" if direction > 0 else "PUT"
+    expiry_code = dt.datetime.fromtimestamp(expiry, dt.timezone.utc).strftime("%d%m%y")
+    contracts = p['order_size'] * CONTRACT_BTC
+
+    pnl = (exit_premium - entry_premium) * contracts
+    underlying_pnl = direction * (exit_spot - spot)
+    # R multiple in the units the ladder ran on
+    basis_pnl = exit_premium - entry_premium if exit_basis == "premium" else underlying_pnl
+    return {
+        'trade_id': trade_id,
+        'type': "LONG" if direction > 0 else "SHORT",
+        'option': option,
+        'symbol': f"{option[0]}-BTC-{strike:.0f}-{expiry_code}",
+        'strike': float(strike),
+        'expiry': _format_time(expiry),
+        'entry_price': float(spot),
+        'exit_price': float(exit_spot),
+        'initial_sl': float(underlying_stop),
+        'entry_premium': round(float(entry_premium), 2),
+        'exit_premium': round(float(exit_premium), 2),
+        'entry_iv': round(float(entry_iv), 4),
+        'entry_time': _format_time(entry_time),
+        'exit_time': _format_time(exit_time),
+        'max_target': float(pos.max_level),
+        'pnl': round(float(pnl), 2),
+        'pnl_pct': round(float((exit_premium / entry_premium - 1) * 100), 4),
+        'r_multiple': round(float(basis_pnl / pos.risk), 2) if pos.risk > 0 else 0,
+        'underlying_pnl': round(float(underlying_pnl), 2),
+        'exit_reason': reason,
+        'is_win': bool(pnl > 0),
+        'status': 'CLOSED',
+        'strategy': 'RSI Options Backtest'
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return
+
+    bars = load_csv(argv[0])
+    exit_basis = argv[1] if len(argv) > 1 else "premium"
+    iv = None if len(argv) < 3 or argv[2] == "rv" else float(argv[2])
+
+    started = time.perf_counter()
+    trades = run_backtest(bars, iv, exit_basis)
+    elapsed = time.perf_counter() - started
+
+    pnl = sum(t['pnl'] for t in trades)
+    underlying = sum(t['underlying_pnl'] for t in trades)
+    wins = sum(t['is_win'] for t in trades)
+    print(f"📊 {len(bars):,} {bars.timeframe}-min bars, ladder on {exit_basis}, "
+          f"IV {'realized' if iv is None else f'{iv:.0%}'}")
+    print(f"🧾 Trades: {len(trades)} | Win rate: {wins / len(trades) * 100 if trades else 0:.1f}% | "
+          f"Option P&L: ${pnl:+,.2f} | BTC P&L: ${underlying:+,.2f}")
+    print(f"⏱️  Backtest {elapsed:.2f}s")
+
+    if len(argv) > 3:
+        with open(argv[3], 'w') as f:
+            json.dump(trades, f, indent=2)
+        print(f"💾 Trades saved to {argv[3]}")
+
+
+if __name__ == "__main__":
+    main()
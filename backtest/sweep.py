@@ -0,0 +1,256 @@
+"""
+Parameter sweeps of the trendline backtest over all CPU cores
+
+The candle arrays are copied once into a multiprocessing.shared_memory
+block; every worker process maps that block and builds its Bars as views
+on it, so only parameter dicts and metric rows cross process boundaries.
+Combinations are sorted so the ones sharing entry signals (same
+SIGNAL_PARAMS) land in the same chunk, where the signals are computed once
+and only the exit simulation is repeated.
+
+    grid = {'lookback_swing': [3, 4, 5], 'atr_sl_mult': [0.5, 1.0],
+            'exit_policy': ['fixed', 'trailing'], 'trail_start_atr_mult': [1.0, 1.5]}
+    table = sweep(load_csv("btc_1m.csv"), grid, directions=("LONG", "SHORT"))
+
+With a cache (backtest.cache.ResultCache) every combination's row is
+stored under its own key, so re-running a sweep reads it back and a grid
+that grew only backtests the new combinations.
+
+Usage: python -m backtest.sweep <csv> [workers] [results.csv]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtest.cache import TRENDLINE_MODULES, ResultCache, code_version, dataset_fingerprint, open_cache, result_key
+from backtest.data import Bars, load_csv
+from backtest.trendline import IndicatorCache, signal_key, simulate
+from btc_trendline_strategy.trendline_strategy import CandleStrategy, DEFAULT_PARAMS, EXIT_POLICIES
+from btc_trendline_strategy.variant_batch import expand_grid
+
+# Fixed exits ignore the trailing multipliers and trailing exits ignore the target
+DEFAULT_GRIDS = [
+    {'lookback_swing': [3, 4, 5], 'atr_sl_mult': [0.5, 0.75, 1.0],
+     'exit_policy': ['fixed'], 'target_atr_mult': [2.0, 3.0, 4.0]},
+    {'lookback_swing': [3, 4, 5], 'atr_sl_mult': [0.5, 0.75, 1.0],
+     'exit_policy': ['trailing'], 'breakeven_atr_mult': [0.5, 1.0],
+     'trail_start_atr_mult': [1.0, 1.5], 'trail_distance_atr_mult': [0.5, 1.0]},
+]
+
+METRIC_COLUMNS = ['trades', 'total_pnl', 'win_rate', 'profit_factor', 'expectancy', 'max_drawdown']
+
+
+def trade_metrics(pnl) -> Dict:
+    """Summary metrics of a sequence of trade P&Ls (in trade order)"""
+    pnl = np.asarray(pnl, dtype=float)
+    if len(pnl) == 0:
+        return {'trades': 0, 'total_pnl': 0.0, 'win_rate': 0.0, 'profit_factor': 0.0,
+                'expectancy': 0.0, 'max_drawdown': 0.0}
+
+    gross_win = pnl[pnl > 0].sum()
+    gross_loss = -pnl[pnl < 0].sum()
+    equity = np.r_[0.0, np.cumsum(pnl)]
+    return {
+        'trades': len(pnl),
+        'total_pnl': float(equity[-1]),
+        'win_rate': float((pnl > 0).mean() * 100),
+        'profit_factor': float(gross_win / gross_loss) if gross_loss > 0 else float('inf'),
+        'expectancy': float(pnl.mean()),
+        'max_drawdown': float((np.maximum.accumulate(equity) - equity).max())
+    }
+
+
+def combo_params(combo: Dict, base_params: Optional[Dict] = None) -> Dict:
+    """Full strategy parameters of one sweep combination (exit_policy removed)"""
+    overrides = {k: v for k, v in combo.items() if k != 'exit_policy'}
+    return {**DEFAULT_PARAMS, **(base_params or {}), **overrides}
+
+
+def run_combos(bars: Bars, combos: List[Dict], directions=("LONG",),
+               base_params: Optional[Dict] = None) -> List[Dict]:
+    """Backtest each combination in-process, reusing indicators and signals between combinations"""
+    cache = IndicatorCache(bars)
+    rows = []
+    for combo in combos:
+        p = combo_params(combo, base_params)
+        trades = simulate(bars, *cache.signals(p, directions), combo.get('exit_policy', 'fixed'), p)
+        pnl = [pos.direction * (exit_price - pos.entry_price) for _, _, pos, exit_price, _ in trades]
+        rows.append({**combo, **trade_metrics(pnl)})
+    return rows
+
+
+# =============================================================================
+# SHARED-MEMORY WORKERS
+# =============================================================================
+
+FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+_shm = None
+_bars = None
+
+
+class SharedBars:
+    """Bars copied into one shared-memory block (rows = FIELDS), unlinked on close()"""
+
+    def __init__(self, bars: Bars):
+        self.shape = (len(FIELDS), len(bars))
+        self.timeframe = bars.timeframe
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * len(FIELDS) * len(bars)))
+        data = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        for row, field in enumerate(FIELDS):
+            data[row] = getattr(bars, field)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach(name: str, shape, timeframe: int):
+    """Worker initializer: map the shared block and wrap it as Bars (no copies of the prices)"""
+    global _shm, _bars
+    _shm = shared_memory.SharedMemory(name=name)
+    data = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _bars = Bars(*data, timeframe=timeframe)
+
+
+def _run_chunk(func, combos, args):
+    return func(_bars, combos, *args)
+
+
+def _chunks(combos: List[Dict], base_params: Dict, count: int) -> List[List[int]]:
+    """Indices of `combos` split into about `count` slices, signal-sharing combos kept together"""
+    def key(i):
+        return tuple(str(v) for v in signal_key(combo_params(combos[i], base_params)))
+
+    order = sorted(range(len(combos)), key=key)
+    size = max(1, -(-len(order) // count))
+    return [order[i:i + size] for i in range(0, len(order), size)]
+
+
+def _table(rows: List[Dict]) -> pd.DataFrame:
+    """Results table: parameter columns first, then METRIC_COLUMNS"""
+    table = pd.DataFrame(rows)
+    return table[[c for c in table.columns if c not in METRIC_COLUMNS] + METRIC_COLUMNS]
+
+
+def expand_combos(grid: Dict[str, list] = None, combos: List[Dict] = None,
+                  params: Optional[Dict] = None) -> List[Dict]:
+    """Validated combinations from `combos` + expand_grid(grid) (neither given: DEFAULT_GRIDS)"""
+    combos = list(combos or []) + (expand_grid(grid) if grid else [])
+    if not combos and grid is None:
+        combos = [c for g in DEFAULT_GRIDS for c in expand_grid(g)]
+    for combo in combos:
+        if combo.get('exit_policy', 'fixed') not in EXIT_POLICIES:
+            raise ValueError(f"Unknown exit policy: {combo['exit_policy']}")
+        CandleStrategy.check_param_names({k: v for k, v in combo.items() if k != 'exit_policy'})
+    CandleStrategy.check_param_names(params or {})
+    return combos
+
+
+def map_combos(bars: Bars, func, combos: List[Dict], args=(), base_params: Optional[Dict] = None,
+               workers: Optional[int] = None, chunks_per_worker: int = 4) -> list:
+    """
+    func(bars, chunk, *args) over chunks of `combos` in worker processes sharing `bars`
+
+    func must be a module-level function returning one result per combination
+    of its chunk. Results come back in `combos` order.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(combos) == 1:
+        return func(bars, combos, *args)
+
+    chunks = _chunks(combos, base_params or {}, workers * chunks_per_worker)
+    results = [None] * len(combos)
+    with SharedBars(bars) as shared:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"),
+                                 initializer=_attach,
+                                 initargs=(shared.name, shared.shape, shared.timeframe)) as pool:
+            futures = [(chunk, pool.submit(_run_chunk, func, [combos[i] for i in chunk], args))
+                       for chunk in chunks]
+            for chunk, future in futures:
+                for i, result in zip(chunk, future.result()):
+                    results[i] = result
+    return results
+
+
+def sweep(bars: Bars, grid: Dict[str, list] = None, combos: List[Dict] = None, directions=("LONG",),
+          params: Optional[Dict] = None, workers: Optional[int] = None,
+          chunks_per_worker: int = 4, cache=None) -> pd.DataFrame:
+    """
+    Backtest every parameter combination, in parallel
+
+    Args:
+        bars: Candles of the strategy timeframe
+        grid: {param: [values]} expanded with expand_grid() (may include exit_policy)
+        combos: Explicit list of combinations, in addition to `grid`
+            (neither given: DEFAULT_GRIDS)
+        directions: "LONG" and/or "SHORT", for every combination
+        params: Overrides for DEFAULT_PARAMS shared by all combinations
+        workers: Worker processes (default: all cores; 1 = run in this process)
+        chunks_per_worker: Work units per worker, for load balancing
+        cache: ResultCache (or directory, True for the default one) to read
+            and store the rows of individual combinations
+
+    Returns:
+        One row per combination (its parameters + METRIC_COLUMNS), in input order
+    """
+    combos = expand_combos(grid, combos, params)
+
+    def run(todo):
+        return map_combos(bars, run_combos, [combos[i] for i in todo], (directions, params), params,
+                          workers, chunks_per_worker)
+
+    cache = open_cache(cache)
+    if cache is None:
+        return _table(run(range(len(combos))))
+
+    dataset = dataset_fingerprint(bars)
+    version = code_version(*TRENDLINE_MODULES)
+    keys = [result_key(dataset, {'sweep': combo, 'directions': list(directions), 'params': params}, version)
+            for combo in combos]
+    return _table(cache.cells(keys, run))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return
+
+    bars = load_csv(argv[0])
+    workers = int(argv[1]) if len(argv) > 1 else None
+    combos = [c for g in DEFAULT_GRIDS for c in expand_grid(g)]
+
+    started = time.perf_counter()
+    cache = ResultCache()
+    table = sweep(bars, combos=combos, directions=("LONG", "SHORT"), workers=workers, cache=cache)
+    elapsed = time.perf_counter() - started
+
+    table = table.sort_values('total_pnl', ascending=False)
+    print(f"📊 {len(combos)} backtests over {len(bars):,} {bars.timeframe}-min bars "
+          f"in {elapsed:.1f}s ({workers or os.cpu_count()} workers, {cache.hits} cached)\n")
+    print(table.head(15).to_string(index=False))
+
+    if len(argv) > 2:
+        table.to_csv(argv[2], index=False)
+        print(f"\n💾 Results saved to {argv[2]}")
+
+
+if __name__ == "__main__":
+    main()
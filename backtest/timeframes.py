@@ -0,0 +1,158 @@
+"""
+Multi-timeframe trendline backtests from one 1-minute dataset
+
+The live strategies each fetch their own resolution, and the downloaders
+write 1-min (download_btc_data.py) or 5-min (update_btc_data.py) files.
+Here one fine-grained CSV is resampled (backtest.data.resample) to every
+timeframe on demand, once per timeframe, so every strategy is tested on
+exactly the same prices. It is the offline version of compare_trendline.py.
+
+Each timeframe runs the configuration of its live script
+(btc_trendline_{N}min.py, or btc_trendline_trailing_{N}min.py for
+trailing exits), or DEFAULT_PARAMS where there is none (e.g. 45 min).
+
+Usage: python -m backtest.timeframes <csv> [1,5,15,45,60] [fixed|trailing] [out.csv]
+"""
+import importlib
+import importlib.util
+import os
+import sys
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from backtest.cache import ResultCache
+from backtest.data import Bars, load_csv, resample
+from backtest.sweep import trade_metrics
+from backtest.trendline import run_backtest
+from utils.monte_carlo import monte_carlo
+
+DEFAULT_TIMEFRAMES = (1, 5, 15, 45, 60)
+
+# Live strategy scripts per exit policy ({} = candle interval in minutes)
+LIVE_MODULES = {
+    "fixed": "btc_trendline_strategy.btc_trendline_{}min",
+    "trailing": "btc_trendline_trailing.btc_trendline_trailing_{}min",
+}
+
+MC_RESAMPLES = 100_000
+
+
+class TimeframeBars:
+    """
+    Bars of any multiple of the base timeframe, resampled once each
+
+    Always from the base bars: resampling e.g. 15 from 5 gives the same
+    prices but volumes summed in another order, off in the last bit.
+    """
+
+    def __init__(self, base: Bars):
+        self.base = base
+        self._bars = {base.timeframe: base}
+
+    def __getitem__(self, minutes: int) -> Bars:
+        if minutes not in self._bars:
+            self._bars[minutes] = resample(self.base, minutes)
+        return self._bars[minutes]
+
+
+def live_config(timeframe: int, exit_policy: str = "fixed") -> Tuple[Tuple[str, ...], Dict]:
+    """(directions, params) of the live script for this timeframe and policy, or the defaults"""
+    pattern = LIVE_MODULES.get(exit_policy)
+    name = pattern.format(timeframe) if pattern else None
+    if name is None or importlib.util.find_spec(name) is None:
+        return ("LONG",), {}
+    strategy = importlib.import_module(name).strategy
+    return tuple(strategy.directions), dict(strategy.base_params)
+
+
+def compare_timeframes(bars: Bars, timeframes: Iterable[int] = DEFAULT_TIMEFRAMES, exit_policy: str = "fixed",
+                       directions=None, params: Optional[Dict] = None, cache=None,
+                       mc_resamples: int = MC_RESAMPLES) -> Dict:
+    """
+    Backtest the trendline strategy on every timeframe derived from `bars`
+
+    Args:
+        bars: Base candles (normally 1-min); every timeframe must be a multiple
+        timeframes: Bar intervals in minutes
+        exit_policy: "fixed", "trailing" or "ladder"
+        directions: Same directions for all timeframes (default: each live script's)
+        params: Overrides on top of each timeframe's live parameters
+        cache: ResultCache (or directory, True for the default one), see run_backtest()
+        mc_resamples: Monte Carlo resamples per timeframe (0 = skip)
+
+    Returns:
+        dict with 'table' (DataFrame, one row per timeframe: bars, METRIC_COLUMNS
+        and Monte Carlo columns) and 'trades' ({timeframe: trades})
+    """
+    frames = TimeframeBars(bars)
+    rows, trades = [], {}
+    for tf in timeframes:
+        tf_bars = frames[tf]
+        live_directions, live_params = live_config(tf, exit_policy)
+        trades[tf] = run_backtest(tf_bars, exit_policy, tuple(directions or live_directions),
+                                  {**live_params, **(params or {})}, cache=cache)
+
+        row = {'timeframe': tf, 'bars': len(tf_bars), **trade_metrics([t['pnl'] for t in trades[tf]])}
+        if mc_resamples and trades[tf]:
+            mc = monte_carlo(trades[tf], mc_resamples)
+            row.update({'mc_pnl_low': mc['pnl']['ci_low'], 'mc_pnl_high': mc['pnl']['ci_high'],
+                        'mc_max_dd': mc['max_drawdown']['p95'], 'risk_of_ruin': mc['risk_of_ruin']})
+        rows.append(row)
+    return {'table': pd.DataFrame(rows), 'trades': trades}
+
+
+def _format(key: str, value) -> str:
+    if pd.isna(value):
+        return "N/A"
+    if key in ('bars', 'trades'):
+        return f"{value:,.0f}"
+    if key in ('win_rate', 'risk_of_ruin'):
+        return f"{value:.1f}%"
+    if key == 'profit_factor':
+        return f"{value:.2f}"
+    return f"${value:+,.2f}"
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return
+
+    bars = load_csv(argv[0])
+    timeframes = [int(tf) for tf in argv[1].split(",")] if len(argv) > 1 else list(DEFAULT_TIMEFRAMES)
+    policy = argv[2] if len(argv) > 2 else "fixed"
+
+    started = time.perf_counter()
+    result = compare_timeframes(bars, timeframes, policy, cache=ResultCache())
+    elapsed = time.perf_counter() - started
+    table = result['table']
+
+    labels = [f"{tf}-MIN" for tf in timeframes]
+    metrics = [("Bars", 'bars'), ("Total Trades", 'trades'), ("Win Rate %", 'win_rate'),
+               ("Net P&L $", 'total_pnl'), ("Profit Factor", 'profit_factor'), ("Expectancy $", 'expectancy'),
+               ("Max Drawdown $", 'max_drawdown'), ("MC P&L 2.5% $", 'mc_pnl_low'),
+               ("MC P&L 97.5% $", 'mc_pnl_high'), ("MC Max DD 95% $", 'mc_max_dd'),
+               ("Risk of Ruin %", 'risk_of_ruin')]
+
+    width = 25 + 18 * len(labels)
+    print("\n" + "=" * width)
+    print(f"BITCOIN TRENDLINE BREAKOUT - {policy.upper()} - {len(bars):,} {bars.timeframe}-MIN BARS "
+          f"({os.path.basename(argv[0])})")
+    print("=" * width + "\n")
+    print(f"{'METRIC':<25}" + "".join(f"{label:<18}" for label in labels))
+    print("-" * width)
+    for label, key in metrics:
+        values = table[key] if key in table else [float('nan')] * len(table)
+        print(f"{label:<25}" + "".join(f"{_format(key, v):<18}" for v in values))
+    print(f"\n⏱️  {elapsed:.1f}s")
+
+    if len(argv) > 3:
+        table.to_csv(argv[3], index=False)
+        print(f"💾 Results saved to {argv[3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Vectorized bar-level backtests of the trendline breakout strategies
+
+run_backtest() applies the TrendlineStrategy rules to a whole candle
+series at once. Swings, ATR and volume MA are computed for every bar in
+batch (utils.indicators), two_pivot trendline crosses and the entry
+filters are NumPy expressions over the bar axis, and positions are
+simulated by the utils.kernels loop (Numba JIT when installed). Fixed and
+trailing exits run in that kernel; other rule sets (ladder,
+max_hold_minutes) step a utils.exit_policies engine only while a
+position is open. multi_pivot lines are fitted per bar with
+TrendlineTracker.
+
+Trades come back in the schema TrendlineStrategy stores via TradeStorage,
+with bar close times as entry/exit times.
+
+Usage: python -m backtest.trendline <csv> [fixed|trailing|ladder] [LONG,SHORT] [out.json]
+"""
+import datetime as dt
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backtest.cache import TRENDLINE_MODULES, ResultCache, code_version, dataset_fingerprint, open_cache, result_key
+from backtest.data import Bars, load_csv
+from btc_trendline_strategy.trendline_strategy import (
+    CandleStrategy, DEFAULT_PARAMS, EXIT_POLICIES, STOP_REASONS, build_exit_engine
+)
+from utils import kernels
+from utils.indicators import atr, sma, swing_highs, swing_lows
+from utils.trendline import TrendlineTracker
+
+# Parameters the entry signals depend on (everything else only changes exits)
+SIGNAL_PARAMS = ('lookback_swing', 'atr_length', 'volume_ma_length', 'volume_ma_mult', 'atr_sl_mult',
+                 'target_atr_mult', 'trendline_mode', 'trendline_pivots', 'min_candles', 'max_candles')
+
+
+def _last_two_swings(flags: np.ndarray, lookback: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per bar, indices of the last two swings confirmed by then (-1 = none), older first"""
+    n = len(flags)
+    padded = np.r_[-1, -1, np.flatnonzero(flags)]
+    confirmed = np.searchsorted(padded[2:], np.arange(n) - lookback, side='right')
+    return padded[confirmed], padded[confirmed + 1]
+
+
+def _crosses(price, close, older, newer, visible_from, kind):
+    """Two-pivot line cross per bar (TrendlineTracker.breakout() for one side)"""
+    n = len(close)
+    i = np.arange(n)
+    valid = (older >= visible_from) & (i >= 1)
+    p1 = price[np.maximum(older, 0)]
+    p2 = price[np.maximum(newer, 0)]
+    valid &= (p2 < p1) if kind == "resistance" else (p2 > p1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (p2 - p1) / (newer - older)
+        line_prev = p1 + slope * (i - 1 - older)
+        line_curr = p1 + slope * (i - older)
+    prev_close = np.r_[np.nan, close[:-1]]
+
+    if kind == "resistance":
+        return valid & (prev_close <= line_prev) & (close > line_curr)
+    return valid & (prev_close >= line_prev) & (close < line_curr)
+
+
+def signal_key(params: Dict) -> Tuple:
+    """The SIGNAL_PARAMS values of a parameter set (equal keys = equal entry signals)"""
+    p = {**DEFAULT_PARAMS, **params}
+    return tuple(p[k] for k in SIGNAL_PARAMS)
+
+
+class IndicatorCache:
+    """
+    Indicator and signal arrays of one Bars, each computed once per setting
+
+    Every array is causal (bar i only uses bars up to i), so windows of the
+    same data can slice the full-length arrays instead of recomputing them.
+    """
+
+    def __init__(self, bars: Bars):
+        self.bars = bars
+        self._arrays = {}
+
+    def _memo(self, key, compute):
+        if key not in self._arrays:
+            self._arrays[key] = compute()
+        return self._arrays[key]
+
+    def swings(self, lookback: int):
+        """(high_older, high_newer, low_older, low_newer) last-two-swing indices per bar"""
+        return self._memo(('swings', lookback), lambda: (
+            _last_two_swings(swing_highs(self.bars.high, lookback), lookback)
+            + _last_two_swings(swing_lows(self.bars.low, lookback), lookback)))
+
+    def atr(self, length: int) -> np.ndarray:
+        return self._memo(('atr', length), lambda: atr(self.bars.high, self.bars.low, self.bars.close, length))
+
+    def volume_ma(self, length: int) -> np.ndarray:
+        return self._memo(('volume_ma', length), lambda: sma(self.bars.volume, length))
+
+    def signals(self, params: Dict, directions=("LONG",)):
+        """breakout_signals() for these parameters"""
+        key = ('signals', signal_key(params), tuple(sorted(directions)))
+        return self._memo(key, lambda: breakout_signals(self.bars, params, directions, cache=self))
+
+
+def breakout_signals(bars: Bars, params: Dict, directions=("LONG",), cache: Optional[IndicatorCache] = None):
+    """
+    Entry signal of every bar, as check_entry_signal() would see it when flat
+
+    Returns aligned arrays (signal, stop, target, atr): signal +1 LONG,
+    -1 SHORT, 0 none; target uses target_atr_mult (the fixed policy's).
+    The indicator window is max_candles, like the live candle store.
+    Indicators come from `cache` when given (it must hold the same bars).
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    if p['trendline_mode'] != "two_pivot":
+        return tracker_signals(bars, p, directions)
+
+    cache = cache or IndicatorCache(bars)
+    n = len(bars)
+    lb = p['lookback_swing']
+    high, low, close = bars.high, bars.low, bars.close
+    i = np.arange(n)
+    in_window = np.minimum(i + 1, p['max_candles'])
+    visible_from = (i + 1 - in_window) + lb
+
+    high_older, high_newer, low_older, low_newer = cache.swings(lb)
+
+    # LONG first: a LONG cross never falls through to SHORT, even if its filters fail
+    long_cross = _crosses(high, close, high_older, high_newer, visible_from, "resistance")
+    short_cross = _crosses(low, close, low_older, low_newer, visible_from, "support")
+    if "LONG" not in directions:
+        long_cross[:] = False
+    if "SHORT" not in directions:
+        short_cross[:] = False
+    direction = np.where(long_cross, 1, np.where(short_cross, -1, 0))
+
+    # Stop reference: last visible opposite swing, else the bar's own low/high
+    long_ref = np.where(low_newer >= visible_from, low[np.maximum(low_newer, 0)], low)
+    short_ref = np.where(high_newer >= visible_from, high[np.maximum(high_newer, 0)], high)
+    ref = np.where(direction > 0, long_ref, short_ref)
+
+    # Volume and ATR filters (indicators are None until the window holds their length)
+    volume_ma = cache.volume_ma(p['volume_ma_length'])
+    entry_atr = cache.atr(p['atr_length'])
+    with np.errstate(invalid='ignore'):
+        volume_ok = (in_window < p['volume_ma_length']) | ~(bars.volume <= p['volume_ma_mult'] * volume_ma)
+        atr_ok = (in_window >= p['atr_length']) & (entry_atr > 0)
+    ready = i + 1 >= p['min_candles']
+
+    signal = np.where(ready & volume_ok & atr_ok, direction, 0)
+    stop = ref - signal * p['atr_sl_mult'] * entry_atr
+    target = close + signal * p['target_atr_mult'] * entry_atr
+    return signal, stop, target, entry_atr
+
+
+def tracker_signals(bars: Bars, params: Dict, directions=("LONG",)):
+    """breakout_signals() by streaming every bar through a TrendlineTracker (any trendline mode)"""
+    p = {**DEFAULT_PARAMS, **params}
+    n = len(bars)
+    signal = np.zeros(n, dtype=np.int64)
+    stop = np.full(n, np.nan)
+    target = np.full(n, np.nan)
+    entry_atr = np.full(n, np.nan)
+
+    tracker = TrendlineTracker(p['lookback_swing'], p['atr_length'], p['volume_ma_length'],
+                               mode=p['trendline_mode'], pivots=p['trendline_pivots'])
+    for i in range(n):
+        tracker.update(bars.candle(i), window=min(i + 1, p['max_candles']))
+        if i + 1 < p['min_candles']:
+            continue
+        entry = tracker.check_entry(p['volume_ma_mult'], p['atr_sl_mult'], p['target_atr_mult'],
+                                    allow_short="SHORT" in directions, allow_long="LONG" in directions)
+        if entry:
+            signal[i] = 1 if entry['direction'] == 'LONG' else -1
+            stop[i], target[i], entry_atr[i] = entry['stop_loss'], entry['target'], entry['atr']
+    return signal, stop, target, entry_atr
+
+
+def _simulate_engine(bars: Bars, signal, stop, target, entry_atr, engine):
+    """Exit-policy engine path: jump from entry to entry, stepping bars only while in a position"""
+    close_time = bars.close_time
+    entries = np.flatnonzero(signal)
+    rows = []
+    i = 0
+    while True:
+        k = np.searchsorted(entries, i)
+        if k == len(entries):
+            break
+        i = entries[k]
+        pos = engine.open(int(signal[i]), bars.close[i], stop[i], None if np.isnan(target[i]) else target[i],
+                          entry_atr[i], entry_time=close_time[i])
+        for j in range(i, len(bars)):
+            result = engine.update(pos, bars.high[j], bars.low[j], bars.close[j], now=close_time[j])
+            if result:
+                rows.append((i, j, pos, result[0], result[1]))
+                break
+        else:
+            break
+        i = j + 1
+    return rows
+
+
+def simulate(bars: Bars, signal, stop, target, entry_atr, exit_policy: str, params: Dict):
+    """
+    Closed trades as (entry_idx, exit_idx, position, exit_price, reason)
+
+    position is an exit_policies.OpenPosition (kernel trades get one rebuilt
+    from the kernel output, for the trade fields). A trade still open at the
+    end of the data is left out.
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    if exit_policy != "fixed":
+        target = np.full(len(bars), np.nan)
+
+    engine = build_exit_engine(exit_policy, p)
+    if exit_policy == "ladder" or p['max_hold_minutes']:
+        return _simulate_engine(bars, signal, stop, target, entry_atr, engine)
+
+    trailing = exit_policy == "trailing"
+    (entry_idx, exit_idx, direction, entry_price, exit_price, exit_code,
+     extreme, initial_stop, final_stop) = kernels.simulate_positions(
+        bars.high, bars.low, bars.close, signal, stop, target, entry_atr,
+        breakeven_mult=p['breakeven_atr_mult'] if trailing else np.inf,
+        trail_start_mult=p['trail_start_atr_mult'] if trailing else np.inf,
+        trail_dist_mult=p['trail_distance_atr_mult'])
+
+    rows = []
+    for k in np.flatnonzero(exit_code != kernels.EXIT_OPEN):
+        i = entry_idx[k]
+        pos = engine.open(int(direction[k]), entry_price[k], initial_stop[k],
+                          None if np.isnan(target[i]) else target[i], entry_atr[i])
+        pos.stop, pos.best = final_stop[k], extreme[k]
+        reason = "TARGET" if exit_code[k] == kernels.EXIT_TARGET else STOP_REASONS[exit_policy]
+        rows.append((i, exit_idx[k], pos, exit_price[k], reason))
+    return rows
+
+
+def _format_time(epoch: float) -> str:
+    return dt.datetime.fromtimestamp(int(epoch)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def trade_records(bars: Bars, rows, exit_policy: str, first_trade_id: int = 1) -> List[Dict]:
+    """simulate() rows as the trade dicts TrendlineStrategy.close_position() saves"""
+    close_time = bars.close_time
+    trades = []
+    for k, (i, j, pos, exit_price, reason) in enumerate(rows):
+        entry_price = float(pos.entry_price)
+        exit_price = float(exit_price)
+        pnl = pos.direction * (exit_price - entry_price)
+        pnl_pct = (pnl / entry_price) * 100
+
+        trade = {
+            'trade_id': first_trade_id + k,
+            'direction': pos.side,
+            'entry_time': _format_time(close_time[i]),
+            'exit_time': _format_time(close_time[j]),
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'stop_loss': float(pos.stop),
+        }
+        if exit_policy == "fixed":
+            trade['target'] = float(pos.target)
+        elif exit_policy == "trailing":
+            trade['highest_price' if pos.direction > 0 else 'lowest_price'] = float(pos.best)
+        else:
+            trade['max_target'] = float(pos.max_level)
+        trade.update({
+            'duration_minutes': round((close_time[j] - close_time[i]) / 60, 2),
+            'pnl': round(pnl, 2),
+            'pnl_pct': round(pnl_pct, 4),
+            'exit_reason': reason,
+            'is_win': pnl > 0
+        })
+        trades.append(trade)
+    return trades
+
+
+def run_backtest(bars: Bars, exit_policy: str = "fixed", directions=("LONG",),
+                 params: Optional[Dict] = None, cache=None) -> List[Dict]:
+    """
+    Backtest one TrendlineStrategy configuration over `bars`
+
+    Args:
+        bars: Candles of the strategy's timeframe
+        exit_policy: "fixed", "trailing" or "ladder"
+        directions: Any of "LONG" and "SHORT"
+        params: Overrides for DEFAULT_PARAMS, as for TrendlineStrategy
+        cache: ResultCache (or directory, True for the default one) holding
+            the trades of earlier identical runs
+
+    Returns:
+        Closed trades in TradeStorage schema
+    """
+    if exit_policy not in EXIT_POLICIES:
+        raise ValueError(f"Unknown exit policy: {exit_policy}")
+    CandleStrategy.check_param_names(params or {})
+    p = {**DEFAULT_PARAMS, **(params or {})}
+
+    def run():
+        signal, stop, target, entry_atr = breakout_signals(bars, p, directions)
+        rows = simulate(bars, signal, stop, target, entry_atr, exit_policy, p)
+        return trade_records(bars, rows, exit_policy)
+
+    cache = open_cache(cache)
+    if cache is None:
+        return run()
+    key = result_key(dataset_fingerprint(bars), {'backtest': exit_policy, 'directions': list(directions), 'params': p},
+                     code_version(*TRENDLINE_MODULES))
+    return cache.get_or_compute(key, run)
+
+
+def summarize(trades: List[Dict]) -> Dict:
+    """Trade count, win rate and PnL totals"""
+    pnl = np.array([t['pnl'] for t in trades], dtype=float)
+    wins = int((pnl > 0).sum())
+    return {
+        'total_trades': len(trades),
+        'wins': wins,
+        'losses': len(trades) - wins,
+        'win_rate': wins / len(trades) * 100 if trades else 0,
+        'total_pnl': float(pnl.sum())
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return
+
+    started = time.perf_counter()
+    bars = load_csv(argv[0])
+    policy = argv[1] if len(argv) > 1 else "fixed"
+    directions = tuple(argv[2].upper().split(",")) if len(argv) > 2 else ("LONG",)
+    loaded = time.perf_counter()
+
+    cache = ResultCache()
+    trades = run_backtest(bars, policy, directions, cache=cache)
+    finished = time.perf_counter()
+
+    stats = summarize(trades)
+    print(f"📊 {len(bars):,} {bars.timeframe}-min bars, {policy} {'/'.join(directions)} "
+          f"({kernels.describe_backend()})")
+    print(f"🧾 Trades: {stats['total_trades']} | Win rate: {stats['win_rate']:.1f}% | P&L: ${stats['total_pnl']:+,.2f}")
+    print(f"⏱️  Load {loaded - started:.2f}s, backtest {finished - loaded:.2f}s{' (cached)' if cache.hits else ''}")
+
+    if len(argv) > 3:
+        with open(argv[3], 'w') as f:
+            json.dump(trades, f, indent=2)
+        print(f"💾 Trades saved to {argv[3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Tick-level backtests of the buy/sell-volume strategies
+
+The volume strategies need aggressor-side volume, which candle CSVs do not
+have, so this replays recorded trades (backtest.data.load_ticks). Ticks are
+bucketed into delta bars with array operations (running-max bucket ids,
+np.add.reduceat per side), the entry rules run as utils.indicators
+volume_signals() over all bars, and only bars with an open position step
+the live modules' exit engine (take profit, stop loss, delta reversal,
+MAX_HOLD_MINUTES), so no Python code runs per tick.
+
+The bars follow the live process_trade() bookkeeping exactly: a bar opens
+at the previous bar's close, closes when the first trade of a later bucket
+arrives (the decision time for entries and exits), and bars without volume
+are skipped. Buckets are taken in UTC, which matches the live local-time
+buckets for any timezone offset that is a multiple of the bar interval.
+
+Usage: python -m backtest.volume <ticks.csv|ticks.npz> [1|5] [out.json]
+"""
+import datetime as dt
+import importlib
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from backtest.data import Ticks, load_ticks
+from utils.exit_policies import ExitEngine, FixedTarget, SignalExit, StopLoss, TimeExit
+from utils.indicators import delta_stats, volume_signals
+
+STRATEGY_MODULES = {
+    1: "volume_strategy.live_strategy",
+    5: "volume_strategy.live_strategy_5min",
+}
+
+# Live module constants used as parameters (lowercased keys)
+PARAM_CONSTANTS = ('MIN_DELTA_BUY', 'MIN_DELTA_SELL', 'MIN_BUY_PERCENT', 'MIN_SELL_PERCENT',
+                   'CONSECUTIVE_CANDLES', 'TAKE_PROFIT_PCT', 'STOP_LOSS_PCT', 'MAX_HOLD_MINUTES')
+
+
+def strategy_params(timeframe: int = 1) -> Dict:
+    """Parameters of the live volume strategy for this timeframe, read from its module"""
+    if timeframe not in STRATEGY_MODULES:
+        raise ValueError(f"No volume strategy for {timeframe}-min bars (have {sorted(STRATEGY_MODULES)})")
+    module = importlib.import_module(STRATEGY_MODULES[timeframe])
+    params = {name.lower(): getattr(module, name) for name in PARAM_CONSTANTS}
+    params['reversal_delta'] = module.signal_state.reversal_delta
+    params['reversal_bars'] = module.signal_state.reversal_bars
+    return params
+
+
+def delta_bars(ticks: Ticks, timeframe: int = 1) -> Dict[str, np.ndarray]:
+    """
+    Aggregate ticks into `timeframe`-minute delta bars
+
+    Returns arrays per bar: time (bucket start, epoch s), open, high, low,
+    close, trades, decision_time (epoch s of the trade that closed the bar,
+    NaN for the last, still open bar) and the delta_stats() fields.
+    """
+    n = len(ticks)
+    if n == 0:
+        empty = np.empty(0)
+        return {'time': empty.astype(np.int64), 'open': empty, 'high': empty, 'low': empty,
+                'close': empty, 'trades': empty.astype(np.int64), 'decision_time': empty,
+                **delta_stats(empty, empty)}
+
+    # A late trade from an older bucket joins the bar being built, like live
+    bucket = np.maximum.accumulate(ticks.timestamp // 1_000_000 // (timeframe * 60))
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], n]
+
+    price = ticks.price
+    buy = np.add.reduceat(np.where(ticks.is_buy, ticks.size, 0.0), starts)
+    sell = np.add.reduceat(np.where(ticks.is_buy, 0.0, ticks.size), starts)
+
+    close = price[ends - 1]
+    open_ = np.r_[price[0], close[:-1]]
+    high = np.maximum(np.maximum.reduceat(price, starts), open_)
+    low = np.minimum(np.minimum.reduceat(price, starts), open_)
+
+    return {
+        'time': bucket[starts] * timeframe * 60,
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'trades': ends - starts,
+        'decision_time': np.r_[ticks.timestamp[starts[1:]] / 1_000_000, np.nan],
+        **delta_stats(buy, sell)
+    }
+
+
+def _recent(flags: np.ndarray, bars: int) -> np.ndarray:
+    """flags true on any of the last `bars` bars (and at least `bars` bars seen)"""
+    counts = np.cumsum(flags)
+    window = counts - np.r_[np.zeros(bars, dtype=counts.dtype), counts][:len(counts)]
+    recent = window > 0
+    recent[:bars - 1] = False
+    return recent
+
+
+def bar_signals(bars: Dict[str, np.ndarray], params: Dict) -> Dict[str, np.ndarray]:
+    """
+    Entry and reversal flags of the bars the live strategy evaluates
+
+    Only closed bars with volume count; returns their indices ('bar') with
+    buy_signal / sell_signal and long_reversal / short_reversal (opposite
+    delta spike within reversal_bars bars, VolumeSignals.delta_reversal()).
+    """
+    idx = np.flatnonzero((bars['total_volume'] > 0) & ~np.isnan(bars['decision_time']))
+    delta = bars['delta'][idx]
+    signals = volume_signals(bars['open'][idx], bars['close'][idx], delta, bars['buy_pct'][idx],
+                             bars['sell_pct'][idx], params['min_delta_buy'], params['min_delta_sell'],
+                             params['min_buy_percent'], params['min_sell_percent'],
+                             params['consecutive_candles'])
+    return {
+        'bar': idx,
+        'buy_signal': signals['buy_signal'],
+        'sell_signal': signals['sell_signal'],
+        'long_reversal': _recent(delta < -params['reversal_delta'], params['reversal_bars']),
+        'short_reversal': _recent(delta > params['reversal_delta'], params['reversal_bars'])
+    }
+
+
+def simulate(bars: Dict[str, np.ndarray], signals: Dict[str, np.ndarray], params: Dict):
+    """
+    Closed trades as (entry_bar, exit_bar, position, exit_price, reason)
+
+    Entries fill at the signal bar's close with the live TP/SL percentages;
+    exits run the live exit engine at every later bar close.
+    """
+    current = [0]   # Evaluated-bar position the reversal predicate looks at
+    reversal = {"LONG": signals['long_reversal'], "SHORT": signals['short_reversal']}
+    engine = ExitEngine(FixedTarget("TAKE_PROFIT", fill="close"),
+                        StopLoss("STOP_LOSS", fill="close"),
+                        SignalExit(lambda side: bool(reversal[side][current[0]]), "DELTA_REVERSAL"),
+                        TimeExit(max_minutes=params['max_hold_minutes']))
+
+    close = bars['close'][signals['bar']]
+    now = bars['decision_time'][signals['bar']]
+    entries = np.flatnonzero(signals['buy_signal'] | signals['sell_signal'])
+    tp = params['take_profit_pct'] / 100
+    sl = params['stop_loss_pct'] / 100
+
+    rows = []
+    k = 0
+    while True:
+        e = np.searchsorted(entries, k)
+        if e == len(entries):
+            break
+        k = entries[e]
+        direction = 1 if signals['buy_signal'][k] else -1
+        price = close[k]
+        pos = engine.open(direction, price, price * (1 - direction * sl), price * (1 + direction * tp),
+                          entry_time=now[k])
+        for j in range(k, len(close)):
+            current[0] = j
+            result = engine.update(pos, close[j], now=now[j])
+            if result:
+                rows.append((signals['bar'][k], signals['bar'][j], pos, result[0], result[1]))
+                break
+        else:
+            break
+        k = j + 1
+    return rows
+
+
+def _format_time(epoch: float) -> str:
+    return dt.datetime.fromtimestamp(epoch).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def trade_records(bars: Dict[str, np.ndarray], rows, first_trade_id: int = 1) -> List[Dict]:
+    """simulate() rows as the trade dicts the live volume strategies save"""
+    trades = []
+    for k, (i, j, pos, exit_price, reason) in enumerate(rows):
+        entry_time = bars['decision_time'][i]
+        exit_time = bars['decision_time'][j]
+        entry_price = float(pos.entry_price)
+        exit_price = float(exit_price)
+        pnl = pos.direction * (exit_price - entry_price)
+        pnl_pct = (pnl / entry_price) * 100
+        trades.append({
+            'trade_id': first_trade_id + k,
+            'direction': pos.side,
+            'entry_time': _format_time(entry_time),
+            'exit_time': _format_time(exit_time),
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'duration_minutes': round((exit_time - entry_time) / 60, 2),
+            'pnl': round(pnl, 2),
+            'pnl_pct': round(pnl_pct, 4),
+            'exit_reason': reason,
+            'is_win': pnl > 0
+        })
+    return trades
+
+
+def run_backtest(ticks: Ticks, timeframe: int = 1, params: Optional[Dict] = None) -> List[Dict]:
+    """
+    Backtest a volume strategy over recorded ticks
+
+    Args:
+        ticks: Trades in arrival order
+        timeframe: Bar interval of the live module to use (1 or 5)
+        params: Overrides for strategy_params(timeframe) (lowercased constant names)
+
+    Returns:
+        Closed trades in the live trade log schema
+    """
+    base = strategy_params(timeframe)
+    unknown = set(params or {}) - set(base)
+    if unknown:
+        raise ValueError(f"Unknown parameter(s): {', '.join(sorted(unknown))}")
+    p = {**base, **(params or {})}
+
+    bars = delta_bars(ticks, timeframe)
+    rows = simulate(bars, bar_signals(bars, p), p)
+    return trade_records(bars, rows)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return
+
+    started = time.perf_counter()
+    ticks = load_ticks(argv[0])
+    timeframe = int(argv[1]) if len(argv) > 1 else 1
+    loaded = time.perf_counter()
+
+    trades = run_backtest(ticks, timeframe)
+    finished = time.perf_counter()
+
+    pnl = sum(t['pnl'] for t in trades)
+    wins = sum(t['is_win'] for t in trades)
+    print(f"📊 {len(ticks):,} ticks, {timeframe}-min volume strategy")
+    print(f"🧾 Trades: {len(trades)} | Win rate: {wins / len(trades) * 100 if trades else 0:.1f}% | P&L: ${pnl:+,.2f}")
+    print(f"⏱️  Load {loaded - started:.2f}s, backtest {finished - loaded:.2f}s "
+          f"({len(ticks) / max(finished - loaded, 1e-9) / 1e6:.1f}M ticks/s)")
+
+    if len(argv) > 2:
+        with open(argv[2], 'w') as f:
+            json.dump(trades, f, indent=2)
+        print(f"💾 Trades saved to {argv[2]}")
+
+
+if __name__ == "__main__":
+    main()
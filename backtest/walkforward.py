@@ -0,0 +1,197 @@
+"""
+Walk-forward optimization of the trendline strategies
+
+The data is split into rolling windows: each one optimizes the parameter
+grid on `train` bars and trades the winner on the `test` bars right after,
+which the optimizer never saw. The out-of-sample trades of all windows are
+stitched into one trade list and equity curve, an honest estimate of what
+re-tuning every `test` period would have earned.
+
+Indicators and entry signals are computed once per setting over the whole
+series (backtest.trendline.IndicatorCache) and sliced per window, so
+overlapping train windows never recompute them. Since every indicator is
+causal, a slice equals a strategy that was already warmed up on the
+preceding bars, like the live ones are. Training runs in parallel with
+backtest.sweep's shared-memory workers, and with a cache the train scores
+of each combination are stored, so re-running a report only replays the
+winners on their test windows.
+
+Usage: python -m backtest.walkforward <csv> [train_days] [test_days] [workers] [trades.json]
+"""
+import datetime as dt
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest.cache import (TRENDLINE_MODULES, ResultCache, code_version, dataset_fingerprint, open_cache,
+                            result_key)
+from backtest.data import Bars, load_csv
+from backtest.sweep import METRIC_COLUMNS, combo_params, expand_combos, map_combos, trade_metrics
+from backtest.trendline import IndicatorCache, simulate, trade_records
+
+MINIMIZED_METRICS = ('max_drawdown',)   # Objectives where lower is better (the rest are maximized)
+
+
+def rolling_windows(n_bars: int, train_bars: int, test_bars: int, step: Optional[int] = None,
+                    anchored: bool = False) -> List[Tuple[int, int, int]]:
+    """
+    (train_start, test_start, test_end) bar ranges
+
+    Windows advance by `step` bars (default test_bars, so test periods tile
+    the data); anchored windows always train from bar 0.
+    """
+    step = step or test_bars
+    windows = []
+    test_start = train_bars
+    while test_start + test_bars <= n_bars:
+        windows.append((0 if anchored else test_start - train_bars, test_start, test_start + test_bars))
+        test_start += step
+    return windows
+
+
+def window_trades(bars: Bars, cache: IndicatorCache, combo: Dict, directions, base_params: Optional[Dict],
+                  start: int, end: int):
+    """simulate() rows of one combination on bars[start:end] (indices relative to start)"""
+    p = combo_params(combo, base_params)
+    window = slice(start, end)
+    signal, stop, target, entry_atr = cache.signals(p, directions)
+    return simulate(bars[window], signal[window], stop[window], target[window], entry_atr[window],
+                    combo.get('exit_policy', 'fixed'), p)
+
+
+def _pnl(rows) -> List[float]:
+    return [pos.direction * (exit_price - pos.entry_price) for _, _, pos, exit_price, _ in rows]
+
+
+def score_windows(bars: Bars, combos: List[Dict], windows, directions, base_params) -> List[List[Dict]]:
+    """Train-window metrics of every combination: result[combo][window]"""
+    cache = IndicatorCache(bars)
+    return [[trade_metrics(_pnl(window_trades(bars, cache, combo, directions, base_params, start, test_start)))
+             for start, test_start, _ in windows]
+            for combo in combos]
+
+
+def _format_time(epoch) -> str:
+    return dt.datetime.fromtimestamp(int(epoch)).strftime('%Y-%m-%d %H:%M')
+
+
+def walk_forward(bars: Bars, grid: Dict[str, list] = None, combos: List[Dict] = None,
+                 train_days: float = 60, test_days: float = 15, step_days: Optional[float] = None,
+                 anchored: bool = False, directions=("LONG",), params: Optional[Dict] = None,
+                 objective: str = 'total_pnl', min_trades: int = 10,
+                 workers: Optional[int] = None, cache=None) -> Dict:
+    """
+    Optimize on every train window, trade the best combination on the next test window
+
+    Args:
+        bars: Candles of the strategy timeframe
+        grid / combos: Parameter combinations, as for backtest.sweep.sweep()
+        train_days / test_days / step_days: Window lengths and advance, in days
+        anchored: Train from the start of the data every time (expanding windows)
+        directions: "LONG" and/or "SHORT"
+        params: Overrides for DEFAULT_PARAMS shared by all combinations
+        objective: Train metric to optimize (one of METRIC_COLUMNS; those in
+            MINIMIZED_METRICS are minimized, the others maximized)
+        min_trades: Combinations with fewer train trades are not eligible;
+            a window without eligible ones sits out its test period
+        workers: Worker processes for training (default: all cores)
+        cache: ResultCache (or directory, True for the default one) for the
+            train scores of each combination
+
+    Returns:
+        dict with 'windows' (DataFrame, one row per window), 'trades'
+        (stitched out-of-sample trades, TradeStorage schema), 'equity'
+        (cumulative out-of-sample P&L per trade) and 'metrics'
+    """
+    if objective not in METRIC_COLUMNS:
+        raise ValueError(f"Unknown objective: {objective}")
+    sign = -1 if objective in MINIMIZED_METRICS else 1
+    combos = expand_combos(grid, combos, params)
+
+    bars_per_day = 1440 / bars.timeframe
+    windows = rolling_windows(len(bars), int(train_days * bars_per_day), int(test_days * bars_per_day),
+                              int(step_days * bars_per_day) if step_days else None, anchored)
+    if not windows:
+        raise ValueError(f"{len(bars)} bars are too few for {train_days}+{test_days} day windows")
+
+    def train(todo):
+        return map_combos(bars, score_windows, [combos[i] for i in todo], (windows, directions, params),
+                          params, workers)
+
+    cache = open_cache(cache)
+    if cache is None:
+        scores = train(range(len(combos)))
+    else:
+        dataset = dataset_fingerprint(bars)
+        version = code_version(*TRENDLINE_MODULES, 'backtest.walkforward')
+        scores = cache.cells([result_key(dataset, {'train': combo, 'windows': windows, 'directions': list(directions),
+                                                   'params': params}, version) for combo in combos], train)
+
+    cache = IndicatorCache(bars)
+    close_time = bars.close_time
+    summary, trades, pnl = [], [], []
+    for w, (start, test_start, test_end) in enumerate(windows):
+        row = {'window': w + 1, 'train_start': _format_time(bars.time[start]),
+               'test_start': _format_time(bars.time[test_start]), 'test_end': _format_time(close_time[test_end - 1])}
+
+        eligible = [c for c in range(len(combos)) if scores[c][w]['trades'] >= min_trades]
+        if not eligible:
+            summary.append(row)
+            continue
+        best = max(eligible, key=lambda c: sign * scores[c][w][objective])
+        combo = combos[best]
+
+        rows = window_trades(bars, cache, combo, directions, params, test_start, test_end)
+        policy = combo.get('exit_policy', 'fixed')
+        trades += trade_records(bars[test_start:test_end], rows, policy, first_trade_id=len(trades) + 1)
+        window_pnl = _pnl(rows)
+        pnl += window_pnl
+
+        row.update(combo)
+        row.update({f'train_{objective}': scores[best][w][objective], 'train_trades': scores[best][w]['trades'],
+                    'test_trades': len(rows), 'test_pnl': float(sum(window_pnl))})
+        summary.append(row)
+
+    return {
+        'windows': pd.DataFrame(summary),
+        'trades': trades,
+        'equity': np.cumsum(pnl),
+        'metrics': trade_metrics(pnl)
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return
+
+    bars = load_csv(argv[0])
+    train_days = float(argv[1]) if len(argv) > 1 else 60
+    test_days = float(argv[2]) if len(argv) > 2 else 15
+    workers = int(argv[3]) if len(argv) > 3 else None
+
+    started = time.perf_counter()
+    result = walk_forward(bars, train_days=train_days, test_days=test_days,
+                          directions=("LONG", "SHORT"), workers=workers, cache=ResultCache())
+    elapsed = time.perf_counter() - started
+
+    m = result['metrics']
+    print(f"📊 Walk-forward {train_days:g}d train / {test_days:g}d test over {len(bars):,} "
+          f"{bars.timeframe}-min bars in {elapsed:.1f}s\n")
+    print(result['windows'].to_string(index=False))
+    print(f"\n🧾 Out-of-sample: {m['trades']} trades | Win rate: {m['win_rate']:.1f}% | "
+          f"P&L: ${m['total_pnl']:+,.2f} | PF: {m['profit_factor']:.2f} | Max DD: ${m['max_drawdown']:,.2f}")
+
+    if len(argv) > 4:
+        with open(argv[4], 'w') as f:
+            json.dump(result['trades'], f, indent=2)
+        print(f"💾 Trades saved to {argv[4]}")
+
+
+if __name__ == "__main__":
+    main()
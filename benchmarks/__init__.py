@@ -0,0 +1 @@
+# Throughput benchmarks of the backtest engine (see benchmarks/backtest_bench.py)
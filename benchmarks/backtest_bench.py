@@ -0,0 +1,173 @@
+"""
+Throughput benchmarks of the backtest engine
+
+Times the indicator kernels, the bar-level trendline backtester (fixed and
+trailing exits) and the sweep engine on synthetic 1-min candles
+(benchmarks.synthetic.gbm_bars) of 1k, 100k and 1M bars, and reports the
+best and median wall time, bars/sec and peak traced memory of every case.
+
+The first run writes the results to a JSON baseline; later runs compare
+against it and exit with status 1 when a case's median time got more
+than TOLERANCE slower (and at least MIN_DELTA_SECONDS, so timer noise on
+the sub-ms 1k cases does not count), so an optimization (or a regression)
+shows up as a number. Medians over MIN_SECONDS of repeats are compared
+rather than best times: a single lucky run in the baseline would otherwise
+make every later run look slower.
+Baselines are machine specific: regenerate with `update` after changing
+hardware, Python or Numba.
+
+Usage: python -m benchmarks.backtest_bench [1000,100000,1000000] [baseline.json] [update]
+"""
+import datetime as dt
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from backtest.sweep import sweep
+from backtest.trendline import run_backtest
+from benchmarks.synthetic import gbm_bars
+from btc_trendline_strategy.variant_batch import expand_grid
+from utils import kernels
+from utils.indicators import atr, rsi, sma, swing_highs, swing_lows
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+TOLERANCE = 1.25          # Slower than baseline x this = regression
+MIN_DELTA_SECONDS = 0.005 # Slowdowns smaller than this are timer noise, never a regression
+MIN_SECONDS = 3.0         # Repeat each case until this much time is spent
+MIN_REPEATS = 5
+MAX_REPEATS = 1000
+
+SWEEP_GRID = {'lookback_swing': [3, 5], 'atr_sl_mult': [0.5, 1.0],
+              'exit_policy': ['fixed', 'trailing']}
+
+
+def _indicators(bars):
+    atr(bars.high, bars.low, bars.close, 14)
+    swing_highs(bars.high, 3)
+    swing_lows(bars.low, 3)
+    sma(bars.volume, 20)
+    rsi(bars.close, 14)
+
+
+CASES = {
+    # name: (function of bars, units of work per bar)
+    'indicators': (_indicators, 1),
+    'backtest_fixed': (lambda bars: run_backtest(bars, 'fixed', ('LONG', 'SHORT')), 1),
+    'backtest_trailing': (lambda bars: run_backtest(bars, 'trailing', ('LONG', 'SHORT')), 1),
+    'sweep': (lambda bars: sweep(bars, SWEEP_GRID, directions=('LONG', 'SHORT'), workers=1),
+              len(expand_grid(SWEEP_GRID))),
+}
+
+
+def time_case(func: Callable, bars) -> Dict:
+    """Best and median wall time over repeats (garbage collector off, as timeit does), then one traced run for the memory peak"""
+    times = []
+    gc.collect()
+    gc.disable()
+    try:
+        while len(times) < MIN_REPEATS or (len(times) < MAX_REPEATS and sum(times) < MIN_SECONDS):
+            started = time.perf_counter()
+            func(bars)
+            times.append(time.perf_counter() - started)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    func(bars)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': min(times), 'median_seconds': float(np.median(times)), 'repeats': len(times),
+            'peak_mb': peak / 1e6}
+
+
+def run(sizes=DEFAULT_SIZES, cases: List[str] = None) -> Dict:
+    """Benchmark results keyed "<case>@<bars>", plus the environment they ran in"""
+    # Compile the Numba kernels outside the timings
+    for func, _ in CASES.values():
+        func(gbm_bars(1_000))
+
+    results = {}
+    for n in sizes:
+        bars = gbm_bars(n)
+        for name in cases or CASES:
+            func, work = CASES[name]
+            r = time_case(func, bars)
+            r['bars_per_sec'] = n * work / r['seconds']
+            results[f"{name}@{n}"] = r
+            print(f"  {name:<18} {n:>9,} bars  {r['seconds'] * 1000:>9.1f} ms  "
+                  f"{r['median_seconds'] * 1000:>9.1f} ms median  "
+                  f"{r['bars_per_sec'] / 1e6:>7.2f}M bars/s  {r['peak_mb']:>7.1f} MB")
+
+    return {
+        'meta': {
+            'date': dt.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'backend': kernels.describe_backend(),
+            'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs"
+        },
+        'results': results
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = TOLERANCE,
+            min_delta: float = MIN_DELTA_SECONDS) -> List[str]:
+    """
+    Print current vs baseline median times; returns the regressed case keys (ratio and delta both over the limits)
+
+    Baselines saved before medians were recorded are compared on best times.
+    """
+    regressions = []
+    print(f"\n📏 vs baseline of {baseline['meta']['date']} ({baseline['meta']['backend']})")
+    for key, r in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None:
+            print(f"  {key:<28} new")
+            continue
+        field = 'median_seconds' if 'median_seconds' in base else 'seconds'
+        ratio = r[field] / base[field]
+        delta = abs(r[field] - base[field])
+        significant = delta >= min_delta
+        regressed = ratio > tolerance and significant
+        flag = "⚠️ " if regressed else "✅" if ratio < 1 / tolerance and significant else "  "
+        print(f"  {flag} {key:<28} {base[field] * 1000:>9.1f} → {r[field] * 1000:>9.1f} ms  ({ratio:.2f}x)")
+        if regressed:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(n) for n in argv[0].split(",")] if argv else list(DEFAULT_SIZES)
+    path = argv[1] if len(argv) > 1 else DEFAULT_BASELINE
+    update = len(argv) > 2 and argv[2] == 'update'
+
+    print(f"⏱️  Backtest benchmarks ({kernels.describe_backend()})")
+    current = run(sizes)
+
+    regressions = []
+    if os.path.exists(path) and not update:
+        with open(path, 'r') as f:
+            regressions = compare(current, json.load(f))
+    else:
+        with open(path, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\n💾 Baseline saved to {path}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} case(s) more than {(TOLERANCE - 1) * 100:.0f}% "
+              f"(and {MIN_DELTA_SECONDS * 1000:.0f} ms) slower than baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,10 @@
-import json
 import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+from utils.monte_carlo import monte_carlo
+from utils.trade_storage import TradeStorage
 
 def compare_all():
     """Compare all 3 timeframes"""
@@ -8,9 +13,9 @@ def compare_all():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
     timeframes = {
-        "1-MIN": os.path.join(script_dir, "trades_1min.json"),
-        "5-MIN": os.path.join(script_dir, "trades_5min.json"),
-        "15-MIN": os.path.join(script_dir, "trades_15min.json")
+        "1-MIN": (os.path.join(script_dir, "trades_1min.json"), "trendline_trades_1min"),
+        "5-MIN": (os.path.join(script_dir, "trades_5min.json"), "trendline_trades_5min"),
+        "15-MIN": (os.path.join(script_dir, "trades_15min.json"), "trendline_trades_15min")
     }
     
     print("\n" + "="*90)
@@ -19,13 +24,8 @@ def compare_all():
     
     results = {}
     
-    for tf, filename in timeframes.items():
-        if not os.path.exists(filename):
-            results[tf] = None
-            continue
-        
-        with open(filename, 'r') as f:
-            trades = json.load(f)
+    for tf, (filename, collection) in timeframes.items():
+        trades = TradeStorage(json_file=filename, collection_name=collection).load_trades()
         
         if not trades:
             results[tf] = None
@@ -47,12 +47,19 @@ def compare_all():
         
         expectancy = (win_rate/100 * avg_win) - ((100-win_rate)/100 * abs(avg_loss))
         
+        # Spread of outcomes over resampled trade orders
+        mc = monte_carlo(trades, 100_000)
+        
         results[tf] = {
             'total': total,
             'win_rate': win_rate,
             'total_pnl': total_pnl,
             'profit_factor': profit_factor,
-            'expectancy': expectancy
+            'expectancy': expectancy,
+            'mc_pnl_low': mc['pnl']['ci_low'],
+            'mc_pnl_high': mc['pnl']['ci_high'],
+            'mc_max_dd': mc['max_drawdown']['p95'],
+            'risk_of_ruin': mc['risk_of_ruin']
         }
     
     # Print comparison
@@ -67,7 +74,11 @@ def compare_all():
             ("Win Rate %", 'win_rate'),
             ("Net P&L $", 'total_pnl'),
             ("Profit Factor", 'profit_factor'),
-            ("Expectancy $", 'expectancy')
+            ("Expectancy $", 'expectancy'),
+            ("MC P&L 2.5% $", 'mc_pnl_low'),
+            ("MC P&L 97.5% $", 'mc_pnl_high'),
+            ("MC Max DD 95% $", 'mc_max_dd'),
+            ("Risk of Ruin %", 'risk_of_ruin')
         ]
         
         for label, key in metrics:
@@ -77,7 +88,7 @@ def compare_all():
                     val = results[tf][key]
                     if key in ['total']:
                         vals[tf] = f"{val:.0f}"
-                    elif key in ['win_rate']:
+                    elif key in ['win_rate', 'risk_of_ruin']:
                         vals[tf] = f"{val:.1f}%"
                     elif key == 'profit_factor':
                         vals[tf] = f"{val:.2f}"
@@ -0,0 +1,618 @@
+"""
+Bitcoin Trendline Breakout Strategy - reusable class
+One TrendlineStrategy instance = one symbol / timeframe / exit policy /
+parameter set. All state lives on the instance, so any number of them can
+run in one process, either each on its own websocket (main()) or together
+on one shared trade stream for any number of symbols (run_shared()).
+
+CandleStrategy is the utils.strategy_api Strategy shared with VariantBatch
+(variant_batch.py): the runtime builds the candles and calls on_bar(),
+subclasses implement update_indicators() and check_signals(). Parameters
+can be changed while running with stage_params() (e.g. from a watched
+utils.param_config file); they switch over at the next bar.
+"""
+import datetime as dt
+import time
+import os
+import sys
+import requests
+from colorama import init, Fore, Style
+
+# Initialize colorama
+try:
+    init(autoreset=True)
+    HAS_COLOR = True
+except:
+    HAS_COLOR = False
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+from utils.exit_policies import AtrTrailing, Breakeven, ExitEngine, FixedTarget, RLadder, StopLoss, TimeExit
+from utils.market_feed import LiveFeed
+from utils.param_config import watch
+from utils.position_book import get_book
+from utils.strategy_api import Runtime, Strategy, TickBatch
+from utils.trade_storage import TradeStorage
+from utils.trendline import TrendlineTracker
+
+# Exchange configuration
+CANDLE_API = "https://cdn.india.deltaex.org/v2/chart/history"
+SYMBOL = "BTCUSD"
+
+EXIT_POLICIES = ("fixed", "trailing", "ladder")
+TRACKER_PARAMS = {'lookback_swing': 'lookback_swing', 'atr_length': 'atr_length',
+                  'volume_ma_length': 'volume_ma_length', 'trendline_mode': 'mode',
+                  'trendline_pivots': 'pivots'}  # Strategy param -> TrendlineTracker setting
+POLICY_LABELS = {"fixed": "", "trailing": "-TRAIL", "ladder": "-LADDER"}
+STOP_REASONS = {"fixed": "STOP_LOSS", "trailing": "TRAILING_STOP", "ladder": "TRAIL_SL_{max_level:g}X"}
+
+
+def symbol_suffix(symbol: str) -> str:
+    """Suffix for default file/collection names ("" for SYMBOL, so BTCUSD logs keep their names)"""
+    return "" if symbol == SYMBOL else f"_{symbol.lower()}"
+
+# MaxCapital strategy defaults (override per instance with params={...})
+DEFAULT_PARAMS = {
+    'lookback_swing': 3,
+    'volume_ma_length': 20,
+    'volume_ma_mult': 1.2,
+    'atr_length': 14,
+    'atr_sl_mult': 1.0,
+    'target_atr_mult': 3.0,          # fixed exit policy only
+    'breakeven_atr_mult': 1.0,       # trailing: move stop to entry at this profit
+    'trail_start_atr_mult': 2.0,     # trailing: start trailing at this profit
+    'trail_distance_atr_mult': 1.0,  # trailing: distance behind the best price
+    'ladder_first_r': 2.0,           # ladder: first target, in multiples of the initial risk (R)
+    'ladder_lock_pct': 0.6,          # ladder: share of the reached level's profit locked in the stop
+    'max_hold_minutes': 0.0,         # Time exit after this many minutes in the trade (0 = off)
+    'min_candles': 60,
+    'max_candles': 200,              # Candles kept in memory
+    'history_minutes': 360,          # History loaded on connect
+    'trendline_mode': "two_pivot",
+    'trendline_pivots': 6,
+    'heartbeat_every': 50,           # Print a heartbeat every N trades (0 = off)
+}
+
+
+class CandleStrategy(Strategy):
+    """
+    Strategy on one candle timeframe: every closed candle from the runtime
+    goes to update_indicators() first, then to check_signals() once at
+    least min_candles are available.
+    """
+
+    def __init__(self, timeframe: int, params: dict, label: str, symbol: str = SYMBOL):
+        self.check_param_names(params or {})
+        self.check_param_values(params or {})
+
+        self.timeframe = timeframe
+        self.timeframes = (timeframe,)
+        self.symbol = symbol
+        self.label = label
+        self.name = label
+        self.base_params = {**DEFAULT_PARAMS, **(params or {})}
+        self.params = dict(self.base_params)
+        self._staged_params = None
+
+        # Candle storage
+        self.candle_data = []
+        self.received_trade_count = 0
+
+
+    @staticmethod
+    def check_param_names(params: dict):
+        unknown = set(params) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown strategy parameters: {sorted(unknown)}")
+
+
+    @staticmethod
+    def check_param_values(params: dict):
+        """Values must have the type of their DEFAULT_PARAMS entry (float ones also take ints)"""
+        for name, value in params.items():
+            default = DEFAULT_PARAMS[name]
+            allowed = (int, float) if isinstance(default, float) else type(default)
+            if isinstance(value, bool) or not isinstance(value, allowed):
+                raise ValueError(f"Parameter {name} must be {type(default).__name__}, got {value!r}")
+
+
+    def update_indicators(self):
+        """Feed self.candle_data[-1] to the indicators"""
+        raise NotImplementedError
+
+
+    def check_signals(self):
+        """Trading logic for the latest closed candle"""
+        raise NotImplementedError
+
+
+    def prepare(self):
+        """Called once before the websocket starts (e.g. load trade IDs)"""
+
+
+    def on_start(self):
+        """Added to a runtime: prepare, announce and warm up on history"""
+        self.prepare()
+        self.print_banner()
+        self.load_historical_candles()
+
+
+    def print_banner(self):
+        print(f"\n🚀 [{self.label}] {type(self).__name__} on {self.symbol}")
+
+
+    def summary(self) -> str:
+        """One line for the shutdown report of run_shared()"""
+        return f"{self.name} trades: {self.trade_id - 1}"
+
+
+    # =========================================================================
+    # CANDLES
+    # =========================================================================
+
+    def load_historical_candles(self):
+        """Load recent candles from the API for immediate startup"""
+        min_candles = self.params['min_candles']
+        print(f"📥 [{self.label}] Loading historical candles...")
+
+        try:
+            now = int(time.time())
+            params = {
+                "symbol": self.symbol,
+                "resolution": str(self.timeframe),
+                "from": now - self.params['history_minutes'] * 60,
+                "to": now
+            }
+
+            r = requests.get(CANDLE_API, params=params, timeout=10)
+            js = r.json()
+
+            if "result" in js and js["result"].get("s") == "ok":
+                res = js["result"]
+
+                for i in range(len(res["t"])):
+                    self.candle_data.append({
+                        'timestamp': dt.datetime.fromtimestamp(res["t"][i]),
+                        'open': res["o"][i],
+                        'high': res["h"][i],
+                        'low': res["l"][i],
+                        'close': res["c"][i],
+                        'volume': res["v"][i]
+                    })
+                    self.update_indicators()
+
+                print(f"✅ [{self.label}] Loaded {len(self.candle_data)} historical candles!")
+                if len(self.candle_data) >= min_candles:
+                    print(f"🎯 Ready to trade immediately!\n")
+                else:
+                    print(f"⏳ Need {min_candles - len(self.candle_data)} more candles...\n")
+
+                return True
+            else:
+                print(f"⚠️  Could not load historical data, will build from live stream\n")
+                return False
+
+        except Exception as e:
+            print(f"⚠️  Error loading history: {e}")
+            print(f"📊 Will build candles from live stream instead\n")
+            return False
+
+
+    def on_tick(self, ticks: TickBatch):
+        """Mark the position book, heartbeat to show it's running"""
+        get_book().mark(self.symbol, float(ticks.price[-1]))
+
+        before = self.received_trade_count
+        self.received_trade_count += len(ticks)
+        every = self.params['heartbeat_every']
+        if every and self.received_trade_count // every > before // every:
+            print(f"\r⏳ [{self.label}] Monitoring... ${ticks.price[-1]:,.2f} ({self.received_trade_count} trades)", end="", flush=True)
+
+
+    # =========================================================================
+    # HOT PARAMETERS
+    # =========================================================================
+
+    def stage_params(self, overrides: dict):
+        """
+        Queue new parameters: overrides on top of the constructor params
+        (an empty dict restores them). Safe from any thread; they are
+        applied all together before the next closed candle.
+        """
+        self.check_param_names(overrides)
+        self.check_param_values(overrides)
+        self._staged_params = dict(overrides)
+
+
+    def apply_staged_params(self):
+        """Bar boundary: switch to the staged parameters, if any"""
+        staged, self._staged_params = self._staged_params, None
+        if staged is None:
+            return
+
+        params = {**self.base_params, **staged}
+        changed = {k for k in params if params[k] != self.params[k]}
+        if not changed:
+            return
+
+        old = self.params
+        try:
+            self.reconfigure(params, changed)
+        except (ValueError, TypeError) as e:
+            print(f"⚠️  [{self.label}] Parameter update rejected: {e}")
+            return
+        print(f"🔧 [{self.label}] Parameters updated: " +
+              ", ".join(f"{k} {old[k]} → {params[k]}" for k in sorted(changed)))
+
+
+    def reconfigure(self, params: dict, changed: set):
+        """
+        Switch to `params` (`changed` = keys that differ). Subclasses rebuild
+        what depends on the changed keys before calling this, raising
+        ValueError to reject the update while nothing has changed yet.
+        """
+        self.params = params
+        if len(self.candle_data) > params['max_candles']:
+            del self.candle_data[:-params['max_candles']]
+
+
+    def on_bar(self, timeframe, candle):
+        """Handle a closed candle: update indicators, check entry and exit"""
+        self.apply_staged_params()
+        min_candles = self.params['min_candles']
+
+        self.candle_data.append({
+            'timestamp': candle['timestamp'],
+            'open': candle['open'],
+            'high': candle['high'],
+            'low': candle['low'],
+            'close': candle['close'],
+            'volume': candle['volume']
+        })
+
+        # Show progress
+        candle_count = len(self.candle_data)
+        if candle_count % 10 == 0:
+            print(f"📊 [{self.label}] Collected {candle_count} candles... (need {min_candles} minimum)")
+
+        # Keep only the last max_candles in memory
+        if len(self.candle_data) > self.params['max_candles']:
+            self.candle_data.pop(0)
+
+        self.update_indicators()
+
+        if len(self.candle_data) >= min_candles:
+            if candle_count == min_candles:
+                print(f"\n✅ [{self.label}] Ready! Now scanning for trendline breakouts...\n")
+            self.check_signals()
+
+
+    def bar_close_time(self, candle) -> float:
+        """Epoch seconds at the end of a candle (the exit policies' clock)"""
+        return candle['timestamp'].timestamp() + self.timeframe * 60
+
+
+    def main(self):
+        """Run this instance on its own websocket (same entry point as the strategy modules)"""
+        run_shared([self])
+
+
+class TrendlineStrategy(CandleStrategy):
+    """Trendline breakout strategy with per-instance candle, position and trade state"""
+
+    def __init__(self, timeframe: int = 1, exit_policy: str = "fixed", directions=("LONG",),
+                 params: dict = None, trades_file: str = None, collection_name: str = None,
+                 symbol: str = SYMBOL):
+        """
+        Args:
+            timeframe: Candle interval in minutes (1-60)
+            exit_policy: "fixed" (stop + ATR target), "trailing" (breakeven + ATR trail)
+                or "ladder" (R-multiple target ladder locking profit in the stop)
+            directions: Any of "LONG" (descending line breakout) and "SHORT"
+                (ascending line breakdown)
+            params: Overrides for DEFAULT_PARAMS
+            trades_file: JSON trade log (default: trades_{timeframe}min.json here, or in
+                btc_trendline_trailing/ for trailing, trades_{timeframe}min_ladder.json
+                for ladder; with a _{symbol} suffix for symbols other than SYMBOL)
+            collection_name: MongoDB collection (default derived from policy/timeframe/symbol)
+            symbol: Exchange symbol
+        """
+        if exit_policy not in EXIT_POLICIES:
+            raise ValueError(f"Unknown exit policy: {exit_policy}")
+
+        label = f"{timeframe}m{POLICY_LABELS[exit_policy]}"
+        if symbol != SYMBOL:
+            label = f"{symbol} {label}"
+        super().__init__(timeframe, params, label, symbol)
+        self.exit_policy = exit_policy
+        self.directions = tuple(directions)
+
+        suffix = f"_{exit_policy}" if exit_policy != "fixed" else ""
+        sym = symbol_suffix(symbol)
+        self.name = f"trendline{suffix}_{timeframe}min{sym}"
+        log_dir = os.path.join(os.path.dirname(SCRIPT_DIR), "btc_trendline_trailing") if exit_policy == "trailing" else SCRIPT_DIR
+        file_suffix = "_ladder" if exit_policy == "ladder" else ""
+        self.trades_file = trades_file or os.path.join(log_dir, f"trades_{timeframe}min{file_suffix}{sym}.json")
+
+        # Initialize storage handler (JSON + MongoDB if configured)
+        self.storage = TradeStorage(
+            json_file=self.trades_file,
+            collection_name=collection_name or f'trendline{suffix}_trades_{timeframe}min{sym}'
+        )
+
+        p = self.params
+        self.trendline = TrendlineTracker(p['lookback_swing'], p['atr_length'], p['volume_ma_length'],
+                                          mode=p['trendline_mode'], pivots=p['trendline_pivots'])
+        self.exits = build_exit_engine(exit_policy, p)
+
+        # Trading state
+        self.position = None  # utils.exit_policies.OpenPosition
+        self.entry_time = None
+        self.trade_id = 1
+
+
+    def prepare(self):
+        # Load previous trades to get next ID
+        self.trade_id = self.storage.get_next_trade_id()
+
+
+    def update_indicators(self):
+        self.trendline.update(self.candle_data[-1], window=len(self.candle_data))
+
+
+    def reconfigure(self, params, changed):
+        # Only the indicators with changed settings are replayed, over the retained candles
+        settings = {TRACKER_PARAMS[k]: params[k] for k in changed if k in TRACKER_PARAMS}
+        trendline = self.trendline
+        if settings:
+            trendline = trendline.reconfigured(self.candle_data[-params['max_candles']:], **settings)
+        exits = build_exit_engine(self.exit_policy, params)
+
+        super().reconfigure(params, changed)
+        self.trendline = trendline
+        self.exits = exits
+
+
+    def check_signals(self):
+        # Check for entry signal if not in position
+        if self.position is None:
+            signal = self.check_entry_signal()
+            if signal:
+                self.open_position(signal)
+
+        # Check exit if in position
+        if self.position:
+            self.check_exit()
+
+
+    @property
+    def current_position(self):
+        """"LONG"/"SHORT" or None"""
+        return self.position.side if self.position else None
+
+
+    # =========================================================================
+    # TRADING
+    # =========================================================================
+
+    def check_entry_signal(self):
+        """
+        Check for trendline breakout/breakdown entry signals
+        Returns: dict with entry info (including direction) or None
+        """
+        p = self.params
+        if len(self.candle_data) < p['min_candles']:
+            return None
+
+        target_mult = p['target_atr_mult'] if self.exit_policy == "fixed" else None
+        return self.trendline.check_entry(p['volume_ma_mult'], p['atr_sl_mult'], target_mult,
+                                          allow_short="SHORT" in self.directions,
+                                          allow_long="LONG" in self.directions)
+
+
+    def open_position(self, signal):
+        """Open new position"""
+        self.position = pos = self.exits.open(signal['direction'], signal['entry_price'], signal['stop_loss'],
+                                              signal.get('target'), signal['atr'],
+                                              entry_time=self.bar_close_time(self.candle_data[-1]))
+        self.entry_time = dt.datetime.now()
+        get_book().open(self.name, self.symbol, pos.side, pos.entry_price,
+                        stop_loss=pos.stop, target=signal.get('target'))
+
+        is_long = pos.direction > 0
+        color = (Fore.GREEN if is_long else Fore.RED) if HAS_COLOR else ""
+        icon = "🟢" if is_long else "🔴"
+        kind = "BREAKOUT" if is_long else "BREAKDOWN"
+        policy = f" ({self.exit_policy.upper()})" if self.exit_policy != "fixed" else ""
+
+        print(f"\n{'='*80}")
+        print(f"{color}{icon} {pos.side} {kind}{policy} - POSITION #{self.trade_id} [{self.label}]{Style.RESET_ALL if HAS_COLOR else ''}")
+        print(f"{'='*80}")
+        print(f"⏰ Time: {self.entry_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"💰 Entry: ${pos.entry_price:,.2f}")
+        p = self.params
+        if self.exit_policy == "fixed":
+            print(f"🎯 Target: ${pos.target:,.2f} (ATR: {pos.atr:.2f})")
+            print(f"🛑 Stop: ${pos.stop:,.2f}")
+        elif self.exit_policy == "trailing":
+            print(f"🛑 Initial Stop: ${pos.stop:,.2f} (ATR: {pos.atr:.2f})")
+            print(f"📈 Trailing: Breakeven @ {p['breakeven_atr_mult']}x ATR, Trail @ {p['trail_start_atr_mult']}x ATR")
+        else:
+            print(f"🛑 Initial Stop: ${pos.stop:,.2f} (1R: ${pos.risk:,.2f})")
+            print(f"🎯 Ladder: {p['ladder_first_r']}R first, lock {p['ladder_lock_pct']*100:.0f}% per level")
+        print(f"{'='*80}\n")
+
+
+    def stop_moved(self, policy, old_stop, pos):
+        """ExitEngine callback: report and print a stop move"""
+        get_book().move_stop(self.name, pos.stop)
+        if isinstance(policy, Breakeven):
+            print(f"🔒 Stop moved to BREAKEVEN: ${pos.stop:,.2f} (was ${old_stop:,.2f})")
+        elif isinstance(policy, RLadder):
+            print(f"🎯 {pos.max_level:g}X HIT! Stop → ${pos.stop:,.2f} (was ${old_stop:,.2f})")
+        else:
+            print(f"📈 Trailing stop updated: ${pos.stop:,.2f} (was ${old_stop:,.2f}) | Best: ${pos.best:,.2f}")
+
+
+    def check_exit(self):
+        """Run the exit policies on the last candle"""
+        if not self.position:
+            return
+
+        current = self.candle_data[-1]
+        result = self.exits.update(self.position, current['high'], current['low'], current['close'],
+                                   now=self.bar_close_time(current), on_stop=self.stop_moved)
+        if result:
+            self.close_position(*result)
+
+
+    def close_position(self, exit_price, reason):
+        """Close position and log trade"""
+        pos = self.position
+        exit_time = dt.datetime.now()
+        duration = (exit_time - self.entry_time).total_seconds() / 60
+        is_long = pos.direction > 0
+
+        pnl = pos.direction * (exit_price - pos.entry_price)
+        pnl_pct = (pnl / pos.entry_price) * 100
+        is_win = pnl > 0
+
+        # Print
+        color = (Fore.GREEN if is_win else Fore.RED) if HAS_COLOR else ""
+        icon = "✅" if is_win else "❌"
+
+        print(f"\n{'='*80}")
+        print(f"{color}{icon} CLOSING {pos.side} #{self.trade_id} [{self.label}] - {reason}{Style.RESET_ALL if HAS_COLOR else ''}")
+        print(f"{'='*80}")
+        print(f"💰 Entry: ${pos.entry_price:,.2f}")
+        print(f"💰 Exit: ${exit_price:,.2f}")
+        if self.exit_policy == "trailing":
+            print(f"📊 {'Highest' if is_long else 'Lowest'}: ${pos.best:,.2f}")
+        elif self.exit_policy == "ladder":
+            print(f"🎯 Max level: {pos.max_level:g}R")
+        print(f"⏱️  Duration: {duration:.1f} min")
+        print(f"📊 P&L: {color}${pnl:+,.2f} ({pnl_pct:+.2f}%){Style.RESET_ALL if HAS_COLOR else ''}")
+        print(f"{'='*80}\n")
+
+        trade = {
+            'trade_id': self.trade_id,
+            'direction': pos.side,
+            'entry_time': self.entry_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'exit_time': exit_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'entry_price': pos.entry_price,
+            'exit_price': exit_price,
+            'stop_loss': pos.stop,
+        }
+        if self.exit_policy == "fixed":
+            trade['target'] = pos.target
+        elif self.exit_policy == "trailing":
+            trade['highest_price' if is_long else 'lowest_price'] = pos.best
+        else:
+            trade['max_target'] = pos.max_level
+        trade.update({
+            'duration_minutes': round(duration, 2),
+            'pnl': round(pnl, 2),
+            'pnl_pct': round(pnl_pct, 4),
+            'exit_reason': reason,
+            'is_win': is_win
+        })
+
+        # Save using unified storage (JSON + MongoDB if configured)
+        self.storage.save_trade(trade)
+        get_book().close(self.name, exit_price)
+
+        # Reset
+        self.position = None
+        self.entry_time = None
+        self.trade_id += 1
+
+
+    def print_banner(self):
+        p = self.params
+        policy = f" {self.exit_policy.upper()}" if self.exit_policy != "fixed" else ""
+        print(f"\n{'='*80}")
+        print(f"{Fore.CYAN if HAS_COLOR else ''}🚀 BITCOIN TRENDLINE BREAKOUT [{self.timeframe}-MIN{policy}]{Style.RESET_ALL if HAS_COLOR else ''}")
+        print(f"{'='*80}")
+        print(f"📊 Symbol: {self.symbol}")
+        print(f"⏱️  Timeframe: {self.timeframe} minute")
+        print(f"💾 Trades: {self.trades_file}")
+        print(f"\n📋 Strategy:")
+        if "LONG" in self.directions:
+            print(f"   - Descending trendline breakout")
+        if "SHORT" in self.directions:
+            print(f"   - Ascending trendline breakdown")
+        if self.exit_policy == "fixed":
+            print(f"   - ATR-based stops ({p['atr_sl_mult']}x)")
+            print(f"   - ATR-based targets ({p['target_atr_mult']}x)")
+        elif self.exit_policy == "trailing":
+            print(f"   - ATR-based initial stop ({p['atr_sl_mult']}x)")
+            print(f"   - Breakeven @ {p['breakeven_atr_mult']}x ATR profit")
+            print(f"   - Trailing @ {p['trail_start_atr_mult']}x ATR profit")
+            print(f"   - Trail distance: {p['trail_distance_atr_mult']}x ATR")
+        else:
+            print(f"   - ATR-based initial stop ({p['atr_sl_mult']}x) = 1R")
+            print(f"   - Target ladder from {p['ladder_first_r']}R, locking {p['ladder_lock_pct']*100:.0f}% per level")
+        if p['max_hold_minutes']:
+            print(f"   - Time exit after {p['max_hold_minutes']} min")
+        print(f"   - Volume confirmation ({p['volume_ma_mult']}x)")
+        print(f"\n⌨️  Press Ctrl+C to stop\n{'='*80}\n")
+
+
+def build_exit_engine(exit_policy: str, params: dict) -> ExitEngine:
+    """The ExitEngine for an exit policy name and strategy params"""
+    p = params
+    stop = StopLoss(STOP_REASONS[exit_policy])
+    if exit_policy == "fixed":
+        policies = [stop, FixedTarget("TARGET")]
+    elif exit_policy == "trailing":
+        policies = [Breakeven(p['breakeven_atr_mult']),
+                    AtrTrailing(p['trail_start_atr_mult'], p['trail_distance_atr_mult']),
+                    stop]
+    else:
+        policies = [stop, RLadder(p['ladder_first_r'], p['ladder_lock_pct'])]
+    if p['max_hold_minutes']:
+        policies.append(TimeExit(max_minutes=p['max_hold_minutes']))
+    return ExitEngine(*policies)
+
+
+def run_shared(strategies, batch_interval: float = 0.0, params_file: str = None):
+    """
+    Run several CandleStrategy instances (TrendlineStrategy, VariantBatch)
+    on one websocket connection
+
+    A single Runtime shards them by symbol, builds the candles once per
+    symbol and timeframe and dispatches them to every instance; the feed
+    subscribes to all their symbols at once. batch_interval > 0 buffers
+    trades for that many seconds per dispatch. With params_file, parameter
+    changes in that JSON file (utils.param_config) apply while running.
+    """
+    runtime = Runtime(strategies)
+    feed = LiveFeed(runtime, runtime.symbols, batch_interval=batch_interval)
+    watcher = watch(strategies, params_file) if params_file else None
+
+    names = ", ".join(s.name for s in strategies)
+    print(f"🚀 Starting Bitcoin Trendline Strategy: {names}...")
+
+    try:
+        feed.run()
+
+    except KeyboardInterrupt:
+        print(f"\n\n{'='*80}")
+        print(f"⏹️  Strategy stopped")
+        for strategy in strategies:
+            print(f"📊 {strategy.summary()}")
+        print(f"{'='*80}\n")
+
+    finally:
+        if watcher:
+            watcher.stop()
+
+
+if __name__ == "__main__":
+    # Example: 1-min fixed-target and trailing variants, plus ETHUSD, on one connection
+    run_shared([
+        TrendlineStrategy(1, "fixed", directions=("LONG", "SHORT")),
+        TrendlineStrategy(1, "trailing", trades_file=os.path.join(
+            os.path.dirname(SCRIPT_DIR), "btc_trendline_trailing", "trades_1min.json")),
+        TrendlineStrategy(1, "fixed", directions=("LONG", "SHORT"), symbol="ETHUSD"),
+    ])
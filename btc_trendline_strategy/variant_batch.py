@@ -0,0 +1,327 @@
+"""
+Trendline Variant Batch - paper-trade a whole parameter grid on one feed
+One bar close evaluates every variant: the swing/ATR/volume indicators run
+once per distinct indicator setting (one TrendlineTracker each), and the
+entry filters run as NumPy operations across the variant axis, and the
+exits are one utils.exit_policies engine evaluated with update_many()
+over all variants (fixed, trailing and ladder variants mixed, the unused
+policies disabled per variant). Each variant writes to its own trade storage.
+"""
+import os
+import sys
+import json
+import itertools
+import datetime as dt
+from typing import Dict, List
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+from utils.exit_policies import AtrTrailing, Breakeven, ExitEngine, FixedTarget, PositionArray, RLadder, StopLoss, TimeExit
+from utils.trade_storage import TradeStorage
+from utils.trendline import TrendlineTracker
+from btc_trendline_strategy.trendline_strategy import (
+    CandleStrategy, EXIT_POLICIES, STOP_REASONS, SYMBOL, run_shared, symbol_suffix
+)
+
+# Parameters that may differ between variants
+INDICATOR_KEYS = ('lookback_swing', 'atr_length', 'volume_ma_length', 'trendline_mode', 'trendline_pivots')
+MULTIPLIER_KEYS = ('volume_ma_mult', 'atr_sl_mult', 'target_atr_mult',
+                   'breakeven_atr_mult', 'trail_start_atr_mult', 'trail_distance_atr_mult',
+                   'ladder_first_r', 'ladder_lock_pct')
+VARIANT_KEYS = INDICATOR_KEYS + MULTIPLIER_KEYS + ('exit_policy',)
+
+VARIANTS_DIR = os.path.join(SCRIPT_DIR, "variants")
+
+
+def expand_grid(grid: Dict[str, list]) -> List[Dict]:
+    """{'atr_sl_mult': [0.5, 1.0], 'exit_policy': ['fixed', 'trailing']} -> 4 variant dicts"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+class VariantBatch(CandleStrategy):
+    """Many TrendlineStrategy parameter sets evaluated together per bar"""
+
+    def __init__(self, timeframe: int = 1, variants: List[Dict] = None, grid: Dict[str, list] = None,
+                 directions=("LONG",), params: dict = None, trades_dir: str = None,
+                 symbol: str = SYMBOL):
+        """
+        Args:
+            timeframe: Candle interval in minutes (1-60)
+            variants: List of per-variant overrides (keys from VARIANT_KEYS)
+            grid: Alternative to `variants`, expanded with expand_grid()
+            directions: "LONG" and/or "SHORT", shared by all variants
+            params: Batch-wide overrides for DEFAULT_PARAMS (min_candles, ...)
+            trades_dir: Folder for the per-variant JSON trade logs
+            symbol: Exchange symbol
+        """
+        label = f"{timeframe}m-BATCH" if symbol == SYMBOL else f"{symbol} {timeframe}m-BATCH"
+        super().__init__(timeframe, params, label, symbol)
+        sym = symbol_suffix(symbol)
+        self.name = f"trendline_variants_{timeframe}min{sym}"
+        self.directions = tuple(directions)
+
+        variants = list(variants or []) + (expand_grid(grid) if grid else [])
+        if not variants:
+            raise ValueError("VariantBatch needs at least one variant")
+        for v in variants:
+            unknown = set(v) - set(VARIANT_KEYS)
+            if unknown:
+                raise ValueError(f"Unknown variant parameters: {sorted(unknown)}")
+            if v.get('exit_policy', 'fixed') not in EXIT_POLICIES:
+                raise ValueError(f"Unknown exit policy: {v['exit_policy']}")
+
+        # Full parameter set of every variant
+        self.variants = [{'exit_policy': 'fixed', **{k: self.params[k] for k in INDICATOR_KEYS + MULTIPLIER_KEYS}, **v}
+                         for v in variants]
+        self.variant_names = [f"v{i:03d}" for i in range(len(self.variants))]
+        n = len(self.variants)
+
+        # One tracker per distinct indicator setting
+        self.trackers = []
+        tracker_index = {}
+        self.group = np.empty(n, dtype=np.int64)
+        for i, v in enumerate(self.variants):
+            key = tuple(v[k] for k in INDICATOR_KEYS)
+            if key not in tracker_index:
+                tracker_index[key] = len(self.trackers)
+                self.trackers.append(TrendlineTracker(v['lookback_swing'], v['atr_length'], v['volume_ma_length'],
+                                                      mode=v['trendline_mode'], pivots=v['trendline_pivots']))
+            self.group[i] = tracker_index[key]
+
+        # Per-variant parameters as arrays
+        column = lambda key: np.array([v[key] for v in self.variants], dtype=float)
+        self.volume_ma_mult = column('volume_ma_mult')
+        self.atr_sl_mult = column('atr_sl_mult')
+        self.target_atr_mult = column('target_atr_mult')
+        self.breakeven_atr_mult = column('breakeven_atr_mult')
+        self.trail_start_atr_mult = column('trail_start_atr_mult')
+        self.trail_distance_atr_mult = column('trail_distance_atr_mult')
+        self.ladder_first_r = column('ladder_first_r')
+        self.ladder_lock_pct = column('ladder_lock_pct')
+        self.policy = np.array([v['exit_policy'] for v in self.variants])
+        self.trailing = self.policy == 'trailing'
+        self.exits = self._build_exits(self.params)
+        self.stop_reasons = [STOP_REASONS[v['exit_policy']] for v in self.variants]
+        self.target_atr_mult = np.where(self.policy == 'fixed', self.target_atr_mult, np.nan)
+
+        # Per-variant position state (direction: +1 LONG, -1 SHORT, 0 flat)
+        self.state = PositionArray(n)
+        self.entry_time = [None] * n
+        self.trade_id = np.ones(n, dtype=np.int64)
+
+        # Each variant gets its own storage stream
+        self.trades_dir = trades_dir or VARIANTS_DIR
+        os.makedirs(self.trades_dir, exist_ok=True)
+        self.storages = [
+            TradeStorage(
+                json_file=os.path.join(self.trades_dir, f"trades_{timeframe}min{sym}_{name}.json"),
+                collection_name=f"trendline_variants_{timeframe}min{sym}_{name}"
+            )
+            for name in self.variant_names
+        ]
+        self._write_manifest()
+
+
+    def _build_exits(self, params) -> ExitEngine:
+        """
+        Every variant's rule set in one engine; an infinite threshold switches a policy
+        off for the variants that do not use it (same order as build_exit_engine)
+        """
+        ladder = self.policy == 'ladder'
+        policies = [Breakeven(np.where(self.trailing, self.breakeven_atr_mult, np.inf)),
+                    AtrTrailing(np.where(self.trailing, self.trail_start_atr_mult, np.inf),
+                                self.trail_distance_atr_mult),
+                    StopLoss(),
+                    RLadder(np.where(ladder, self.ladder_first_r, np.inf), self.ladder_lock_pct),
+                    FixedTarget("TARGET")]
+        if params['max_hold_minutes']:
+            policies.append(TimeExit(max_minutes=params['max_hold_minutes']))
+        return ExitEngine(*policies)
+
+
+    @property
+    def stop_policy(self) -> int:
+        """Index of the StopLoss in the exit engine (update_many() exit code of a stop-out)"""
+        return next(k for k, policy in enumerate(self.exits.policies) if isinstance(policy, StopLoss))
+
+
+    def reconfigure(self, params, changed):
+        # The variant parameters were expanded at construction, only batch-wide ones change live
+        fixed = sorted(changed & set(VARIANT_KEYS))
+        if fixed:
+            raise ValueError(f"{fixed} are variant parameters, change the grid and restart")
+        exits = self._build_exits(params)
+        super().reconfigure(params, changed)
+        self.exits = exits
+
+
+    def _write_manifest(self):
+        """variants_{tf}min.json: variant name -> parameters, to read the trade logs back"""
+        manifest = {name: v for name, v in zip(self.variant_names, self.variants)}
+        with open(os.path.join(self.trades_dir, f"variants_{self.timeframe}min{symbol_suffix(self.symbol)}.json"), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+
+    def prepare(self):
+        # Load previous trades to get next ID per variant
+        for i, storage in enumerate(self.storages):
+            self.trade_id[i] = storage.get_next_trade_id()
+
+
+    def update_indicators(self):
+        candle = self.candle_data[-1]
+        window = len(self.candle_data)
+        for tracker in self.trackers:
+            tracker.update(candle, window=window)
+
+
+    def check_signals(self):
+        candle = self.candle_data[-1]
+        self._check_entries(candle)
+        self._check_exits(candle)
+
+
+    def _check_entries(self, candle):
+        """Open positions for every flat variant whose filters pass"""
+        flat = self.state.direction == 0
+        if not flat.any():
+            return
+
+        # Multiplier-free part, once per tracker
+        g = len(self.trackers)
+        g_direction = np.zeros(g, dtype=np.int64)
+        g_ref = np.zeros(g)
+        g_atr = np.full(g, np.nan)
+        g_volume_ma = np.full(g, np.nan)
+        allow_long = "LONG" in self.directions
+        allow_short = "SHORT" in self.directions
+        for k, tracker in enumerate(self.trackers):
+            cross = tracker.breakout(allow_long, allow_short)
+            if cross is None:
+                continue
+            g_direction[k] = 1 if cross[0] == 'LONG' else -1
+            g_ref[k] = cross[1]
+            if tracker.atr is not None:
+                g_atr[k] = tracker.atr
+            if tracker.volume_ma is not None:
+                g_volume_ma[k] = tracker.volume_ma
+
+        if not g_direction.any():
+            return
+
+        # Filters and levels across variants
+        direction = g_direction[self.group]
+        atr = g_atr[self.group]
+        volume_ma = g_volume_ma[self.group]
+        volume_ok = np.isnan(volume_ma) | (candle['volume'] > self.volume_ma_mult * volume_ma)
+        with np.errstate(invalid='ignore'):
+            atr_ok = atr > 0
+        enter = flat & (direction != 0) & volume_ok & atr_ok
+        if not enter.any():
+            return
+
+        close = candle['close']
+        now = dt.datetime.now()
+        idx = np.flatnonzero(enter)
+        d = direction[idx]
+        self.exits.open_many(self.state, idx, d, close,
+                             stop=g_ref[self.group[idx]] - d * self.atr_sl_mult[idx] * atr[idx],
+                             target=close + d * self.target_atr_mult[idx] * atr[idx],
+                             atr=atr[idx], entry_time=self.bar_close_time(candle))
+        s = self.state
+        for i in idx:
+            self.entry_time[i] = now
+            side = "LONG" if s.direction[i] > 0 else "SHORT"
+            levels = f"stop ${s.stop[i]:,.2f}" + ("" if np.isnan(s.target[i]) else f", target ${s.target[i]:,.2f}")
+            print(f"{'🟢' if side == 'LONG' else '🔴'} [{self.label} {self.variant_names[i]}] {side} #{self.trade_id[i]} @ ${close:,.2f} ({levels})")
+
+
+    def _check_exits(self, candle):
+        """Run the exit engine over every open variant"""
+        if not self.state.direction.any():
+            return
+
+        exited, price, code = self.exits.update_many(self.state, candle['high'], candle['low'], candle['close'],
+                                                     now=self.bar_close_time(candle))
+        stop_policy = self.stop_policy
+        for i in np.flatnonzero(exited):
+            if code[i] == stop_policy:
+                reason = self.stop_reasons[i].format(max_level=self.state.max_level[i])
+            else:
+                reason = self.exits.reason(code[i], self.state.max_level[i])
+            self._close(i, price[i], reason)
+
+
+    def _close(self, i, exit_price, reason):
+        """Log and store one variant's trade, then flatten it"""
+        exit_time = dt.datetime.now()
+        duration = (exit_time - self.entry_time[i]).total_seconds() / 60
+        s = self.state
+        is_long = s.direction[i] > 0
+        entry_price = float(s.entry_price[i])
+        exit_price = float(exit_price)
+
+        pnl = exit_price - entry_price if is_long else entry_price - exit_price
+        pnl_pct = (pnl / entry_price) * 100
+        is_win = pnl > 0
+
+        trade = {
+            'trade_id': int(self.trade_id[i]),
+            'variant': self.variant_names[i],
+            'direction': 'LONG' if is_long else 'SHORT',
+            'entry_time': self.entry_time[i].strftime('%Y-%m-%d %H:%M:%S'),
+            'exit_time': exit_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'stop_loss': float(s.stop[i]),
+        }
+        if self.policy[i] == 'fixed':
+            trade['target'] = float(s.target[i])
+        elif self.policy[i] == 'trailing':
+            trade['highest_price' if is_long else 'lowest_price'] = float(s.best[i])
+        else:
+            trade['max_target'] = float(s.max_level[i])
+        trade.update({
+            'duration_minutes': round(duration, 2),
+            'pnl': round(pnl, 2),
+            'pnl_pct': round(pnl_pct, 4),
+            'exit_reason': reason,
+            'is_win': is_win
+        })
+
+        print(f"{'✅' if is_win else '❌'} [{self.label} {self.variant_names[i]}] CLOSING {trade['direction']} "
+              f"#{trade['trade_id']} - {reason} | P&L ${pnl:+,.2f} ({pnl_pct:+.2f}%)")
+        self.storages[i].save_trade(trade)
+
+        s.close(i)
+        self.entry_time[i] = None
+        self.trade_id[i] += 1
+
+
+    def print_banner(self):
+        print(f"\n{'='*80}")
+        print(f"🚀 BITCOIN TRENDLINE VARIANT BATCH [{self.timeframe}-MIN]")
+        print(f"{'='*80}")
+        print(f"📊 Symbol: {self.symbol}")
+        print(f"🧪 Variants: {len(self.variants)} ({len(self.trackers)} indicator sets)")
+        print(f"💾 Trades: {self.trades_dir}")
+        print(f"{'='*80}\n")
+
+
+    def summary(self) -> str:
+        return f"{self.name} trades: {int(np.sum(self.trade_id - 1))} across {len(self.variants)} variants"
+
+
+if __name__ == "__main__":
+    # Example: 5-min grid of stops, targets and exit policies on one connection
+    run_shared([
+        VariantBatch(5, grid={
+            'lookback_swing': [3, 5],
+            'atr_sl_mult': [0.5, 1.0],
+            'target_atr_mult': [2.0, 3.0],
+            'exit_policy': ['fixed', 'trailing'],
+        })
+    ])
@@ -2,7 +2,7 @@
 Web Dashboard for Trading Strategies Monitoring
 Shows real-time status, logs, and trade history
 """
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
 import os
 import sys
@@ -15,6 +15,7 @@ from collections import deque
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from utils.trade_storage import TradeStorage
+from utils.monte_carlo import strategy_stats
 
 app = Flask(__name__)
 CORS(app)
@@ -53,9 +54,16 @@ def get_status():
     })
 
 
+def _trade_query():
+    """since / until / limit arguments of /api/trades"""
+    return {'since': request.args.get('since'), 'until': request.args.get('until'),
+            'limit': request.args.get('limit', type=int)}
+
+
 @app.route('/api/trades')
 def get_trades():
-    """Get all trades from all strategies"""
+    """Get all trades from all strategies (?since=&until= exit-time range, ?limit= most recent N)"""
+    query = _trade_query()
     trades = {
         "trendline_1min": [],
         "trendline_5min": [],
@@ -73,14 +81,14 @@ def get_trades():
                 json_file=os.path.join(script_dir, f'btc_trendline_strategy/trades_{timeframe}min.json'),
                 collection_name=f'trendline_trades_{timeframe}min'
             )
-            trades[f'trendline_{timeframe}min'] = storage.load_trades()
+            trades[f'trendline_{timeframe}min'] = storage.query_trades(**query)
         
         # Volume trades
         storage = TradeStorage(
             json_file=os.path.join(script_dir, 'volume_strategy/trades_1min.json'),
             collection_name='volume_trades_1min'
         )
-        trades['volume_1min'] = storage.load_trades()
+        trades['volume_1min'] = storage.query_trades(**query)
         
     except Exception as e:
         print(f"Error loading trades: {e}")
@@ -109,7 +117,7 @@ def get_stats():
                 json_file=os.path.join(script_dir, json_file),
                 collection_name=collection
             )
-            stats[name] = storage.get_stats()
+            stats[name] = strategy_stats(storage)
     
     except Exception as e:
         print(f"Error loading stats: {e}")
@@ -7,22 +7,24 @@ import time
 import sys
 import os
 import json
+import importlib
 from datetime import datetime
 from collections import deque
 
 # Flask for web dashboard
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
 
 # Add current directory to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
 
-# Import strategies
-from btc_trendline_strategy import btc_trendline_5min, btc_trendline_15min, btc_trendline_60min
-from btc_trendline_trailing import btc_trendline_trailing_1min, btc_trendline_trailing_5min, btc_trendline_trailing_15min, btc_trendline_trailing_60min
-from volume_strategy import live_strategy, live_strategy_5min
-from Live_option_Test import test_trade_strategy, rsi_live_options_trader
-from utils.trade_storage import TradeStorage
+# Strategies are imported lazily from the STRATEGIES registry below
+from utils.trade_storage import TradeStorage, get_connection
+from utils.monte_carlo import strategy_stats
+from utils.position_book import get_book
+from utils.param_config import ParamWatcher
+from utils import kernels
 
 # ============================================================================
 # WEB DASHBOARD (Flask App)
@@ -97,8 +99,23 @@ def index():
 @app.route('/api/status')
 def get_status():
     """Get current status of all strategies"""
+    book = get_book()
+    for name, status in strategy_status.items():
+        key = position_key(name)
+        status["position"] = book.position(key) if key else None
+    
     return jsonify({
         "strategies": strategy_status,
+        "exposure": book.totals(),
+        "storage": get_connection().status(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/api/positions')
+def get_positions():
+    """Open positions, per-symbol exposure and totals from the position book"""
+    return jsonify({
+        **get_book().snapshot(),
         "timestamp": datetime.now().isoformat()
     })
 
@@ -117,9 +134,15 @@ def get_server_ip():
     except Exception as e:
         return jsonify({"error": str(e)})
 
+def _trade_query():
+    """since / until / limit arguments of /api/trades"""
+    return {'since': request.args.get('since'), 'until': request.args.get('until'),
+            'limit': request.args.get('limit', type=int)}
+
 @app.route('/api/trades')
 def get_trades():
-    """Get all trades from all strategies"""
+    """Get all trades from all strategies (?since=&until= exit-time range, ?limit= most recent N)"""
+    query = _trade_query()
     trades = {
         "rsi_options": [],
         "trendline_1min": [],
@@ -141,7 +164,7 @@ def get_trades():
             json_file=os.path.join(script_dir, 'Live_option_Test/rsi_live_trades.json'),
             collection_name='rsi_options_trades'
         )
-        trades['rsi_options'] = rsi_storage.load_trades()
+        trades['rsi_options'] = rsi_storage.query_trades(**query)
         
         # Trendline trades
         for timeframe in ['1', '5', '15', '60']:
@@ -149,7 +172,7 @@ def get_trades():
                 json_file=os.path.join(script_dir, f'btc_trendline_strategy/trades_{timeframe}min.json'),
                 collection_name=f'trendline_trades_{timeframe}min'
             )
-            trades[f'trendline_{timeframe}min'] = storage.load_trades()
+            trades[f'trendline_{timeframe}min'] = storage.query_trades(**query)
         
         # Trailing stop trades
         for timeframe in ['1', '5', '15', '60']:
@@ -157,14 +180,14 @@ def get_trades():
                 json_file=os.path.join(script_dir, f'btc_trendline_trailing/trades_{timeframe}min.json'),
                 collection_name=f'trendline_trailing_trades_{timeframe}min'
             )
-            trades[f'trendline_{timeframe}min_trailing'] = storage.load_trades()
+            trades[f'trendline_{timeframe}min_trailing'] = storage.query_trades(**query)
         
         # Volume trades
         storage = TradeStorage(
             json_file=os.path.join(script_dir, 'volume_strategy/trades_1min.json'),
             collection_name='volume_trades_1min'
         )
-        trades['volume_1min'] = storage.load_trades()
+        trades['volume_1min'] = storage.query_trades(**query)
         
     except Exception as e:
         print(f"Error loading trades: {e}")
@@ -197,7 +220,7 @@ def get_stats():
                 json_file=os.path.join(script_dir, json_file),
                 collection_name=collection
             )
-            stats[name] = storage.get_stats()
+            stats[name] = strategy_stats(storage)
     
     except Exception as e:
         print(f"Error loading stats: {e}")
@@ -261,78 +284,165 @@ def run_dashboard(host='0.0.0.0', port=5000):
 # TRADING STRATEGIES MANAGER
 # ============================================================================
 
-# Strategy configuration - set to True to enable
+# Hot parameters: {strategy.name: {param: value}}, applied at the next bar
+# without restarting (see utils/param_config.py)
+PARAMS_FILE = os.environ.get('STRATEGY_PARAMS_FILE', os.path.join(BASE_DIR, 'strategy_params.json'))
+param_watcher = ParamWatcher(PARAMS_FILE)
+
+# Strategy registry - set "enabled" to True to enable
+#   "target": "package.module"       -> module with a main() function
+#             "package.module:Class" -> Class(**params), instance with a main() method
+#   "params": constructor kwargs (class targets only)
+# Nothing is imported until the strategy's thread starts, so disabled
+# strategies cost nothing and a broken one cannot break startup.
 STRATEGIES = {
     # ========== RSI OPTIONS STRATEGY (ACTIVE) ==========
     "RSI Options Trader": {
         "enabled": True,
-        "module": rsi_live_options_trader
+        "target": "Live_option_Test.rsi_live_options_trader"
     },
     
     # ========== TRENDLINE STRATEGIES (ACTIVE) ==========
     "BTC Trendline 5-min": {
         "enabled": True,
-        "module": btc_trendline_5min
+        "target": "btc_trendline_strategy.btc_trendline_5min"
     },
     "BTC Trendline 15-min": {
         "enabled": True,
-        "module": btc_trendline_15min
+        "target": "btc_trendline_strategy.btc_trendline_15min"
     },
     "BTC Trendline 60-min": {
         "enabled": True,
-        "module": btc_trendline_60min
+        "target": "btc_trendline_strategy.btc_trendline_60min"
     },
     
     # ========== TRAILING STOP STRATEGIES (ACTIVE) ==========
     "Trendline 1-min_trailing": {
         "enabled": True,
-        "module": btc_trendline_trailing_1min
+        "target": "btc_trendline_trailing.btc_trendline_trailing_1min"
     },
     "Trendline 5-min_trailing": {
         "enabled": True,
-        "module": btc_trendline_trailing_5min
+        "target": "btc_trendline_trailing.btc_trendline_trailing_5min"
     },
     "Trendline 15-min_trailing": {
         "enabled": True,
-        "module": btc_trendline_trailing_15min
+        "target": "btc_trendline_trailing.btc_trendline_trailing_15min"
     },
     "Trendline 60-min_trailing": {
         "enabled": True,
-        "module": btc_trendline_trailing_60min
+        "target": "btc_trendline_trailing.btc_trendline_trailing_60min"
     },
     
     # ========== DISABLED STRATEGIES ==========
+    "BTC Trendline 1-min (LONG/SHORT)": {
+        "enabled": False,
+        "target": "btc_trendline_strategy.btc_trendline_1min"
+    },
+    "Trendline 5-min multi-pivot": {
+        "enabled": False,
+        "target": "btc_trendline_strategy.trendline_strategy:TrendlineStrategy",
+        "params": {
+            "timeframe": 5,
+            "exit_policy": "fixed",
+            "params": {"trendline_mode": "multi_pivot"},
+            "trades_file": os.path.join(BASE_DIR, "btc_trendline_strategy", "trades_5min_multi_pivot.json"),
+            "collection_name": "trendline_multi_pivot_trades_5min"
+        }
+    },
+    "Trendline 5-min variant batch": {
+        "enabled": False,
+        "target": "btc_trendline_strategy.variant_batch:VariantBatch",
+        "params": {
+            "timeframe": 5,
+            "grid": {
+                "atr_sl_mult": [0.5, 1.0],
+                "target_atr_mult": [2.0, 3.0],
+                "exit_policy": ["fixed", "trailing"]
+            }
+        }
+    },
+    "Trendline 5-min multi-symbol": {
+        "enabled": False,
+        "target": "utils.market_feed:ProcessShards",
+        "params": {
+            # One websocket for all symbols, one shard per symbol, 2 worker processes
+            "specs": [
+                {
+                    "target": "btc_trendline_strategy.trendline_strategy:TrendlineStrategy",
+                    "params": {"timeframe": 5, "exit_policy": policy, "symbol": symbol}
+                }
+                for symbol in ("ETHUSD", "SOLUSD", "XRPUSD")
+                for policy in ("fixed", "trailing")
+            ],
+            "workers": 2,
+            "params_file": PARAMS_FILE
+        }
+    },
     "Test Trade Strategy": {
         "enabled": False,
-        "module": test_trade_strategy
+        "target": "Live_option_Test.test_trade_strategy"
     },
     "Volume Strategy 1-min": {
         "enabled": False,
-        "module": live_strategy
+        "target": "volume_strategy.live_strategy"
     },
     "Volume Strategy 5-min": {
         "enabled": False,
-        "module": live_strategy_5min
+        "target": "volume_strategy.live_strategy_5min"
     }
 }
 
+# Imported/built strategies by name (kept across restarts, like module state)
+loaded_strategies = {}
+
+
+def load_strategy(name):
+    """Import and build a registered strategy on first use"""
+    if name not in loaded_strategies:
+        config = STRATEGIES[name]
+        module_path, _, attr = config["target"].partition(":")
+        if config.get("params") and not attr:
+            raise ValueError(f"{name}: params need a 'module:Class' target")
+        
+        strategy = importlib.import_module(module_path)
+        if attr:
+            strategy = getattr(strategy, attr)(**config.get("params", {}))
+        loaded_strategies[name] = strategy
+    
+    return loaded_strategies[name]
+
+
+def position_key(name):
+    """Position book key of a loaded strategy: its name, or its module's strategy.name / STRATEGY_NAME"""
+    strategy = loaded_strategies.get(name)
+    strategy = getattr(strategy, 'strategy', strategy)
+    return getattr(strategy, 'name', None) or getattr(strategy, 'STRATEGY_NAME', None)
 
-def run_strategy(name, module):
-    """Run a single strategy with automatic restart on failure"""
+
+def run_strategy(name):
+    """Load and run a single strategy with automatic restart on failure"""
     retry_count = 0
     max_retries = 100
     
-    # Set up dashboard logger for RSI Options Trader
-    if name == "RSI Options Trader" and hasattr(module, 'set_dashboard_logger'):
-        module.set_dashboard_logger(log_to_dashboard)
-    
     while retry_count < max_retries:
         try:
             msg = f"Starting {name}..."
             print(f"[{datetime.now().strftime('%H:%M:%S')}] 🚀 {msg}")
             log_to_dashboard(name, msg, "info")
             
-            module.main()
+            strategy = load_strategy(name)
+            
+            # Strategy instances (or a module's `strategy`) that take hot parameters
+            instance = getattr(strategy, 'strategy', strategy)
+            if hasattr(instance, 'stage_params'):
+                param_watcher.register(instance)
+            
+            # Set up dashboard logger for strategies that support it (RSI Options Trader)
+            if hasattr(strategy, 'set_dashboard_logger'):
+                strategy.set_dashboard_logger(log_to_dashboard)
+            
+            strategy.main()
             
         except KeyboardInterrupt:
             msg = f"Stopped by user"
@@ -369,6 +479,7 @@ def main():
     print("🤖 TRADING STRATEGIES + WEB DASHBOARD")
     print("=" * 80)
     print(f"⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"⚙️  Kernel backend: {kernels.describe_backend()}")
     
     # Get and display server IP for Delta Exchange whitelisting
     try:
@@ -391,6 +502,9 @@ def main():
     )
     dashboard_thread.start()
     
+    param_watcher.start()
+    print(f"🔧 Hot parameters: {PARAMS_FILE}")
+    
     # Heartbeat logger disabled to reduce log noise
     # heartbeat_thread = threading.Thread(
     #     target=heartbeat_logger,
@@ -412,7 +526,7 @@ def main():
             # Start each strategy in its own thread
             thread = threading.Thread(
                 target=run_strategy,
-                args=(name, config["module"]),
+                args=(name,),
                 daemon=True,
                 name=name
             )
@@ -444,11 +558,10 @@ def main():
                     name = thread.name
                     print(f"\n[{datetime.now().strftime('%H:%M:%S')}] ⚠️  {name} died, restarting...")
                     
-                    strategy_config = STRATEGIES.get(name)
-                    if strategy_config:
+                    if name in STRATEGIES:
                         new_thread = threading.Thread(
                             target=run_strategy,
-                            args=(name, strategy_config["module"]),
+                            args=(name,),
                             daemon=True,
                             name=name
                         )
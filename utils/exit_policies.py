@@ -0,0 +1,449 @@
+"""
+Composable exit policies for open positions
+
+An ExitEngine runs an ordered list of policies on every update (a closed
+bar, or a single price for tick/poll based strategies). Policies either
+move the stop (Breakeven, AtrTrailing, RLadder) or close the position
+(StopLoss, FixedTarget, TimeExit, SignalExit); the first exit wins, so
+the order decides e.g. whether a bar's stop is ratcheted before it is
+tested. All policies work for LONG and SHORT.
+
+Each policy has a scalar update() - O(1) per open position, for the live
+strategies - and an update_many() over a PositionArray that evaluates
+any number of positions with NumPy (variant batches, backtests). Policy
+parameters may be per-position arrays in update_many(). Both paths give
+identical results, check with: python -m utils.exit_policies
+
+The strategies' rule sets:
+    trendline fixed:    StopLoss(), FixedTarget()
+    trendline trailing: Breakeven(1.0), AtrTrailing(2.0, 1.0), StopLoss("TRAILING_STOP")
+    RSI options ladder: StopLoss("TRAIL_SL_{max_level:g}X", fill="close"), RLadder(2, 0.6)
+    volume strategy:    FixedTarget("TAKE_PROFIT"), StopLoss(), SignalExit(reversal), TimeExit(30)
+"""
+import time
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+
+class OpenPosition:
+    """One open position as the exit policies see it"""
+
+    def __init__(self, direction, entry_price: float, stop: float, target: Optional[float] = None,
+                 atr: Optional[float] = None, entry_time: Optional[float] = None):
+        """
+        Args:
+            direction: "LONG"/"SHORT" (or +1/-1)
+            entry_price: Fill price
+            stop: Initial stop (its distance from entry is the 1R risk)
+            target: Fixed target, None for none
+            atr: ATR at entry (for ATR based policies)
+            entry_time: Epoch seconds (default: now)
+        """
+        self.direction = 1 if direction in ("LONG", 1) else -1
+        self.entry_price = float(entry_price)
+        self.stop = float(stop)
+        self.initial_stop = float(stop)
+        self.target = np.nan if target is None else float(target)
+        self.atr = np.nan if atr is None else float(atr)
+        self.entry_time = time.time() if entry_time is None else float(entry_time)
+        self.risk = abs(self.entry_price - self.stop)
+        self.best = self.entry_price   # Highest high (LONG) / lowest low (SHORT)
+        self.level = 0.0               # Next ladder level (R multiple)
+        self.max_level = 0.0           # Last ladder level reached
+        self.bars = 0                  # Updates since entry
+
+    @property
+    def side(self) -> str:
+        return "LONG" if self.direction > 0 else "SHORT"
+
+    def tighter(self, new_stop: float) -> bool:
+        return new_stop > self.stop if self.direction > 0 else new_stop < self.stop
+
+
+class PositionArray:
+    """Any number of positions as parallel arrays (direction 0 = slot is flat)"""
+
+    def __init__(self, size: int):
+        self.direction = np.zeros(size, dtype=np.int64)
+        self.entry_price = np.zeros(size)
+        self.stop = np.zeros(size)
+        self.initial_stop = np.zeros(size)
+        self.target = np.full(size, np.nan)
+        self.atr = np.full(size, np.nan)
+        self.entry_time = np.zeros(size)
+        self.risk = np.zeros(size)
+        self.best = np.zeros(size)
+        self.level = np.zeros(size)
+        self.max_level = np.zeros(size)
+        self.bars = np.zeros(size, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.direction)
+
+    def open(self, idx, direction, entry_price, stop, target=np.nan, atr=np.nan, entry_time=None):
+        """Open positions in slots idx (scalars broadcast)"""
+        self.direction[idx] = direction
+        self.entry_price[idx] = entry_price
+        self.stop[idx] = stop
+        self.initial_stop[idx] = stop
+        self.target[idx] = target
+        self.atr[idx] = atr
+        self.entry_time[idx] = time.time() if entry_time is None else entry_time
+        self.risk[idx] = np.abs(self.entry_price[idx] - self.stop[idx])
+        self.best[idx] = self.entry_price[idx]
+        self.level[idx] = 0.0
+        self.max_level[idx] = 0.0
+        self.bars[idx] = 0
+
+    def close(self, idx):
+        self.direction[idx] = 0
+        self.target[idx] = np.nan
+
+
+def _tighter_many(arr, new_stop):
+    return np.where(arr.direction > 0, new_stop > arr.stop, new_stop < arr.stop)
+
+
+# =============================================================================
+# POLICIES
+# =============================================================================
+
+class ExitPolicy:
+    """Base class: start() initialises per-position state, update() returns an exit price or None"""
+
+    reason = None  # Exit reason (format string with {max_level}), None for stop-only policies
+
+    def start(self, pos: OpenPosition):
+        pass
+
+    def start_many(self, arr: PositionArray, idx):
+        pass
+
+    def update(self, pos: OpenPosition, high: float, low: float, close: float, now: float) -> Optional[float]:
+        return None
+
+    def update_many(self, arr: PositionArray, active, high, low, close, now):
+        """(hit mask, exit prices) or None"""
+        return None
+
+    def reason_for(self, max_level: float = 0.0) -> str:
+        return self.reason.format(max_level=max_level)
+
+
+class StopLoss(ExitPolicy):
+    """Exit when the bar trades through the current stop"""
+
+    def __init__(self, reason: str = "STOP_LOSS", fill: str = "stop"):
+        """fill: "stop" (exit at the stop level) or "close" (exit at the update price)"""
+        if fill not in ("stop", "close"):
+            raise ValueError(f"Unknown fill: {fill}")
+        self.reason = reason
+        self.fill = fill
+
+    def update(self, pos, high, low, close, now):
+        hit = low <= pos.stop if pos.direction > 0 else high >= pos.stop
+        if hit:
+            return pos.stop if self.fill == "stop" else close
+        return None
+
+    def update_many(self, arr, active, high, low, close, now):
+        hit = active & np.where(arr.direction > 0, low <= arr.stop, high >= arr.stop)
+        return hit, (arr.stop if self.fill == "stop" else np.broadcast_to(close, hit.shape))
+
+
+class FixedTarget(ExitPolicy):
+    """Exit at the position's fixed target (positions without one are skipped)"""
+
+    def __init__(self, reason: str = "TARGET", fill: str = "target"):
+        """fill: "target" (exit at the target level) or "close" (exit at the update price)"""
+        if fill not in ("target", "close"):
+            raise ValueError(f"Unknown fill: {fill}")
+        self.reason = reason
+        self.fill = fill
+
+    def update(self, pos, high, low, close, now):
+        if np.isnan(pos.target):
+            return None
+        hit = high >= pos.target if pos.direction > 0 else low <= pos.target
+        if hit:
+            return pos.target if self.fill == "target" else close
+        return None
+
+    def update_many(self, arr, active, high, low, close, now):
+        with np.errstate(invalid='ignore'):
+            hit = active & np.where(arr.direction > 0, high >= arr.target, low <= arr.target)
+        return hit, (arr.target if self.fill == "target" else np.broadcast_to(close, hit.shape))
+
+
+class Breakeven(ExitPolicy):
+    """Move the stop to entry once the close is atr_mult ATRs in profit"""
+
+    def __init__(self, atr_mult):
+        self.atr_mult = atr_mult
+
+    def update(self, pos, high, low, close, now):
+        profit_atr = pos.direction * (close - pos.entry_price) / pos.atr
+        if profit_atr >= self.atr_mult and pos.tighter(pos.entry_price):
+            pos.stop = pos.entry_price
+        return None
+
+    def update_many(self, arr, active, high, low, close, now):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            profit_atr = arr.direction * (close - arr.entry_price) / arr.atr
+            move = active & (profit_atr >= self.atr_mult) & _tighter_many(arr, arr.entry_price)
+        arr.stop = np.where(move, arr.entry_price, arr.stop)
+        return None
+
+
+class AtrTrailing(ExitPolicy):
+    """Trail distance_mult ATRs behind the best price once start_mult ATRs in profit"""
+
+    def __init__(self, start_mult, distance_mult):
+        self.start_mult = start_mult
+        self.distance_mult = distance_mult
+
+    def update(self, pos, high, low, close, now):
+        profit_atr = pos.direction * (close - pos.entry_price) / pos.atr
+        if profit_atr >= self.start_mult:
+            trail = pos.best - pos.direction * self.distance_mult * pos.atr
+            if pos.tighter(trail):
+                pos.stop = trail
+        return None
+
+    def update_many(self, arr, active, high, low, close, now):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            profit_atr = arr.direction * (close - arr.entry_price) / arr.atr
+            trail = arr.best - arr.direction * self.distance_mult * arr.atr
+            move = active & (profit_atr >= self.start_mult) & _tighter_many(arr, trail)
+        arr.stop = np.where(move, trail, arr.stop)
+        return None
+
+
+class RLadder(ExitPolicy):
+    """
+    R-multiple target ladder: when the close reaches `level` R (starting at
+    first_r), lock lock_pct of that profit in the stop and aim step R higher
+    """
+
+    def __init__(self, first_r=2, lock_pct=0.6, step=1):
+        self.first_r = first_r
+        self.lock_pct = lock_pct
+        self.step = step
+
+    def start(self, pos):
+        pos.level = self.first_r
+        pos.max_level = 0
+
+    def start_many(self, arr, idx):
+        arr.level[idx] = np.broadcast_to(self.first_r, arr.level.shape)[idx]
+        arr.max_level[idx] = 0.0
+
+    def update(self, pos, high, low, close, now):
+        target = pos.entry_price + pos.direction * pos.level * pos.risk
+        if pos.direction * (close - target) >= 0:
+            pos.stop = pos.entry_price + pos.direction * self.lock_pct * pos.level * pos.risk
+            pos.max_level = pos.level
+            pos.level = pos.level + self.step
+        return None
+
+    def update_many(self, arr, active, high, low, close, now):
+        # An infinite first_r disables the ladder for that slot
+        with np.errstate(invalid='ignore'):
+            target = arr.entry_price + arr.direction * arr.level * arr.risk
+            reached = active & (arr.direction * (close - target) >= 0)
+            locked = arr.entry_price + arr.direction * self.lock_pct * arr.level * arr.risk
+        arr.stop = np.where(reached, locked, arr.stop)
+        arr.max_level = np.where(reached, arr.level, arr.max_level)
+        arr.level = np.where(reached, arr.level + self.step, arr.level)
+        return None
+
+
+class TimeExit(ExitPolicy):
+    """Exit at the update price after max_minutes since entry and/or max_bars updates"""
+
+    def __init__(self, max_minutes: Optional[float] = None, max_bars: Optional[int] = None,
+                 reason: str = "TIME_EXIT"):
+        self.max_minutes = max_minutes
+        self.max_bars = max_bars
+        self.reason = reason
+
+    def update(self, pos, high, low, close, now):
+        if self.max_minutes and (now - pos.entry_time) / 60 >= self.max_minutes:
+            return close
+        if self.max_bars and pos.bars >= self.max_bars:
+            return close
+        return None
+
+    def update_many(self, arr, active, high, low, close, now):
+        hit = np.zeros(len(arr), dtype=bool)
+        if self.max_minutes:
+            hit |= (now - arr.entry_time) / 60 >= self.max_minutes
+        if self.max_bars:
+            hit |= arr.bars >= self.max_bars
+        return active & hit, np.broadcast_to(close, hit.shape)
+
+
+class SignalExit(ExitPolicy):
+    """Exit at the update price when predicate(side) says so (e.g. a volume delta reversal)"""
+
+    def __init__(self, predicate: Callable[[str], bool], reason: str = "SIGNAL_EXIT"):
+        self.predicate = predicate
+        self.reason = reason
+
+    def update(self, pos, high, low, close, now):
+        return close if self.predicate(pos.side) else None
+
+    def update_many(self, arr, active, high, low, close, now):
+        hit = active & np.where(arr.direction > 0, bool(self.predicate("LONG")), bool(self.predicate("SHORT")))
+        return hit, np.broadcast_to(close, hit.shape)
+
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+class ExitEngine:
+    """Ordered exit policies; the first policy that exits decides price and reason"""
+
+    def __init__(self, *policies: ExitPolicy):
+        self.policies = list(policies)
+
+
+    def open(self, direction, entry_price: float, stop: float, target: Optional[float] = None,
+             atr: Optional[float] = None, entry_time: Optional[float] = None) -> OpenPosition:
+        pos = OpenPosition(direction, entry_price, stop, target, atr, entry_time)
+        for policy in self.policies:
+            policy.start(pos)
+        return pos
+
+
+    def open_many(self, arr: PositionArray, idx, direction, entry_price, stop, target=np.nan,
+                  atr=np.nan, entry_time=None):
+        arr.open(idx, direction, entry_price, stop, target, atr, entry_time)
+        for policy in self.policies:
+            policy.start_many(arr, idx)
+
+
+    def update(self, pos: OpenPosition, high: float, low: float = None, close: float = None,
+               now: float = None, on_stop: Callable = None) -> Optional[Tuple[float, str]]:
+        """
+        Run the policies on one bar (or one price: update(pos, price))
+
+        Returns (exit_price, reason) or None. on_stop(policy, old_stop, pos)
+        is called whenever a policy moves the stop.
+        """
+        low = high if low is None else low
+        close = high if close is None else close
+        now = time.time() if now is None else now
+
+        pos.bars += 1
+        pos.best = max(pos.best, high) if pos.direction > 0 else min(pos.best, low)
+
+        for policy in self.policies:
+            old_stop = pos.stop
+            price = policy.update(pos, high, low, close, now)
+            if on_stop and pos.stop != old_stop:
+                on_stop(policy, old_stop, pos)
+            if price is not None:
+                return price, policy.reason_for(pos.max_level)
+        return None
+
+
+    def update_many(self, arr: PositionArray, high, low=None, close=None, now: float = None):
+        """
+        Run the policies on every open slot of a PositionArray
+
+        high/low/close are scalars (all positions on one instrument) or
+        per-slot arrays. Returns (exited mask, exit prices, policy index of
+        the exit or -1); exited slots are not closed, see reason()/close().
+        """
+        low = high if low is None else low
+        close = high if close is None else close
+        now = time.time() if now is None else now
+
+        active = arr.direction != 0
+        arr.bars[active] += 1
+        arr.best = np.where(active & (arr.direction > 0), np.maximum(arr.best, high), arr.best)
+        arr.best = np.where(active & (arr.direction < 0), np.minimum(arr.best, low), arr.best)
+
+        exited = np.zeros(len(arr), dtype=bool)
+        price = np.full(len(arr), np.nan)
+        code = np.full(len(arr), -1, dtype=np.int64)
+        for k, policy in enumerate(self.policies):
+            result = policy.update_many(arr, active & ~exited, high, low, close, now)
+            if result is None:
+                continue
+            hit, level = result
+            price = np.where(hit, level, price)
+            code[hit] = k
+            exited |= hit
+
+        return exited, price, code
+
+
+    def reason(self, code: int, max_level: float = 0.0) -> str:
+        """Exit reason of policy index `code` from update_many()"""
+        return self.policies[code].reason_for(max_level)
+
+
+def _parity_check(trials: int = 300, seed: int = 0) -> int:
+    """Scalar vs vectorized engine on random positions and bars, returns mismatches"""
+    rng = np.random.default_rng(seed)
+    mismatches = 0
+    reversal = {"LONG": False, "SHORT": False}
+
+    for _ in range(trials):
+        policies = [
+            Breakeven(rng.uniform(0.5, 2)),
+            AtrTrailing(rng.uniform(1, 3), rng.uniform(0.5, 1.5)),
+            RLadder(int(rng.integers(1, 4)), rng.uniform(0.3, 0.9)),
+            StopLoss("STOP_{max_level:g}R", fill=rng.choice(["stop", "close"])),
+            FixedTarget(fill=rng.choice(["target", "close"])),
+            SignalExit(lambda side: reversal[side], "REVERSAL"),
+            TimeExit(max_minutes=rng.uniform(5, 60), max_bars=int(rng.integers(5, 50))),
+        ]
+        rng.shuffle(policies)
+        engine = ExitEngine(*policies)
+
+        n = int(rng.integers(1, 30))
+        direction = rng.choice([-1, 1], n)
+        entry = 100 + rng.normal(0, 1, n)
+        atr = rng.uniform(0.2, 1.0, n)
+        stop = entry - direction * atr * rng.uniform(0.5, 2, n)
+        target = np.where(rng.random(n) < 0.5, np.nan, entry + direction * atr * rng.uniform(1, 4, n))
+
+        arr = PositionArray(n)
+        engine.open_many(arr, np.arange(n), direction, entry, stop, target, atr, 0.0)
+        scalar = [engine.open(int(direction[i]), entry[i], stop[i], None if np.isnan(target[i]) else target[i],
+                              atr[i], 0.0) for i in range(n)]
+        done = [None] * n
+
+        close = 100.0
+        for bar in range(60):
+            close += rng.normal(0, 0.5)
+            high, low = close + rng.exponential(0.3), close - rng.exponential(0.3)
+            now = bar * 60.0
+            reversal["LONG"], reversal["SHORT"] = rng.random() < 0.03, rng.random() < 0.03
+
+            exited, price, code = engine.update_many(arr, high, low, close, now)
+            for i in range(n):
+                if done[i] is not None:
+                    continue
+                result = engine.update(scalar[i], high, low, close, now)
+                vector = (price[i], engine.reason(code[i], arr.max_level[i])) if exited[i] else None
+                if result != vector or scalar[i].stop != arr.stop[i]:
+                    mismatches += 1
+                if result is not None:
+                    done[i] = result
+            arr.close(np.flatnonzero(exited))
+
+    return mismatches
+
+
+if __name__ == "__main__":
+    bad = _parity_check()
+    if bad:
+        print(f"❌ {bad} scalar/vectorized exit mismatches")
+    else:
+        print("✅ Scalar and vectorized exit policies identical")
@@ -0,0 +1,15 @@
+"""
+Shared indicator library for the live strategies and backtests
+
+Every indicator comes as a vectorized batch function (whole arrays, for
+backtests and history warm-up) and a streaming class (one bar at a time,
+for live feeds). Both forms run the same arithmetic in the same order, so
+they return bit-identical values for the same bars.
+
+Check with: python -m utils.indicators.parity
+"""
+from .moving_average import rolling_sum, sma, SMA
+from .atr import true_range, atr, ATR
+from .swings import swing_highs, swing_lows, SwingDetector
+from .rsi import wilder_smooth, rsi, RSI
+from .delta import delta_stats, DeltaVolume, volume_signals, VolumeSignals
@@ -0,0 +1,54 @@
+"""
+Average True Range (rolling-mean, as used by the trendline strategies)
+"""
+from typing import Optional
+
+import numpy as np
+
+from .moving_average import sma, SMA
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range per bar (first bar has no previous close: high - low)"""
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+
+    tr = high - low
+    if len(tr) > 1:
+        prev_close = close[:-1]
+        tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - prev_close),
+                                               np.abs(low[1:] - prev_close)))
+    return tr
+
+
+def atr(high, low, close, length: int = 14) -> np.ndarray:
+    """ATR for every bar, NaN until `length` bars are available"""
+    return sma(true_range(high, low, close), length)
+
+
+class ATR:
+    """Streaming ATR"""
+
+    def __init__(self, length: int = 14):
+        self.length = length
+        self.prev_close = None
+        self.true_range = None
+        self._mean = SMA(length)
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._mean.value
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        """Add a closed bar, returns the new ATR (None until the window is full)"""
+        high = float(high)
+        low = float(low)
+
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, max(abs(high - self.prev_close), abs(low - self.prev_close)))
+
+        self.prev_close = float(close)
+        self.true_range = tr
+        return self._mean.update(tr)
@@ -0,0 +1,212 @@
+"""
+Aggressor-side volume statistics (buy/sell delta) for the volume strategies,
+and their entry/exit rules as rolling windows over closed bars
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def delta_stats(buy_volume, sell_volume) -> Dict[str, np.ndarray]:
+    """Per-bar total volume, delta and buy/sell percentages for arrays of bars"""
+    buy = np.asarray(buy_volume, dtype=float)
+    sell = np.asarray(sell_volume, dtype=float)
+
+    total = buy + sell
+    has_volume = total > 0
+    safe_total = np.where(has_volume, total, 1.0)
+
+    return {
+        'buy_volume': buy,
+        'sell_volume': sell,
+        'total_volume': total,
+        'delta': buy - sell,
+        'buy_pct': np.where(has_volume, buy / safe_total * 100, 0.0),
+        'sell_pct': np.where(has_volume, sell / safe_total * 100, 0.0)
+    }
+
+
+class DeltaVolume:
+    """Streaming buy/sell volume for the bar currently being built"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+        self.trades = 0
+
+    def add(self, size: float, is_buy: bool):
+        """Add one trade (is_buy = taker was the buyer)"""
+        if is_buy:
+            self.buy_volume += size
+        else:
+            self.sell_volume += size
+        self.trades += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Same fields as delta_stats() for the current bar"""
+        total = self.buy_volume + self.sell_volume
+        return {
+            'buy_volume': self.buy_volume,
+            'sell_volume': self.sell_volume,
+            'total_volume': total,
+            'delta': self.buy_volume - self.sell_volume,
+            'buy_pct': (self.buy_volume / total * 100) if total > 0 else 0.0,
+            'sell_pct': (self.sell_volume / total * 100) if total > 0 else 0.0
+        }
+
+
+def _streaks(flags: np.ndarray) -> np.ndarray:
+    """Length of the run of True values ending at each bar"""
+    idx = np.arange(1, len(flags) + 1)
+    last_false = np.maximum.accumulate(np.where(flags, 0, idx))
+    return idx - last_false
+
+
+def volume_signals(open_, close, delta, buy_pct, sell_pct, min_delta_buy: float, min_delta_sell: float,
+                   min_buy_pct: float, min_sell_pct: float, consecutive: int) -> Dict[str, np.ndarray]:
+    """
+    Volume strategy entry signals for arrays of closed bars
+
+    A bar qualifies for BUY with delta >= min_delta_buy, buy_pct >=
+    min_buy_pct and a green candle; a signal needs `consecutive` qualifying
+    bars in a row and (for more than one) a last close above the first
+    one's. SELL mirrors it with red candles and a falling close.
+    """
+    open_ = np.asarray(open_, dtype=float)
+    close = np.asarray(close, dtype=float)
+    delta = np.asarray(delta, dtype=float)
+    is_green = close >= open_
+
+    buy_streak = _streaks((delta >= min_delta_buy) & (np.asarray(buy_pct) >= min_buy_pct) & is_green)
+    sell_streak = _streaks((delta <= min_delta_sell) & (np.asarray(sell_pct) >= min_sell_pct) & ~is_green)
+    buy_signal = buy_streak >= consecutive
+    sell_signal = sell_streak >= consecutive
+
+    if consecutive > 1:
+        first_close = np.full(len(close), np.nan)
+        first_close[consecutive - 1:] = close[:len(close) - consecutive + 1]
+        buy_signal &= close > first_close
+        sell_signal &= close < first_close
+
+    return {
+        'buy_streak': buy_streak,
+        'sell_streak': sell_streak,
+        'buy_signal': buy_signal,
+        'sell_signal': sell_signal
+    }
+
+
+class VolumeSignals:
+    """
+    Streaming volume strategy rules, O(1) per closed bar
+
+    The last `history` bars live in a columnar ring buffer next to running
+    counters, so nothing rescans the history:
+      - buy_streak / sell_streak: qualifying bars in a row (entry signals,
+        same rules as volume_signals())
+      - buy_matches / sell_matches: buffered bars strictly past all
+        thresholds (the "confirmations" in the live readiness display)
+      - bars since the last delta spike beyond +/-reversal_delta (exit)
+    """
+
+    COLUMNS = ('open', 'close', 'delta', 'buy_pct', 'sell_pct')
+
+    def __init__(self, min_delta_buy: float, min_delta_sell: float, min_buy_pct: float,
+                 min_sell_pct: float, consecutive: int, history: int = 10,
+                 reversal_delta: float = 200, reversal_bars: int = 2):
+        self.min_delta_buy = min_delta_buy
+        self.min_delta_sell = min_delta_sell
+        self.min_buy_pct = min_buy_pct
+        self.min_sell_pct = min_sell_pct
+        self.consecutive = consecutive
+        self.reversal_delta = reversal_delta
+        self.reversal_bars = reversal_bars
+
+        self.size = max(history, consecutive, reversal_bars)
+        self.columns = {name: np.zeros(self.size) for name in self.COLUMNS}
+        self._buy_match = np.zeros(self.size, dtype=bool)
+        self._sell_match = np.zeros(self.size, dtype=bool)
+
+        self.count = 0  # Bars seen
+        self.buy_streak = 0
+        self.sell_streak = 0
+        self.buy_matches = 0
+        self.sell_matches = 0
+        self._since_buy_spike = None
+        self._since_sell_spike = None
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    def last(self, column: str, ago: int = 0) -> float:
+        """Value of a column `ago` bars before the latest bar"""
+        return self.columns[column][(self.count - 1 - ago) % self.size]
+
+    def update(self, open_: float, close: float, delta: float, buy_pct: float, sell_pct: float):
+        """Add a closed bar"""
+        slot = self.count % self.size
+
+        # The bar leaving the buffer no longer counts as a confirmation
+        if self.count >= self.size:
+            self.buy_matches -= int(self._buy_match[slot])
+            self.sell_matches -= int(self._sell_match[slot])
+
+        for name, value in zip(self.COLUMNS, (open_, close, delta, buy_pct, sell_pct)):
+            self.columns[name][slot] = value
+
+        is_green = close >= open_
+        if delta >= self.min_delta_buy and buy_pct >= self.min_buy_pct and is_green:
+            self.buy_streak += 1
+        else:
+            self.buy_streak = 0
+        if delta <= self.min_delta_sell and sell_pct >= self.min_sell_pct and not is_green:
+            self.sell_streak += 1
+        else:
+            self.sell_streak = 0
+
+        buy_match = delta > self.min_delta_buy and buy_pct > self.min_buy_pct and is_green
+        sell_match = delta < self.min_delta_sell and sell_pct > self.min_sell_pct and not is_green
+        self._buy_match[slot] = buy_match
+        self._sell_match[slot] = sell_match
+        self.buy_matches += buy_match
+        self.sell_matches += sell_match
+
+        self._since_buy_spike = self._bars_since(self._since_buy_spike, delta > self.reversal_delta)
+        self._since_sell_spike = self._bars_since(self._since_sell_spike, delta < -self.reversal_delta)
+
+        self.count += 1
+
+    @staticmethod
+    def _bars_since(previous: Optional[int], hit: bool) -> Optional[int]:
+        if hit:
+            return 0
+        return None if previous is None else previous + 1
+
+    @property
+    def buy_signal(self) -> bool:
+        n = self.consecutive
+        if self.buy_streak < n:
+            return False
+        return n == 1 or self.last('close') > self.last('close', n - 1)
+
+    @property
+    def sell_signal(self) -> bool:
+        n = self.consecutive
+        if self.sell_streak < n:
+            return False
+        return n == 1 or self.last('close') < self.last('close', n - 1)
+
+    def remaining(self, direction: str) -> int:
+        """Confirmations still missing for "LONG" or "SHORT" (readiness display)"""
+        matches = self.buy_matches if direction == "LONG" else self.sell_matches
+        return max(0, self.consecutive - matches)
+
+    def delta_reversal(self, direction: str) -> bool:
+        """Opposite delta spike within the last reversal_bars bars"""
+        if len(self) < self.reversal_bars:
+            return False
+        since = self._since_sell_spike if direction == "LONG" else self._since_buy_spike
+        return since is not None and since < self.reversal_bars
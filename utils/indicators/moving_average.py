@@ -0,0 +1,56 @@
+"""
+Simple moving average (volume MA, rolling-mean ATR)
+"""
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+
+def rolling_sum(values, length: int) -> np.ndarray:
+    """
+    Window sums, NaN until the first window is full
+
+    Each window is summed left to right, the same order SMA.update() uses,
+    so batch and streaming values match exactly.
+    """
+    x = np.asarray(values, dtype=float)
+    out = np.full(len(x), np.nan)
+    if length <= 0 or len(x) < length:
+        return out
+
+    count = len(x) - length + 1
+    total = np.zeros(count)
+    for k in range(length):
+        total += x[k:k + count]
+
+    out[length - 1:] = total
+    return out
+
+
+def sma(values, length: int) -> np.ndarray:
+    """Simple moving average, NaN until the first window is full"""
+    return rolling_sum(values, length) / length
+
+
+class SMA:
+    """Streaming simple moving average"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.window = deque(maxlen=length)
+        self.value = None
+
+    def update(self, value: float) -> Optional[float]:
+        """Add a value, returns the new average (None until the window is full)"""
+        self.window.append(float(value))
+
+        if len(self.window) < self.length:
+            self.value = None
+        else:
+            total = 0.0
+            for v in self.window:
+                total += v
+            self.value = total / self.length
+
+        return self.value
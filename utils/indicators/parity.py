@@ -0,0 +1,136 @@
+"""
+Batch vs streaming parity check for the indicator library
+
+Feeds random OHLCV/trade data through every batch function and its
+streaming class (random lengths, parameters and price scales, including
+flat and integer-priced series) and requires bit-identical output.
+
+Usage: python -m utils.indicators.parity [trials] [seed]
+"""
+import sys
+
+import numpy as np
+
+from . import (sma, SMA, atr, ATR, swing_highs, swing_lows, SwingDetector,
+               rsi, RSI, delta_stats, DeltaVolume, volume_signals, VolumeSignals)
+
+
+def random_bars(rng, n):
+    """Random-walk OHLCV bars; some series are rounded or flat to hit ties"""
+    scale = rng.choice([1.0, 100.0, 30000.0])
+    close = scale + np.cumsum(rng.normal(0, scale * 0.001 + 0.01, n))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.exponential(scale * 0.0005 + 0.01, n)
+    low = np.minimum(open_, close) - rng.exponential(scale * 0.0005 + 0.01, n)
+    volume = rng.lognormal(2, 1, n)
+
+    style = rng.integers(3)
+    if style == 1:
+        high, low, close = np.round(high), np.round(low), np.round(close)
+    elif style == 2:
+        high[n // 3:n // 2] = high[n // 3]
+        low[n // 3:n // 2] = low[n // 3]
+        close[n // 3:n // 2] = close[n // 3]
+    return high, low, close, volume
+
+
+def same(batch, streamed):
+    """Streaming None must line up with batch NaN, everything else bit-identical"""
+    streamed = np.array([np.nan if v is None else v for v in streamed], dtype=float)
+    return np.array_equal(batch, streamed, equal_nan=True)
+
+
+def check_once(rng):
+    n = int(rng.integers(1, 400))
+    high, low, close, volume = random_bars(rng, n)
+    failures = []
+
+    length = int(rng.integers(1, 40))
+    stream = SMA(length)
+    if not same(sma(volume, length), [stream.update(v) for v in volume]):
+        failures.append(f"sma(length={length}, n={n})")
+
+    stream = ATR(length)
+    if not same(atr(high, low, close, length), [stream.update(h, l, c) for h, l, c in zip(high, low, close)]):
+        failures.append(f"atr(length={length}, n={n})")
+
+    lookback = int(rng.integers(1, 6))
+    detector = SwingDetector(lookback)
+    streamed_highs = np.zeros(n, dtype=bool)
+    streamed_lows = np.zeros(n, dtype=bool)
+    for h, l in zip(high, low):
+        swing_high, swing_low = detector.update(h, l)
+        if swing_high:
+            streamed_highs[swing_high[0]] = True
+        if swing_low:
+            streamed_lows[swing_low[0]] = True
+    if not np.array_equal(swing_highs(high, lookback), streamed_highs) or \
+            not np.array_equal(swing_lows(low, lookback), streamed_lows):
+        failures.append(f"swings(lookback={lookback}, n={n})")
+
+    period = int(rng.integers(2, 30))
+    stream = RSI(period)
+    streamed = []
+    for c in close:
+        peeked = stream.peek(c)
+        value = stream.update(c)
+        if peeked != value and not (peeked is None and value is None):
+            failures.append(f"rsi.peek(period={period}, n={n})")
+            break
+        streamed.append(value)
+    if len(streamed) == n and not same(rsi(close, period), streamed):
+        failures.append(f"rsi(period={period}, n={n})")
+
+    sizes = rng.integers(1, 500, size=(n, 5))
+    sides = rng.random((n, 5)) < rng.random()
+    bar = DeltaVolume()
+    streamed_stats = []
+    for bar_sizes, bar_sides in zip(sizes, sides):
+        bar.reset()
+        for size, is_buy in zip(bar_sizes, bar_sides):
+            bar.add(float(size), bool(is_buy))
+        streamed_stats.append(bar.stats())
+    batch = delta_stats(np.where(sides, sizes, 0).sum(axis=1), np.where(sides, 0, sizes).sum(axis=1))
+    for key in batch:
+        if not same(batch[key], [s[key] for s in streamed_stats]):
+            failures.append(f"delta_stats[{key}](n={n})")
+
+    consecutive = int(rng.integers(1, 5))
+    thresholds = (float(rng.integers(0, 300)), -float(rng.integers(0, 300)), 55.0, 55.0)
+    open_ = np.r_[close[0], close[:-1]]
+    stats = {k: batch[k] for k in ('delta', 'buy_pct', 'sell_pct')}
+    expected = volume_signals(open_, close, stats['delta'], stats['buy_pct'], stats['sell_pct'],
+                              *thresholds, consecutive)
+    state = VolumeSignals(*thresholds, consecutive)
+    streamed = {key: [] for key in expected}
+    for i in range(n):
+        state.update(open_[i], close[i], stats['delta'][i], stats['buy_pct'][i], stats['sell_pct'][i])
+        for key in streamed:
+            streamed[key].append(getattr(state, key))
+    for key in expected:
+        if not same(expected[key].astype(float), np.array(streamed[key], dtype=float)):
+            failures.append(f"volume_signals[{key}](consecutive={consecutive}, n={n})")
+
+    return failures
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    rng = np.random.default_rng(seed)
+
+    failures = []
+    for _ in range(trials):
+        failures.extend(check_once(rng))
+
+    if failures:
+        print(f"❌ {len(failures)} parity failures in {trials} trials (seed {seed}):")
+        for failure in failures[:20]:
+            print(f"   - {failure}")
+        sys.exit(1)
+
+    print(f"✅ Batch and streaming indicators identical over {trials} random trials (seed {seed})")
+
+
+if __name__ == '__main__':
+    main()
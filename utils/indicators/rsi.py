@@ -0,0 +1,92 @@
+"""
+RSI with Wilder's smoothing (same formula as the RSI options trader)
+"""
+from typing import Optional
+
+import numpy as np
+
+from utils import kernels
+
+RSI_EPSILON = 1e-10  # Avoid division by zero when there are no losses
+
+
+def wilder_smooth(values, period: int) -> np.ndarray:
+    """
+    Wilder's running average: plain mean of the first `period` values,
+    then avg = (prev * (period - 1) + value) / period. NaN before that.
+    The loop lives in utils.kernels (JIT-compiled when Numba is available).
+    """
+    return kernels.wilder_smooth(values, period)
+
+
+def rsi(closes, period: int = 14) -> np.ndarray:
+    """RSI for every close, NaN until `period + 1` closes are available"""
+    c = np.asarray(closes, dtype=float)
+    out = np.full(len(c), np.nan)
+    if len(c) < period + 1:
+        return out
+
+    deltas = np.diff(c)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    rs = wilder_smooth(gains, period) / (wilder_smooth(losses, period) + RSI_EPSILON)
+    out[1:] = 100 - (100 / (1 + rs))
+    return out
+
+
+class RSI:
+    """Streaming Wilder RSI"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = None
+        self.count = 0
+        self._gain_total = 0.0
+        self._loss_total = 0.0
+        self.avg_gain = None
+        self.avg_loss = None
+        self.value = None
+
+    def _next_averages(self, close):
+        delta = close - self.prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if self.avg_gain is not None:
+            p = self.period
+            return ((self.avg_gain * (p - 1) + gain) / p,
+                    (self.avg_loss * (p - 1) + loss) / p,
+                    self._gain_total, self._loss_total)
+
+        gain_total = self._gain_total + gain
+        loss_total = self._loss_total + loss
+        if self.count + 1 == self.period:
+            return gain_total / self.period, loss_total / self.period, gain_total, loss_total
+        return None, None, gain_total, loss_total
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        rs = avg_gain / (avg_loss + RSI_EPSILON)
+        return 100 - (100 / (1 + rs))
+
+    def update(self, close: float) -> Optional[float]:
+        """Add a closed bar, returns the new RSI (None until period + 1 closes)"""
+        close = float(close)
+        if self.prev_close is None:
+            self.prev_close = close
+            return None
+
+        self.avg_gain, self.avg_loss, self._gain_total, self._loss_total = self._next_averages(close)
+        self.count += 1
+        self.prev_close = close
+
+        self.value = None if self.avg_gain is None else self._rsi(self.avg_gain, self.avg_loss)
+        return self.value
+
+    def peek(self, close: float) -> Optional[float]:
+        """RSI if the still-forming bar closed at `close` (state is not changed)"""
+        if self.prev_close is None:
+            return None
+        avg_gain, avg_loss, _, _ = self._next_averages(float(close))
+        return None if avg_gain is None else self._rsi(avg_gain, avg_loss)
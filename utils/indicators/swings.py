@@ -0,0 +1,65 @@
+"""
+Swing high/low detection
+
+A swing high is strictly above the `lookback` bars before it and not
+exceeded by the `lookback` bars after it (mirror image for swing lows),
+so a swing is only confirmed `lookback` bars after it happens.
+"""
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+from utils.kernels import swing_flags
+
+
+def swing_highs(high, lookback: int = 3) -> np.ndarray:
+    """Boolean array, True at confirmed swing highs"""
+    return swing_flags(high, lookback, True)
+
+
+def swing_lows(low, lookback: int = 3) -> np.ndarray:
+    """Boolean array, True at confirmed swing lows"""
+    return swing_flags(low, lookback, False)
+
+
+class SwingDetector:
+    """
+    Streaming swing confirmation
+
+    update() returns the swings confirmed by the new bar as
+    ((index, high) or None, (index, low) or None), where index is the
+    absolute bar number (0 = first bar fed in).
+    """
+
+    def __init__(self, lookback: int = 3):
+        self.lookback = lookback
+        self.bar_count = 0
+        self._highs = deque(maxlen=2 * lookback + 1)
+        self._lows = deque(maxlen=2 * lookback + 1)
+
+    def update(self, high: float, low: float) -> Tuple[Optional[Tuple[int, float]], Optional[Tuple[int, float]]]:
+        self._highs.append(float(high))
+        self._lows.append(float(low))
+        self.bar_count += 1
+
+        lb = self.lookback
+        if len(self._highs) < 2 * lb + 1:
+            return None, None
+
+        center_idx = self.bar_count - 1 - lb
+        highs = self._highs
+        lows = self._lows
+        swing_high = swing_low = None
+
+        center_high = highs[lb]
+        if all(highs[j] < center_high for j in range(lb)) and \
+                all(highs[j] <= center_high for j in range(lb + 1, 2 * lb + 1)):
+            swing_high = (center_idx, center_high)
+
+        center_low = lows[lb]
+        if all(lows[j] > center_low for j in range(lb)) and \
+                all(lows[j] >= center_low for j in range(lb + 1, 2 * lb + 1)):
+            swing_low = (center_idx, center_low)
+
+        return swing_high, swing_low
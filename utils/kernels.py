@@ -0,0 +1,268 @@
+"""
+Loop kernels for indicators and backtests, optionally JIT-compiled with Numba
+
+Some loops do not vectorize cleanly in NumPy: Wilder smoothing, swing
+confirmation scans and path-dependent trailing-stop simulation. Each is
+written once as plain Python over NumPy arrays. When Numba is importable
+the same source is compiled with @njit, otherwise it runs as-is (or a
+vectorized NumPy equivalent is used where one exists).
+
+Backend selection via the KERNEL_BACKEND environment variable:
+    auto   - Numba if installed, otherwise Python (default)
+    numba  - ask for Numba, warn and fall back to Python if it is missing
+    python - never JIT
+
+Numba is optional and not in requirements.txt: pip install numba
+"""
+import os
+
+import numpy as np
+
+# Numba support (optional)
+try:
+    import numba
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+KERNEL_BACKENDS = ('auto', 'numba', 'python')
+
+REQUESTED_BACKEND = os.environ.get('KERNEL_BACKEND', 'auto').strip().lower()
+if REQUESTED_BACKEND not in KERNEL_BACKENDS:
+    print(f"⚠️  Unknown KERNEL_BACKEND '{REQUESTED_BACKEND}', using 'auto'")
+    REQUESTED_BACKEND = 'auto'
+
+if REQUESTED_BACKEND == 'numba' and not HAS_NUMBA:
+    print("⚠️  KERNEL_BACKEND=numba but Numba is not installed, using Python kernels")
+
+BACKEND = 'numba' if HAS_NUMBA and REQUESTED_BACKEND != 'python' else 'python'
+
+# Exit codes returned by simulate_positions()
+EXIT_OPEN = 0      # Still open at the end of the data
+EXIT_STOP = 1      # Stop loss (initial, breakeven or trailing)
+EXIT_TARGET = 2    # Fixed target
+
+
+def describe_backend() -> str:
+    """One-line description of the active kernel backend (for startup logs)"""
+    if BACKEND == 'numba':
+        return f"numba {numba.__version__} (JIT)"
+    if REQUESTED_BACKEND == 'numba':
+        return "python (numba requested but not installed)"
+    return "python (NumPy)"
+
+
+# =============================================================================
+# KERNEL SOURCES (valid Python and valid Numba nopython code)
+# =============================================================================
+
+def _wilder_smooth(values, period):
+    """Mean of the first `period` values, then avg = (prev * (period - 1) + x) / period"""
+    n = len(values)
+    out = np.full(n, np.nan)
+    if n < period:
+        return out
+
+    total = 0.0
+    for i in range(period):
+        total += values[i]
+    avg = total / period
+    out[period - 1] = avg
+
+    for i in range(period, n):
+        avg = (avg * (period - 1) + values[i]) / period
+        out[i] = avg
+
+    return out
+
+
+def _swing_flags_loop(values, lookback, find_highs):
+    """Single-pass swing scan (no temporaries, used when JIT-compiled)"""
+    n = len(values)
+    out = np.zeros(n, dtype=np.bool_)
+
+    for i in range(lookback, n - lookback):
+        center = values[i]
+        ok = True
+        for k in range(1, lookback + 1):
+            if find_highs:
+                if values[i - k] >= center or values[i + k] > center:
+                    ok = False
+                    break
+            else:
+                if values[i - k] <= center or values[i + k] < center:
+                    ok = False
+                    break
+        out[i] = ok
+
+    return out
+
+
+def _swing_flags_numpy(values, lookback, find_highs):
+    """Vectorized swing scan: one comparison pass per offset"""
+    n = len(values)
+    out = np.zeros(n, dtype=bool)
+    if n < 2 * lookback + 1:
+        return out
+
+    center = values[lookback:n - lookback]
+    ok = np.ones(len(center), dtype=bool)
+    for k in range(1, lookback + 1):
+        left = values[lookback - k:n - lookback - k]
+        right = values[lookback + k:n - lookback + k]
+        if find_highs:
+            ok &= (left < center) & (right <= center)
+        else:
+            ok &= (left > center) & (right >= center)
+
+    out[lookback:n - lookback] = ok
+    return out
+
+
+def _simulate_positions(high, low, close, signal, stop, target, atr,
+                        breakeven_mult, trail_start_mult, trail_dist_mult):
+    """
+    One-position-at-a-time trade simulation, same rules as the live modules
+
+    An entry signal on bar i (signal +1 LONG / -1 SHORT) fills at close[i]
+    with stop[i], target[i] (NaN = no target) and atr[i]. Exits are checked
+    from the entry bar on: first the stop is ratcheted (breakeven once
+    profit >= breakeven_mult ATR, trailing trail_dist_mult ATR behind the
+    best price once profit >= trail_start_mult ATR; pass inf to disable),
+    then the bar is tested against stop and target. The next entry can
+    happen on the bar after the exit.
+
+    Returns arrays (entry_idx, exit_idx, direction, entry_price, exit_price,
+    exit_code, extreme_price, initial_stop, final_stop), one row per trade.
+    """
+    n = len(close)
+    entry_idx = np.empty(n, dtype=np.int64)
+    exit_idx = np.empty(n, dtype=np.int64)
+    direction = np.empty(n, dtype=np.int64)
+    entry_price = np.empty(n)
+    exit_price = np.empty(n)
+    exit_code = np.empty(n, dtype=np.int64)
+    extreme_price = np.empty(n)
+    initial_stop = np.empty(n)
+    final_stop = np.empty(n)
+
+    count = 0
+    i = 0
+    while i < n:
+        d = signal[i]
+        if d == 0:
+            i += 1
+            continue
+
+        entry = close[i]
+        sl = stop[i]
+        tgt = target[i]
+        a = atr[i]
+        extreme = entry
+
+        code = EXIT_OPEN
+        j = i
+        while j < n:
+            # Ratchet the stop first (uses this bar's close and best price)
+            if d > 0:
+                if high[j] > extreme:
+                    extreme = high[j]
+                profit_atr = (close[j] - entry) / a
+            else:
+                if low[j] < extreme:
+                    extreme = low[j]
+                profit_atr = (entry - close[j]) / a
+
+            if profit_atr >= breakeven_mult:
+                if d > 0 and sl < entry:
+                    sl = entry
+                elif d < 0 and sl > entry:
+                    sl = entry
+
+            if profit_atr >= trail_start_mult:
+                if d > 0:
+                    trail = extreme - trail_dist_mult * a
+                    if trail > sl:
+                        sl = trail
+                else:
+                    trail = extreme + trail_dist_mult * a
+                    if trail < sl:
+                        sl = trail
+
+            # Then stop before target, like check_exit()
+            if d > 0:
+                if low[j] <= sl:
+                    code = EXIT_STOP
+                elif not np.isnan(tgt) and high[j] >= tgt:
+                    code = EXIT_TARGET
+            else:
+                if high[j] >= sl:
+                    code = EXIT_STOP
+                elif not np.isnan(tgt) and low[j] <= tgt:
+                    code = EXIT_TARGET
+
+            if code != EXIT_OPEN:
+                break
+            j += 1
+
+        entry_idx[count] = i
+        direction[count] = d
+        entry_price[count] = entry
+        extreme_price[count] = extreme
+        initial_stop[count] = stop[i]
+        final_stop[count] = sl
+        exit_code[count] = code
+        if code == EXIT_STOP:
+            exit_idx[count] = j
+            exit_price[count] = sl
+        elif code == EXIT_TARGET:
+            exit_idx[count] = j
+            exit_price[count] = tgt
+        else:
+            exit_idx[count] = n - 1
+            exit_price[count] = close[n - 1]
+        count += 1
+
+        if code == EXIT_OPEN:
+            break
+        i = j + 1
+
+    return (entry_idx[:count], exit_idx[:count], direction[:count], entry_price[:count],
+            exit_price[:count], exit_code[:count], extreme_price[:count],
+            initial_stop[:count], final_stop[:count])
+
+
+# =============================================================================
+# BACKEND DISPATCH
+# =============================================================================
+
+if BACKEND == 'numba':
+    _wilder_impl = njit(cache=True)(_wilder_smooth)
+    _swing_impl = njit(cache=True)(_swing_flags_loop)
+    _simulate_impl = njit(cache=True)(_simulate_positions)
+else:
+    _wilder_impl = _wilder_smooth
+    _swing_impl = _swing_flags_numpy
+    _simulate_impl = _simulate_positions
+
+
+def wilder_smooth(values, period: int) -> np.ndarray:
+    """Wilder's running average, NaN before the first full period"""
+    return _wilder_impl(np.ascontiguousarray(values, dtype=np.float64), int(period))
+
+
+def swing_flags(values, lookback: int, find_highs: bool) -> np.ndarray:
+    """Boolean swing-high (find_highs=True) or swing-low flags"""
+    return _swing_impl(np.ascontiguousarray(values, dtype=np.float64), int(lookback), bool(find_highs))
+
+
+def simulate_positions(high, low, close, signal, stop, target, atr,
+                       breakeven_mult: float = np.inf, trail_start_mult: float = np.inf,
+                       trail_dist_mult: float = 1.0):
+    """See _simulate_positions(); all per-bar inputs are aligned arrays"""
+    as_float = lambda a: np.ascontiguousarray(a, dtype=np.float64)
+    return _simulate_impl(as_float(high), as_float(low), as_float(close),
+                          np.ascontiguousarray(signal, dtype=np.int64),
+                          as_float(stop), as_float(target), as_float(atr),
+                          float(breakeven_mult), float(trail_start_mult), float(trail_dist_mult))
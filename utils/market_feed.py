@@ -0,0 +1,295 @@
+"""
+Live Delta Exchange trade feed for the strategy runtime (utils.strategy_api)
+
+One websocket subscribes to all_trades for the given symbols and pushes
+TickBatch arrays into a Runtime. With batch_interval > 0 trades are
+buffered and dispatched at most every batch_interval seconds, so the
+per-dispatch overhead is shared by all trades (and strategies) in the
+batch. A timer thread flushes idle buffers and drives on_timer().
+
+ProcessShards scales the same connection to many symbols: strategies are
+grouped into one shard per symbol, and shards can be pinned to worker
+processes that each run their own Runtime.
+"""
+import importlib
+import json
+import multiprocessing
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Optional
+
+import websocket
+
+from utils.param_config import watch
+from utils.strategy_api import Runtime, Strategy, TickBatch
+
+WEBSOCKET_URL = "wss://socket.india.delta.exchange"
+
+SNAPSHOT_TRADES = 5  # Trades replayed from the subscription snapshot
+
+
+class LiveFeed:
+    """Websocket all_trades stream -> Runtime.feed_ticks()"""
+
+    def __init__(self, runtime: Runtime, symbols: List[str], batch_interval: float = 0.0,
+                 on_open: Optional[Callable[[], None]] = None, url: str = WEBSOCKET_URL):
+        """
+        Args:
+            runtime: Runtime to dispatch into
+            symbols: Exchange symbols to subscribe
+            batch_interval: Seconds to buffer trades per dispatch (0 = every message)
+            on_open: Called after connecting, before subscribing (e.g. load history)
+            url: Websocket endpoint
+        """
+        self.runtime = runtime
+        self.symbols = list(symbols)
+        self.batch_interval = batch_interval
+        self.on_open_callback = on_open
+        self.url = url
+
+        self._buffers = {symbol: [] for symbol in self.symbols}
+        self._last_flush = time.time()
+        self._lock = threading.Lock()            # Guards the buffers
+        self._dispatch_lock = threading.Lock()   # Keeps batches in order across the feed and timer threads
+        self._stop = threading.Event()
+
+
+    def _push(self, symbol, trades):
+        if self.batch_interval <= 0:
+            self.runtime.feed_ticks(symbol, TickBatch.from_trades(trades))
+            return
+
+        with self._lock:
+            self._buffers[symbol].extend(trades)
+        if time.time() - self._last_flush >= self.batch_interval:
+            self.flush()
+
+
+    def flush(self):
+        """Dispatch all buffered trades (one flush at a time, so an older batch never lands after a newer one)"""
+        with self._dispatch_lock:
+            with self._lock:
+                pending = {s: b for s, b in self._buffers.items() if b}
+                self._buffers = {symbol: [] for symbol in self.symbols}
+                self._last_flush = time.time()
+
+            for symbol, trades in pending.items():
+                self.runtime.feed_ticks(symbol, TickBatch.from_trades(trades))
+
+
+    def _timer_loop(self):
+        interval = min(1.0, self.batch_interval) if self.batch_interval > 0 else 1.0
+        while not self._stop.wait(interval):
+            try:
+                if self.batch_interval > 0 and time.time() - self._last_flush >= self.batch_interval:
+                    self.flush()
+                self.runtime.advance_time(time.time())
+            except Exception as e:
+                print(f"❌ Feed timer error: {e}")
+                traceback.print_exc()
+
+
+    def on_open(self, ws):
+        if self.on_open_callback:
+            self.on_open_callback()
+
+        # Subscribe
+        ws.send(json.dumps({
+            "type": "subscribe",
+            "payload": {
+                "channels": [{
+                    "name": "all_trades",
+                    "symbols": self.symbols
+                }]
+            }
+        }))
+
+
+    def on_message(self, ws, message):
+        try:
+            data = json.loads(message)
+
+            if isinstance(data, dict) and data.get("type") in ["all_trades", "all_trades_snapshot"]:
+                symbol = data.get("symbol")
+                if symbol in self._buffers:
+                    if data.get("type") == "all_trades_snapshot":
+                        trades = data.get("trades", [])[-SNAPSHOT_TRADES:]
+                    else:
+                        trades = [data]
+                    if trades:
+                        self._push(symbol, trades)
+        except Exception as e:
+            print(f"❌ Error processing message: {e}")
+            traceback.print_exc()
+
+
+    def on_error(self, ws, error):
+        print(f"❌ Error: {error}")
+        print(f"📋 Error Type: {type(error).__name__}")
+
+
+    def on_close(self, ws, close_status_code, close_msg):
+        print(f"\n🔌 Connection closed")
+        if close_status_code:
+            print(f"   Status Code: {close_status_code}")
+        if close_msg:
+            print(f"   Message: {close_msg}")
+
+
+    def run(self):
+        """Connect and block until the socket closes (Ctrl+C propagates)"""
+        timer = threading.Thread(target=self._timer_loop, daemon=True)
+        timer.start()
+        try:
+            ws = websocket.WebSocketApp(
+                self.url,
+                on_message=self.on_message,
+                on_error=self.on_error,
+                on_close=self.on_close
+            )
+            ws.on_open = self.on_open
+            ws.run_forever(ping_interval=20, ping_timeout=10)
+        finally:
+            self._stop.set()
+            self.flush()
+
+
+# =============================================================================
+# SYMBOL SHARDS
+# =============================================================================
+
+def build_strategy(spec: Dict) -> Strategy:
+    """{"target": "package.module:Class", "params": {...}} -> Class(**params)"""
+    module_path, _, attr = spec["target"].partition(":")
+    if not attr:
+        raise ValueError(f"Shard strategies need a 'module:Class' target, got {spec['target']}")
+    return getattr(importlib.import_module(module_path), attr)(**spec.get("params", {}))
+
+
+def _shard_worker(specs, inbox, params_file=None):
+    """Worker process: build its strategies, then replay what the parent feed sends"""
+    runtime = Runtime([build_strategy(spec) for spec in specs])
+    if params_file:
+        watch(runtime.strategies, params_file)
+
+    while True:
+        message = inbox.get()
+        if message is None:
+            break
+        try:
+            if message[0] == 'ticks':
+                _, symbol, arrays = message
+                runtime.feed_ticks(symbol, TickBatch(*arrays))
+            elif message[0] == 'time':
+                runtime.advance_time(message[1])
+        except Exception as e:
+            print(f"❌ Shard worker error: {e}")
+            traceback.print_exc()
+
+
+class ProcessShards:
+    """
+    Strategy instances sharded by symbol behind one feed connection
+
+    Strategies are given as specs ({"target": "module:Class", "params":
+    {...}}, like the main.py registry) so worker processes can build their
+    own instances. With workers=0 every shard runs in this process; with
+    workers=N each symbol shard is pinned to one worker (round-robin, or
+    via pin={"ETHUSD": 1}) and only that worker receives its ticks.
+    """
+
+    def __init__(self, specs: List[Dict], workers: int = 0, pin: Dict[str, int] = None,
+                 batch_interval: float = 0.0, params_file: str = None):
+        """
+        Args:
+            specs: Strategy specs; params["symbol"] picks the shard (default BTCUSD)
+            workers: Worker processes (0 = run in-process)
+            pin: Symbol -> worker index overrides
+            batch_interval: Seconds of trades buffered per dispatch
+            params_file: Hot parameter file (utils.param_config), watched by every worker
+        """
+        self.specs = list(specs)
+        self.workers = workers
+        self.batch_interval = batch_interval
+        self.params_file = params_file
+
+        self.shards = {}
+        for spec in self.specs:
+            symbol = spec.get("params", {}).get("symbol", Strategy.symbol)
+            self.shards.setdefault(symbol, []).append(spec)
+        self.symbols = sorted(self.shards)
+
+        # Symbol -> worker index (pins first, the rest round-robin)
+        pin = pin or {}
+        self.assignment = {}
+        for k, symbol in enumerate(self.symbols):
+            worker = pin.get(symbol, k % workers) if workers else None
+            if workers and not 0 <= worker < workers:
+                raise ValueError(f"Shard {symbol} pinned to worker {worker}, only {workers} workers")
+            self.assignment[symbol] = worker
+
+        self.runtime = None
+        self.watcher = None
+        self.queues = {}
+        self.processes = []
+
+
+    def start(self):
+        """Build the strategies (in-process) or start the worker processes"""
+        if not self.workers:
+            strategies = [build_strategy(spec) for spec in self.specs]
+            self.runtime = Runtime(strategies)
+            if self.params_file:
+                self.watcher = watch(strategies, self.params_file)
+            return
+
+        # Spawn: workers must not inherit the parent's threads and sockets
+        ctx = multiprocessing.get_context("spawn")
+        for worker in sorted(set(self.assignment.values())):
+            specs = [spec for symbol in self.symbols if self.assignment[symbol] == worker
+                     for spec in self.shards[symbol]]
+            self.queues[worker] = ctx.Queue()
+            process = ctx.Process(target=_shard_worker, args=(specs, self.queues[worker], self.params_file),
+                                  name=f"shard-{worker}", daemon=True)
+            process.start()
+            self.processes.append(process)
+
+        for symbol in self.symbols:
+            print(f"🧩 Shard {symbol}: {len(self.shards[symbol])} strategies -> worker {self.assignment[symbol]}")
+
+
+    def feed_ticks(self, symbol: str, ticks: TickBatch):
+        if self.runtime is not None:
+            self.runtime.feed_ticks(symbol, ticks)
+        elif symbol in self.assignment:
+            self.queues[self.assignment[symbol]].put(
+                ('ticks', symbol, (ticks.time, ticks.price, ticks.size, ticks.is_buy)))
+
+
+    def advance_time(self, now: float):
+        if self.runtime is not None:
+            self.runtime.advance_time(now)
+        else:
+            for queue in self.queues.values():
+                queue.put(('time', now))
+
+
+    def stop(self):
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+        for queue in self.queues.values():
+            queue.put(None)
+        for process in self.processes:
+            process.join(timeout=10)
+        self.queues, self.processes = {}, []
+
+
+    def main(self):
+        """Run all shards on one websocket (entry point for the main.py registry)"""
+        self.start()
+        try:
+            LiveFeed(self, self.symbols, batch_interval=self.batch_interval).run()
+        finally:
+            self.stop()
@@ -0,0 +1,145 @@
+"""
+Monte Carlo resampling of trade sequences
+
+Takes any trade list (TradeStorage / backtest trade dicts, or plain P&L
+numbers) and replays it in many random orders, all paths of a block as one
+(resamples x trades) NumPy array: cumulative sum, running peak and minimum
+along axis 1. Gives the spread the point statistics hide - P&L confidence
+interval, drawdown distribution and risk of ruin.
+
+    mc = monte_carlo(storage.load_trades(), resamples=100_000)
+    mc['max_drawdown']['p95'], mc['risk_of_ruin']
+
+Methods:
+    bootstrap - draw trades with replacement (P&L and drawdown vary)
+    shuffle   - permute the actual trades (same total, drawdown varies)
+"""
+import sys
+import time
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+MC_METHODS = ("bootstrap", "shuffle")
+
+DEFAULT_RUIN_LOSS = 10_000   # $ loss that counts as ruin (account size of one position)
+BLOCK_ELEMENTS = 4_000_000   # Path values per block (~32 MB of float64)
+STATS_RESAMPLES = 10_000     # Resamples per strategy behind the dashboards' /api/stats
+
+
+def trade_pnls(trades: Union[Sequence[Dict], Sequence[float], np.ndarray]) -> np.ndarray:
+    """P&L per trade from trade dicts ('pnl') or numbers, in trade order"""
+    if len(trades) and isinstance(trades[0], dict):
+        return np.array([t.get('pnl', 0) for t in trades], dtype=float)
+    return np.asarray(trades, dtype=float)
+
+
+def _paths(pnl: np.ndarray, rows: int, method: str, rng: np.random.Generator) -> np.ndarray:
+    """rows resampled trade sequences as a (rows, n) P&L matrix"""
+    if method == "bootstrap":
+        return pnl[rng.integers(0, len(pnl), size=(rows, len(pnl)))]
+    return rng.permuted(np.broadcast_to(pnl, (rows, len(pnl))), axis=1)
+
+
+def _percentiles(values: np.ndarray) -> Dict:
+    p5, p25, p50, p75, p95, p99 = np.percentile(values, [5, 25, 50, 75, 95, 99])
+    return {'mean': float(values.mean()), 'p5': float(p5), 'p25': float(p25), 'p50': float(p50),
+            'p75': float(p75), 'p95': float(p95), 'p99': float(p99)}
+
+
+def monte_carlo(trades, resamples: int = 10_000, method: str = "bootstrap", confidence: float = 0.95,
+                ruin_loss: float = DEFAULT_RUIN_LOSS, seed: Optional[int] = None) -> Dict:
+    """
+    Resample a trade sequence
+
+    Args:
+        trades: Trade dicts or P&L values, in trade order
+        resamples: Number of simulated sequences
+        method: "bootstrap" or "shuffle"
+        confidence: Two-sided level of the P&L interval
+        ruin_loss: A path is ruined once its running P&L reaches -ruin_loss
+        seed: RNG seed for reproducible results
+
+    Returns:
+        dict with 'pnl' (final P&L distribution + pnl_ci), 'max_drawdown'
+        (distribution, $), 'prob_loss' and 'risk_of_ruin' (% of paths)
+    """
+    if method not in MC_METHODS:
+        raise ValueError(f"Unknown Monte Carlo method: {method}")
+    pnl = trade_pnls(trades)
+    n = len(pnl)
+    if n == 0:
+        return {'trades': 0, 'resamples': 0, 'method': method}
+
+    rng = np.random.default_rng(seed)
+    final = np.empty(resamples)
+    max_dd = np.empty(resamples)
+    low = np.empty(resamples)
+
+    rows = max(1, BLOCK_ELEMENTS // n)
+    for start in range(0, resamples, rows):
+        block = min(rows, resamples - start)
+        equity = np.cumsum(_paths(pnl, block, method, rng), axis=1)
+        peak = np.maximum.accumulate(equity, axis=1)
+        np.maximum(peak, 0, out=peak)    # Equity starts at 0 before the first trade
+
+        out = slice(start, start + block)
+        final[out] = equity[:, -1]
+        max_dd[out] = (peak - equity).max(axis=1)
+        low[out] = equity.min(axis=1)
+
+    tail = (1 - confidence) / 2 * 100
+    ci_low, ci_high = np.percentile(final, [tail, 100 - tail])
+    return {
+        'trades': n,
+        'resamples': resamples,
+        'method': method,
+        'pnl': {**_percentiles(final), 'ci_low': float(ci_low), 'ci_high': float(ci_high),
+                'confidence': confidence},
+        'max_drawdown': {**_percentiles(max_dd), 'worst': float(max_dd.max())},
+        'prob_loss': float((final < 0).mean() * 100),
+        'risk_of_ruin': float((low <= -ruin_loss).mean() * 100),
+        'ruin_loss': ruin_loss
+    }
+
+
+def format_summary(mc: Dict) -> str:
+    """One-paragraph text summary of a monte_carlo() result"""
+    if not mc.get('resamples'):
+        return "No trades to resample"
+    pnl, dd = mc['pnl'], mc['max_drawdown']
+    return (f"🎲 {mc['resamples']:,} {mc['method']} resamples of {mc['trades']} trades\n"
+            f"   P&L {mc['pnl']['confidence']*100:.0f}% CI: ${pnl['ci_low']:+,.2f} .. ${pnl['ci_high']:+,.2f} "
+            f"(median ${pnl['p50']:+,.2f}) | P(loss): {mc['prob_loss']:.1f}%\n"
+            f"   Max drawdown: median ${dd['p50']:,.2f}, 95th ${dd['p95']:,.2f}, worst ${dd['worst']:,.2f}\n"
+            f"   Risk of ruin (-${mc['ruin_loss']:,.0f}): {mc['risk_of_ruin']:.2f}%")
+
+
+def strategy_stats(storage, resamples: int = STATS_RESAMPLES) -> Dict:
+    """
+    TradeStorage.get_stats() plus a 'monte_carlo' block (the /api/stats entry of a strategy)
+
+    On SQLite both come from aggregate / P&L column queries, otherwise the
+    trades are loaded once for both.
+    """
+    trades = None if storage.indexed else storage.load_trades()
+    stats = storage.get_stats(trades)
+    stats['monte_carlo'] = monte_carlo(storage.trade_pnls(trades), resamples)
+    return stats
+
+
+# Example usage: python -m utils.monte_carlo [trades.jsonl|trades.json] [resamples] [bootstrap|shuffle]
+if __name__ == '__main__':
+    from utils.trade_log import read_trades
+
+    if len(sys.argv) > 1:
+        trades = read_trades(sys.argv[1])   # A legacy .json reads its .jsonl log when there is one
+    else:
+        trades = np.random.default_rng(7).normal(5, 120, 1000)
+    resamples = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    method = sys.argv[3] if len(sys.argv) > 3 else "bootstrap"
+
+    started = time.perf_counter()
+    mc = monte_carlo(trades, resamples, method)
+    print(format_summary(mc))
+    print(f"⏱️  {time.perf_counter() - started:.2f}s")
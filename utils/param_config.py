@@ -0,0 +1,123 @@
+"""
+Hot strategy parameters from a watched JSON file
+
+    {
+      "trendline_5min": {"volume_ma_mult": 1.5},
+      "trendline_trailing_5min": {"trail_distance_atr_mult": 0.8}
+    }
+
+Sections are keyed by strategy name (strategy.name) and hold overrides on
+top of the parameters the strategy was built with; removing a key (or the
+whole section) restores the built-in value. A ParamWatcher polls the
+file's mtime and stages changed sections on the registered strategies,
+which apply them atomically at their next bar boundary, recomputing only
+the indicators whose parameters changed from the bars they already hold
+(see CandleStrategy.stage_params()). Nothing is restarted or refetched.
+"""
+import json
+import os
+import threading
+from typing import Dict, List
+
+
+class ParamWatcher:
+    """mtime polling of one parameter file, staging changes on registered strategies"""
+
+    def __init__(self, path: str, interval: float = 2.0):
+        """
+        Args:
+            path: JSON file ({strategy name: {param: value}}); may not exist yet
+            interval: Seconds between mtime checks in the background thread
+        """
+        self.path = path
+        self.interval = interval
+        self.strategies = {}    # name -> strategy with stage_params()
+        self.sections = {}      # name -> overrides from the last good read
+        self._stamp = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+
+    def register(self, strategy):
+        """Watch parameters for a strategy (its current section is staged right away)"""
+        with self._lock:
+            self.strategies[strategy.name] = strategy
+            if strategy.name in self.sections:
+                self._stage(strategy.name)
+
+
+    def _stage(self, name):
+        try:
+            self.strategies[name].stage_params(self.sections.get(name, {}))
+        except ValueError as e:
+            print(f"⚠️  {os.path.basename(self.path)} [{name}]: {e}")
+
+
+    def _read(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r') as f:
+            config = json.load(f)
+        if not isinstance(config, dict) or not all(isinstance(v, dict) for v in config.values()):
+            raise ValueError("expected {strategy name: {param: value}}")
+        return config
+
+
+    def poll(self) -> List[str]:
+        """Re-read the file if it changed, returns the strategy names whose section changed"""
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self._stamp:
+            return []
+        self._stamp = stamp
+
+        try:
+            config = self._read()
+        except (OSError, ValueError) as e:
+            # Half-written or broken file: keep the last good parameters
+            print(f"⚠️  Could not read {self.path}: {e}")
+            return []
+
+        with self._lock:
+            changed = [name for name in set(config) | set(self.sections)
+                       if config.get(name) != self.sections.get(name)]
+            self.sections = config
+            for name in changed:
+                if name in self.strategies:
+                    self._stage(name)
+        return sorted(changed)
+
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval)
+
+
+    def start(self):
+        """Poll in a daemon thread"""
+        if self._thread is None:
+            self.poll()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="param-watcher")
+            self._thread.start()
+        return self
+
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+
+def watch(strategies, path: str, interval: float = 2.0) -> ParamWatcher:
+    """Start a ParamWatcher for every strategy that supports hot parameters"""
+    watcher = ParamWatcher(path, interval)
+    for strategy in strategies:
+        if hasattr(strategy, 'stage_params'):
+            watcher.register(strategy)
+    return watcher.start()
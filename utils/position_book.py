@@ -0,0 +1,190 @@
+"""
+Central position and exposure book for all live strategies
+
+Strategies report opens, stop moves and closes; price updates come in
+through mark(). Per-symbol and overall aggregates (net/gross notional,
+unrealized PnL) are kept as running sums that every report or mark
+adjusts by its own delta, so reading them is O(1) no matter how many
+strategies are open. One book per process (get_book()); strategies in
+ProcessShards worker processes report to their worker's book.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+DIRECTIONS = {"LONG": 1, "SHORT": -1}
+
+
+class PositionBook:
+    """Thread-safe open positions by strategy name, with running aggregates"""
+
+    def __init__(self):
+        self.positions = {}     # strategy -> position dict
+        self.symbols = {}       # symbol -> running aggregates
+        self.realized_pnl = 0.0
+        self.closed_count = 0
+        self._lock = threading.Lock()
+        self._reset_totals()
+
+
+    def _reset_totals(self):
+        self._net_notional = 0.0
+        self._gross_notional = 0.0
+        self._unrealized = 0.0
+
+
+    def _symbol(self, symbol, price):
+        if symbol not in self.symbols:
+            self.symbols[symbol] = {'net_qty': 0.0, 'gross_qty': 0.0, 'cost': 0.0,
+                                    'last_price': price, 'open': 0}
+        return self.symbols[symbol]
+
+
+    def _apply(self, position, sign):
+        """Add (sign=1) or remove (sign=-1) a position's contribution to the aggregates"""
+        agg = self.symbols[position['symbol']]
+        qty = position['quantity'] * DIRECTIONS[position['direction']] * sign
+        gross = position['quantity'] * sign
+        last = agg['last_price']
+
+        agg['net_qty'] += qty
+        agg['gross_qty'] += gross
+        agg['cost'] += qty * position['entry_price']
+        agg['open'] += sign
+        self._net_notional += qty * last
+        self._gross_notional += gross * last
+        self._unrealized += qty * (last - position['entry_price'])
+
+        # Drop rounding drift once nothing is open
+        if agg['open'] == 0:
+            agg['net_qty'] = agg['gross_qty'] = agg['cost'] = 0.0
+        if not self.positions:
+            self._reset_totals()
+
+
+    def open(self, strategy: str, symbol: str, direction: str, entry_price: float,
+             quantity: float = 1.0, stop_loss: Optional[float] = None,
+             target: Optional[float] = None):
+        """Record a new position (replaces any position the strategy still had)"""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+
+        with self._lock:
+            old = self.positions.pop(strategy, None)
+            if old:
+                self._apply(old, -1)
+
+            self._symbol(symbol, entry_price)
+            position = {
+                'strategy': strategy,
+                'symbol': symbol,
+                'direction': direction,
+                'quantity': float(quantity),
+                'entry_price': float(entry_price),
+                'stop_loss': stop_loss,
+                'target': target,
+                'opened_at': time.time()
+            }
+            self.positions[strategy] = position
+            self._apply(position, 1)
+
+
+    def move_stop(self, strategy: str, stop_loss: float):
+        with self._lock:
+            position = self.positions.get(strategy)
+            if position:
+                position['stop_loss'] = stop_loss
+
+
+    def close(self, strategy: str, exit_price: float) -> Optional[float]:
+        """Remove a position, returns its realized PnL (None if it was not open)"""
+        with self._lock:
+            position = self.positions.pop(strategy, None)
+            if position is None:
+                return None
+
+            self._apply(position, -1)
+            pnl = DIRECTIONS[position['direction']] * position['quantity'] * (exit_price - position['entry_price'])
+            self.realized_pnl += pnl
+            self.closed_count += 1
+            return pnl
+
+
+    def mark(self, symbol: str, price: float):
+        """Latest traded price of a symbol"""
+        with self._lock:
+            agg = self.symbols.get(symbol)
+            if agg is None:
+                self._symbol(symbol, price)
+                return
+
+            move = price - agg['last_price']
+            agg['last_price'] = price
+            if agg['open']:
+                self._net_notional += agg['net_qty'] * move
+                self._gross_notional += agg['gross_qty'] * move
+                self._unrealized += agg['net_qty'] * move
+
+
+    def position(self, strategy: str) -> Optional[Dict]:
+        """Copy of a strategy's open position with its unrealized PnL, or None"""
+        with self._lock:
+            position = self.positions.get(strategy)
+            if position is None:
+                return None
+            last = self.symbols[position['symbol']]['last_price']
+            sign = DIRECTIONS[position['direction']]
+            return {**position, 'last_price': last,
+                    'unrealized_pnl': sign * position['quantity'] * (last - position['entry_price'])}
+
+
+    def exposure(self, symbol: str) -> Dict:
+        """Net quantity/notional and unrealized PnL of one symbol"""
+        with self._lock:
+            agg = self.symbols.get(symbol)
+            if agg is None:
+                return {'symbol': symbol, 'open_positions': 0, 'net_qty': 0.0, 'net_notional': 0.0,
+                        'gross_notional': 0.0, 'unrealized_pnl': 0.0, 'last_price': None}
+            last = agg['last_price']
+            return {
+                'symbol': symbol,
+                'open_positions': agg['open'],
+                'net_qty': agg['net_qty'],
+                'net_notional': agg['net_qty'] * last,
+                'gross_notional': agg['gross_qty'] * last,
+                'unrealized_pnl': agg['net_qty'] * last - agg['cost'],
+                'last_price': last
+            }
+
+
+    def totals(self) -> Dict:
+        """Book-wide aggregates"""
+        with self._lock:
+            return {
+                'open_positions': len(self.positions),
+                'net_notional': self._net_notional,
+                'gross_notional': self._gross_notional,
+                'unrealized_pnl': self._unrealized,
+                'realized_pnl': self.realized_pnl,
+                'closed_positions': self.closed_count
+            }
+
+
+    def snapshot(self) -> Dict:
+        """Everything, for the dashboard"""
+        with self._lock:
+            strategies = list(self.positions)
+            symbols = list(self.symbols)
+        return {
+            'positions': {name: self.position(name) for name in strategies},
+            'symbols': {symbol: self.exposure(symbol) for symbol in symbols},
+            'totals': self.totals()
+        }
+
+
+_book = PositionBook()
+
+
+def get_book() -> PositionBook:
+    """The process-wide PositionBook"""
+    return _book
@@ -0,0 +1,314 @@
+"""
+Event-driven strategy interface and runtime
+
+A Strategy only implements callbacks:
+    on_tick(ticks)          - a TickBatch (arrays) of trades since the last dispatch
+    on_bar(timeframe, bar)  - a closed candle dict for each subscribed timeframe
+    on_fill(fill)           - an order submitted with submit_order() was filled
+    on_timer(now)           - every `timer_interval` seconds of feed time
+
+The Runtime owns candle building (one shared BarBuilder per symbol and
+timeframe, vectorized over each batch) and dispatches to every registered
+strategy. The same strategy runs live (utils.market_feed.LiveFeed pushes
+websocket trades), in replay (feed_ticks / feed_bars with recorded data) or
+inside a simulation loop, because none of them reach into the feed.
+"""
+import threading
+import time
+import datetime as dt
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class TickBatch:
+    """Trades as parallel arrays: time (epoch seconds), price, size, is_buy (taker bought)"""
+
+    __slots__ = ('time', 'price', 'size', 'is_buy')
+
+    def __init__(self, time, price, size, is_buy=None):
+        self.time = np.asarray(time, dtype=float)
+        self.price = np.asarray(price, dtype=float)
+        self.size = np.asarray(size, dtype=float)
+        self.is_buy = np.zeros(len(self.time), dtype=bool) if is_buy is None else np.asarray(is_buy, dtype=bool)
+
+
+    @classmethod
+    def from_trades(cls, trades: List[Dict]) -> 'TickBatch':
+        """From exchange trade dicts (price, size, timestamp in microseconds, buyer_role)"""
+        return cls(
+            [t.get("timestamp", 0) / 1000000 for t in trades],
+            [float(t.get("price", 0)) for t in trades],
+            [float(t.get("size", 0)) for t in trades],
+            [t.get("buyer_role", "") == "taker" for t in trades],
+        )
+
+
+    def __len__(self):
+        return len(self.time)
+
+
+    def __getitem__(self, index):
+        return TickBatch(self.time[index], self.price[index], self.size[index], self.is_buy[index])
+
+
+class BarBuilder:
+    """
+    OHLCV candles for one timeframe, built from tick or bar arrays
+
+    Buckets follow local wall-clock time (like the live modules, which
+    floor datetime.fromtimestamp() to the interval). A bucket closes when
+    data for a later bucket arrives; late data is merged into the open bar.
+    """
+
+    def __init__(self, timeframe: int):
+        self.timeframe = timeframe
+        self.period = timeframe * 60
+        self.bucket = None
+        self.bar = None
+
+
+    def buckets(self, times: np.ndarray):
+        """Bucket number of each time, and the local UTC offset used"""
+        offset = time.localtime(int(times[0])).tm_gmtoff if len(times) else 0
+        return np.floor_divide(times + offset, self.period).astype(np.int64), offset
+
+
+    def update(self, times, opens, highs, lows, closes, volumes) -> List[Dict]:
+        """Add data (ticks: open=high=low=close=price), return the bars it closed"""
+        if len(times) == 0:
+            return []
+
+        buckets, offset = self.buckets(times)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(buckets)] - 1
+        seg_high = np.maximum.reduceat(highs, starts)
+        seg_low = np.minimum.reduceat(lows, starts)
+        seg_volume = np.add.reduceat(volumes, starts)
+
+        closed = []
+        for k, start in enumerate(starts):
+            bucket = buckets[start]
+            if self.bar is not None and bucket > self.bucket:
+                closed.append(self.bar)
+                self.bar = None
+
+            if self.bar is None:
+                self.bucket = bucket
+                self.bar = {
+                    'timestamp': dt.datetime.fromtimestamp(bucket * self.period - offset),
+                    'open': float(opens[start]),
+                    'high': float(seg_high[k]),
+                    'low': float(seg_low[k]),
+                    'close': float(closes[ends[k]]),
+                    'volume': float(seg_volume[k])
+                }
+            else:
+                bar = self.bar
+                bar['high'] = max(bar['high'], float(seg_high[k]))
+                bar['low'] = min(bar['low'], float(seg_low[k]))
+                bar['close'] = float(closes[ends[k]])
+                bar['volume'] += float(seg_volume[k])
+
+        return closed
+
+
+    def flush(self) -> List[Dict]:
+        """Close the open bar (end of a replay)"""
+        bar, self.bar, self.bucket = self.bar, None, None
+        return [bar] if bar is not None else []
+
+
+class Strategy:
+    """Base class - override only the callbacks you need"""
+
+    symbol = "BTCUSD"
+    timeframes = ()         # Bar timeframes in minutes
+    timer_interval = None   # Seconds between on_timer() calls (None = off)
+    name = None
+
+    runtime = None          # Set by Runtime.add()
+
+    def on_start(self):
+        """Called when added to a runtime"""
+
+    def on_tick(self, ticks: TickBatch):
+        """Trades since the last dispatch"""
+
+    def on_bar(self, timeframe: int, bar: Dict):
+        """Closed candle for a subscribed timeframe"""
+
+    def on_fill(self, fill: Dict):
+        """Fill for an order from submit_order()"""
+
+    def on_timer(self, now: float):
+        """Periodic callback (feed time, epoch seconds)"""
+
+    def submit_order(self, side: str, quantity: float, price: Optional[float] = None, tag: str = None) -> Dict:
+        """Paper order, filled by the runtime at `price` (default: last trade)"""
+        return self.runtime.submit_order(self, side, quantity, price, tag)
+
+
+def _overrides(strategy, method) -> bool:
+    return getattr(type(strategy), method) is not getattr(Strategy, method)
+
+
+class SymbolShard:
+    """Everything the runtime keeps for one symbol: bar builders, subscribers, last price"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.strategies = []
+        self.builders = {}          # timeframe -> BarBuilder, ascending
+        self.bar_subscribers = {}   # timeframe -> [strategies]
+        self.tick_subscribers = []
+        self.last_price = None
+
+    def add(self, strategy: Strategy):
+        self.strategies.append(strategy)
+        for timeframe in strategy.timeframes:
+            if timeframe not in self.builders:
+                self.builders[timeframe] = BarBuilder(timeframe)
+                self.builders = dict(sorted(self.builders.items()))
+            self.bar_subscribers.setdefault(timeframe, []).append(strategy)
+        if _overrides(strategy, 'on_tick'):
+            self.tick_subscribers.append(strategy)
+
+
+class Runtime:
+    """
+    Dispatches ticks, bars, fills and timers to many strategies
+
+    State is sharded by symbol: each symbol has its own bar builders (one
+    per timeframe no matter how many strategies subscribe) and subscriber
+    lists, so routing a batch is one dict lookup and each feed call is one
+    dispatch for the whole batch. Thread-safe: a live feed and a timer
+    thread may both call in.
+    """
+
+    def __init__(self, strategies=()):
+        self.strategies = []
+        self.shards = {}        # symbol -> SymbolShard
+        self.clock = 0.0        # Latest feed time seen (epoch seconds)
+        self.fills = []
+        self._next_timer = {}
+        self._lock = threading.RLock()
+        for strategy in strategies:
+            self.add(strategy)
+
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted(self.shards)
+
+
+    def add(self, strategy: Strategy):
+        with self._lock:
+            strategy.runtime = self
+            self.strategies.append(strategy)
+            if strategy.symbol not in self.shards:
+                self.shards[strategy.symbol] = SymbolShard(strategy.symbol)
+            self.shards[strategy.symbol].add(strategy)
+            strategy.on_start()
+        return strategy
+
+
+    def feed_ticks(self, symbol: str, ticks: TickBatch):
+        """
+        Dispatch a batch of trades for one symbol
+
+        The batch is split where any subscribed bar closes, so each
+        strategy sees the bar close before the ticks of the next bar.
+        """
+        shard = self.shards.get(symbol)
+        if shard is None or len(ticks) == 0:
+            return
+
+        with self._lock:
+            # Split points: first tick of every new bucket of any timeframe
+            cuts = set()
+            for builder in shard.builders.values():
+                buckets, _ = builder.buckets(ticks.time)
+                cuts.update(np.flatnonzero(buckets[1:] != buckets[:-1]) + 1)
+            bounds = [0] + sorted(cuts) + [len(ticks)]
+
+            for a, b in zip(bounds[:-1], bounds[1:]):
+                segment = ticks[a:b]
+                p = segment.price
+                for timeframe, builder in shard.builders.items():
+                    for bar in builder.update(segment.time, p, p, p, p, segment.size):
+                        self._dispatch_bar(shard, timeframe, bar)
+                shard.last_price = float(p[-1])
+                for strategy in shard.tick_subscribers:
+                    strategy.on_tick(segment)
+                self.advance_time(float(segment.time.max()))
+
+
+    def feed_bars(self, symbol: str, times, opens, highs, lows, closes, volumes, flush: bool = True):
+        """
+        Replay recorded candles (e.g. downloader CSV columns)
+
+        Every subscribed timeframe is aggregated from the given bars, so
+        they should be at the smallest subscribed timeframe or finer.
+        """
+        shard = self.shards.get(symbol)
+        if shard is None:
+            return
+
+        with self._lock:
+            arrays = [np.asarray(x, dtype=float) for x in (times, opens, highs, lows, closes, volumes)]
+            times = arrays[0]
+            for i in range(len(times)):
+                for timeframe, builder in shard.builders.items():
+                    for bar in builder.update(*(x[i:i + 1] for x in arrays)):
+                        self._dispatch_bar(shard, timeframe, bar)
+                shard.last_price = float(arrays[4][i])
+                self.advance_time(float(times[i]))
+
+            if flush:
+                for timeframe, builder in shard.builders.items():
+                    for bar in builder.flush():
+                        self._dispatch_bar(shard, timeframe, bar)
+
+
+    @staticmethod
+    def _dispatch_bar(shard, timeframe, bar):
+        for strategy in shard.bar_subscribers[timeframe]:
+            strategy.on_bar(timeframe, bar)
+
+
+    def advance_time(self, now: float):
+        """Move the feed clock forward and fire due timers"""
+        with self._lock:
+            self.clock = max(self.clock, now)
+            for strategy in self.strategies:
+                interval = strategy.timer_interval
+                if not interval:
+                    continue
+                due = self._next_timer.get(id(strategy))
+                if due is None:
+                    self._next_timer[id(strategy)] = self.clock + interval
+                elif self.clock >= due:
+                    self._next_timer[id(strategy)] = self.clock + interval
+                    strategy.on_timer(self.clock)
+
+
+    def submit_order(self, strategy: Strategy, side: str, quantity: float,
+                     price: Optional[float] = None, tag: str = None) -> Dict:
+        """Immediate paper fill (no slippage model) and on_fill() dispatch"""
+        with self._lock:
+            fill_price = price if price is not None else self.shards[strategy.symbol].last_price
+            if fill_price is None:
+                raise ValueError(f"No price yet for {strategy.symbol}")
+            fill = {
+                'strategy': strategy.name or type(strategy).__name__,
+                'symbol': strategy.symbol,
+                'side': side,
+                'quantity': quantity,
+                'price': float(fill_price),
+                'time': self.clock,
+                'tag': tag
+            }
+            self.fills.append(fill)
+            strategy.on_fill(fill)
+            return fill
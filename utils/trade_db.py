@@ -0,0 +1,172 @@
+"""
+SQLite trade database (WAL mode) shared by all strategies
+
+One `trades` table holds every strategy's trades in insertion order (an
+AUTOINCREMENT row id), unique by (strategy, trade_id) and indexed by
+(strategy, exit_time), so the dashboard runs indexed range and aggregate
+queries instead of loading whole trade files. The full trade dict is kept
+as JSON next to the indexed columns. Records without a trade_id (e.g. the
+RSI options trader's OPEN/CLOSED records) are stored as rows of their own,
+as the JSON-lines log keeps them.
+
+WAL journaling lets the dashboard read while strategy threads write
+without blocking each other; every thread gets its own connection. Needs
+only the sqlite3 module of the standard library (works on Render as-is).
+
+    db = get_trade_db()
+    db.save('trendline_trades_5min', trade)
+    db.stats('trendline_trades_5min'), db.trades('trendline_trades_5min', since='2024-12-16')
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+DEFAULT_DB_PATH = os.environ.get(
+    'TRADE_DB_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'trades.db'))
+BUSY_TIMEOUT_SECONDS = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    strategy   TEXT    NOT NULL,
+    trade_id   INTEGER,
+    exit_time  TEXT,
+    pnl        REAL    NOT NULL DEFAULT 0,
+    is_win     INTEGER NOT NULL DEFAULT 0,
+    data       TEXT    NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS trades_strategy_trade_id ON trades (strategy, trade_id);
+CREATE INDEX IF NOT EXISTS trades_strategy_exit_time ON trades (strategy, exit_time);
+"""
+
+# Upsert by trade_id, keeping the row (and its place in the order); NULL trade_ids never conflict
+INSERT_TRADE = ("INSERT INTO trades (strategy, trade_id, exit_time, pnl, is_win, data) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (strategy, trade_id) DO UPDATE SET "
+                "exit_time = excluded.exit_time, pnl = excluded.pnl, is_win = excluded.is_win, data = excluded.data")
+
+
+def sortable_time(value) -> Optional[str]:
+    """Trade time as 'YYYY-MM-DD HH:MM:SS' (ISO 'T' separator and fractions removed) for range queries"""
+    if value is None:
+        return None
+    return str(value).replace('T', ' ')[:19]
+
+
+def time_bounds(since=None, until=None):
+    """
+    (low, high) sortable_time() bounds of an exit-time range, None = open
+
+    Bounds may be prefixes: until='2024-12-16' includes that whole day.
+    """
+    low = sortable_time(since) if since else None
+    high = sortable_time(until) + '~' if until else None   # '~' sorts after every digit and separator
+    return low, high
+
+
+class TradeDB:
+    """Trades of all strategies in one SQLite file, one connection per thread"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(strategy: str, trade: Dict) -> tuple:
+        trade_id = trade.get('trade_id')
+        return (strategy, None if trade_id is None else int(trade_id), sortable_time(trade.get('exit_time')),
+                float(trade.get('pnl', 0) or 0), int(bool(trade.get('is_win', False))), json.dumps(trade))
+
+    def save(self, strategy: str, trade: Dict):
+        """Insert (or update, by trade_id) one trade"""
+        with self._connect() as conn:
+            conn.execute(INSERT_TRADE, self._row(strategy, trade))
+
+    def save_many(self, strategy: str, trades: List[Dict]) -> int:
+        """Insert trades in one transaction (imports); returns the count"""
+        with self._connect() as conn:
+            conn.executemany(INSERT_TRADE, [self._row(strategy, t) for t in trades])
+        return len(trades)
+
+    def count(self, strategy: str) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM trades WHERE strategy = ?", (strategy,)).fetchone()[0]
+
+    def last_trade_id(self, strategy: str) -> int:
+        """Highest trade_id of the strategy (0 if none; records without one are ignored)"""
+        row = self._connect().execute("SELECT MAX(trade_id) FROM trades WHERE strategy = ?", (strategy,)).fetchone()
+        return row[0] or 0
+
+    def trades(self, strategy: str, since: Optional[str] = None, until: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Dict]:
+        """
+        Trades in saved order, optionally exited in [since, until] (see time_bounds())
+
+        limit keeps the most recent `limit` trades.
+        """
+        low, high = time_bounds(since, until)
+        where, args = ["strategy = ?"], [strategy]
+        if low:
+            where.append("exit_time >= ?")
+            args.append(low)
+        if high:
+            where.append("exit_time <= ?")
+            args.append(high)
+        sql = f"SELECT data FROM trades WHERE {' AND '.join(where)} ORDER BY id"
+        if limit:
+            rows = self._connect().execute(sql + " DESC LIMIT ?", args + [int(limit)]).fetchall()[::-1]
+        else:
+            rows = self._connect().execute(sql, args)
+        return [json.loads(data) for data, in rows]
+
+    def pnls(self, strategy: str) -> List[float]:
+        """P&L of every trade, in saved order (for Monte Carlo)"""
+        rows = self._connect().execute("SELECT pnl FROM trades WHERE strategy = ? ORDER BY id", (strategy,))
+        return [pnl for pnl, in rows]
+
+    def stats(self, strategy: str) -> Dict:
+        """TradeStorage.get_stats() numbers from one aggregate query"""
+        total, wins, pnl = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(is_win), 0), COALESCE(SUM(pnl), 0) FROM trades WHERE strategy = ?",
+            (strategy,)).fetchone()
+        return {
+            'total_trades': total,
+            'wins': wins,
+            'losses': total - wins,
+            'win_rate': (wins / total * 100) if total else 0,
+            'total_pnl': pnl
+        }
+
+    def strategies(self) -> List[str]:
+        return [s for s, in self._connect().execute("SELECT DISTINCT strategy FROM trades ORDER BY strategy")]
+
+    def close(self):
+        """Close this thread's connection (the next use reopens it)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_trade_db(path: Optional[str] = None) -> TradeDB:
+    """Shared TradeDB for `path` (default: TRADE_DB_PATH or trades.db in the repo root)"""
+    path = path or DEFAULT_DB_PATH
+    with _databases_lock:
+        if path not in _databases:
+            _databases[path] = TradeDB(path)
+        return _databases[path]
@@ -0,0 +1,115 @@
+"""
+Append-only JSON-lines trade logs
+
+One trade per line, so saving a trade is a single append of one line,
+however long the history is, instead of re-reading and re-writing the
+whole JSON array. Readers stream the file line by line.
+
+The log lives next to the strategy's legacy JSON file (trades_5min.json ->
+trades_5min.jsonl). migrate_json() converts a legacy file once (TradeStorage
+does it on first use); the JSON file is left in place as a backup and is
+no longer written.
+
+Usage: python -m utils.trade_log migrate [directory]   (all trades*.json below it)
+       python -m utils.trade_log <trades.jsonl|trades.json>
+"""
+import json
+import os
+import sys
+import threading
+from typing import Dict, Iterator, List
+
+LOG_SUFFIX = '.jsonl'
+
+_append_lock = threading.Lock()
+
+
+def log_path(json_file: str) -> str:
+    """JSON-lines log that replaces a legacy JSON trade file"""
+    base, ext = os.path.splitext(json_file)
+    return base + LOG_SUFFIX if ext == '.json' else json_file + LOG_SUFFIX
+
+
+def append_trade(path: str, trade: Dict):
+    """Append one trade as one line (a torn last line from a crash is terminated first)"""
+    line = json.dumps(trade, separators=(',', ':')) + '\n'
+    with _append_lock, open(path, 'ab+') as f:
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                line = '\n' + line
+        f.write(line.encode('utf-8'))
+
+
+def iter_trades(path: str) -> Iterator[Dict]:
+    """Stream the trades of a log (or of a legacy JSON array file), skipping unreadable lines"""
+    if not path.endswith(LOG_SUFFIX):
+        with open(path, 'r') as f:
+            yield from json.load(f)
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️  Skipping unreadable line {number} of {path}")
+
+
+def read_trades(path: str) -> List[Dict]:
+    """All trades of `path`; a legacy .json path reads its .jsonl log when there is one"""
+    if not path.endswith(LOG_SUFFIX) and os.path.exists(log_path(path)):
+        path = log_path(path)
+    if not os.path.exists(path):
+        return []
+    return list(iter_trades(path))
+
+
+def migrate_json(json_file: str) -> int:
+    """
+    Write the trades of a legacy JSON file to its log (once)
+
+    Returns:
+        Trades migrated (0 if the log already exists or there is nothing to migrate)
+    """
+    target = log_path(json_file)
+    if os.path.exists(target) or not os.path.exists(json_file):
+        return 0
+    with open(json_file, 'r') as f:
+        trades = json.load(f)
+
+    tmp = target + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for trade in trades:
+            f.write(json.dumps(trade, separators=(',', ':')) + '\n')
+    os.replace(tmp, target)
+    return len(trades)
+
+
+def migrate_all(directory: str = '.') -> Dict[str, int]:
+    """Migrate every trades*.json below `directory`: {json file: trades migrated}"""
+    migrated = {}
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.startswith('trades') and name.endswith('.json'):
+                path = os.path.join(root, name)
+                try:
+                    migrated[path] = migrate_json(path)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Could not migrate {path}: {e}")
+    return migrated
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'migrate':
+        for path, count in migrate_all(sys.argv[2] if len(sys.argv) > 2 else '.').items():
+            print(f"{'✅' if count else '⏭️ '} {path} -> {log_path(path)}: "
+                  f"{f'{count} trades' if count else 'already migrated or empty'}")
+    elif len(sys.argv) > 1:
+        trades = read_trades(sys.argv[1])
+        pnl = sum(t.get('pnl', 0) for t in trades)
+        print(f"🧾 {len(trades)} trades | P&L: ${pnl:+,.2f}")
+    else:
+        print(__doc__)
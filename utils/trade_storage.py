@@ -1,12 +1,34 @@
 """
 Unified storage handler for trade data
-Supports both local JSON files and MongoDB (free MongoDB Atlas)
+Supports local JSON-lines logs or a local SQLite database, plus MongoDB
+(free MongoDB Atlas)
+
+Locally every trade is one appended line of an append-only log next to the
+strategy's JSON file (see utils/trade_log.py), so saving a trade costs the
+same however long the history is. A legacy JSON file is migrated to the
+log the first time a TradeStorage reads or writes it.
+
+With TRADE_STORAGE_BACKEND=sqlite (or backend="sqlite") trades go to one
+SQLite database in WAL mode instead (see utils/trade_db.py), keyed by the
+collection name; an existing log is imported into it once. Stats and
+time-range queries then run as indexed SQL instead of loading every trade.
+
+MongoDB is connected lazily, once per process, in a background thread
+(see MongoConnection). Creating a TradeStorage never touches the network,
+and trades saved before the connection is ready are buffered and synced
+as soon as it is. Nor does it touch the disk: the migration and the SQLite
+import run on first use, so importing a live strategy module (e.g. for its
+constants, as the backtests do) has no side effects.
 """
-import json
 import os
+import threading
+import time
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from utils.trade_db import get_trade_db, sortable_time, time_bounds
+from utils.trade_log import append_trade, iter_trades, log_path, migrate_json
+
 # MongoDB support (optional)
 try:
     from pymongo import MongoClient
@@ -16,59 +38,294 @@ except ImportError:
     HAS_MONGODB = False
 
 
+MONGO_DB_NAME = 'trading_strategies_production'
+MONGO_TIMEOUT_MS = 5000
+MONGO_READ_WAIT_SECONDS = 10   # Max wait for a pending connection before reading
+MONGO_RETRY_SECONDS = 60       # Retry a failed connection after this long
+
+STORAGE_BACKENDS = ('jsonl', 'sqlite')   # Local storage next to MongoDB
+DEFAULT_BACKEND = os.environ.get('TRADE_STORAGE_BACKEND', 'jsonl').strip().lower()
+
+
+class MongoConnection:
+    """
+    Shared MongoDB connection state for every TradeStorage in the process
+
+    state is one of:
+        idle       - not used yet
+        disabled   - no MONGODB_URI or pymongo not installed
+        connecting - background thread is creating the client and pinging
+        connected  - ready, db is set
+        failed     - last attempt failed (retried on use after MONGO_RETRY_SECONDS)
+    
+    Trades written while connecting/failed are queued and flushed by the
+    connection thread once a connection succeeds.
+    """
+    
+    def __init__(self, uri: Optional[str]):
+        self.uri = uri
+        self.state = 'idle'
+        self.error = None
+        self.client = None
+        self.db = None
+        self.failed_at = 0.0
+        self.pending = []  # (collection_name, trade) saved while connecting
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+    
+    
+    def start(self):
+        """Start connecting in the background (no-op if already started)"""
+        with self._lock:
+            if self.state == 'failed' and time.time() - self.failed_at >= MONGO_RETRY_SECONDS:
+                self.state = 'idle'
+            if self.state != 'idle':
+                return
+            
+            if not self.uri or not HAS_MONGODB:
+                self.state = 'disabled'
+                self._ready.set()
+                return
+            
+            self.state = 'connecting'
+            self._ready.clear()
+        
+        threading.Thread(target=self._connect, daemon=True, name="MongoDB connect").start()
+    
+    
+    def _connect(self):
+        try:
+            client = MongoClient(
+                self.uri,
+                serverSelectionTimeoutMS=MONGO_TIMEOUT_MS,
+                connectTimeoutMS=MONGO_TIMEOUT_MS
+            )
+            # Test connection
+            client.admin.command('ping')
+            
+            with self._lock:
+                self.client = client
+                self.db = client[MONGO_DB_NAME]
+                self.state = 'connected'
+                self.error = None
+            print(f"✅ MongoDB connected: {MONGO_DB_NAME}")
+            self._flush_pending()
+        
+        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+            print(f"⚠️  MongoDB connection failed: {e}")
+            self._failed(e)
+        except Exception as e:
+            print(f"⚠️  MongoDB error: {e}")
+            self._failed(e)
+        
+        finally:
+            self._ready.set()
+    
+    
+    def _failed(self, error):
+        """Mark the attempt failed - buffered trades stay queued for the next attempt"""
+        with self._lock:
+            self.state = 'failed'
+            self.error = str(error)
+            self.failed_at = time.time()
+            queued = len(self.pending)
+        print(f"📝 Falling back to JSON-only storage (retry in {MONGO_RETRY_SECONDS}s, {queued} trades queued)")
+    
+    
+    def _flush_pending(self):
+        """Sync trades that were saved while the connection was pending"""
+        with self._lock:
+            pending, self.pending = self.pending, []
+        for collection_name, trade in pending:
+            self.write(collection_name, trade)
+    
+    
+    @property
+    def connected(self) -> bool:
+        return self.state == 'connected'
+    
+    
+    def wait(self, timeout: float = MONGO_READ_WAIT_SECONDS) -> bool:
+        """Start if needed, wait up to `timeout` for a pending attempt, return connected"""
+        self.start()
+        self._ready.wait(timeout)
+        return self.connected
+    
+    
+    def collection(self, name: str):
+        """Collection handle, or None if not connected"""
+        return self.db[name] if self.connected else None
+    
+    
+    def write(self, collection_name: str, trade: Dict) -> Optional[bool]:
+        """
+        Upsert a trade by trade_id
+        
+        Returns:
+            True if written, None if queued until a connection is ready,
+            False if MongoDB is disabled or the write failed
+        """
+        self.start()
+        with self._lock:
+            if self.state in ('connecting', 'failed'):
+                self.pending.append((collection_name, trade))
+                return None
+        
+        collection = self.collection(collection_name)
+        if collection is None:
+            return False
+        
+        try:
+            collection.update_one(
+                {'trade_id': trade['trade_id']},
+                {'$set': trade},
+                upsert=True
+            )
+            print(f"☁️  Trade #{trade.get('trade_id')} synced to MongoDB")
+            return True
+        except Exception as e:
+            print(f"⚠️  Error saving to MongoDB: {e}")
+            return False
+    
+    
+    def status(self) -> Dict:
+        """Connection state for dashboards/logs"""
+        return {
+            'state': self.state,
+            'error': self.error,
+            'pending_writes': len(self.pending)
+        }
+    
+    
+    def close(self):
+        """Close the client (the next use reconnects)"""
+        with self._lock:
+            client, self.client, self.db = self.client, None, None
+            self.state = 'idle'
+        if client:
+            client.close()
+
+
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+def get_connection(uri: Optional[str] = None) -> MongoConnection:
+    """Shared MongoConnection for `uri` (default: MONGODB_URI), created on first call"""
+    if uri is None:
+        uri = os.environ.get('MONGODB_URI')
+    with _connections_lock:
+        if uri not in _connections:
+            _connections[uri] = MongoConnection(uri)
+        return _connections[uri]
+
+
+def close_connections():
+    """Close every shared MongoDB client (e.g. at shutdown)"""
+    with _connections_lock:
+        connections = list(_connections.values())
+    for connection in connections:
+        connection.close()
+
+
 class TradeStorage:
-    """Handles trade data storage - JSON files + optional MongoDB backup"""
+    """Handles trade data storage - JSON-lines log or SQLite + optional MongoDB backup"""
     
-    def __init__(self, json_file: str, collection_name: str = None):
+    def __init__(self, json_file: str, collection_name: str = None, backend: str = None):
         """
         Initialize storage handler
         
         Args:
-            json_file: Path to JSON file for local storage
-            collection_name: MongoDB collection name (e.g., 'trades_1min')
+            json_file: Path to the strategy's JSON trade file (the log is
+                the .jsonl next to it; an existing .json is migrated once)
+            collection_name: MongoDB collection name (e.g., 'trades_1min'),
+                also the strategy key in the SQLite database
+            backend: Local storage, "jsonl" or "sqlite" (default:
+                TRADE_STORAGE_BACKEND, else "jsonl")
         """
         self.json_file = json_file
+        self.log_file = log_path(json_file)
         self.collection_name = collection_name or os.path.basename(json_file).replace('.json', '')
+        self.backend = (backend or DEFAULT_BACKEND).lower()
+        if self.backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend: {self.backend} (use one of {', '.join(STORAGE_BACKENDS)})")
         
-        # MongoDB setup (if enabled via environment variable)
-        self.mongo_enabled = False
-        self.mongo_client = None
-        self.mongo_collection = None
+        # Local files are migrated / opened on first use (see _prepare)
+        self._db = None
+        self._prepared = False
+        self._prepare_lock = threading.Lock()
         
-        mongo_uri = os.environ.get('MONGODB_URI')
-        if mongo_uri and HAS_MONGODB:
+        # MongoDB is shared and connected on first use (never blocks here)
+        self.connection = get_connection()
+    
+    
+    def _prepare(self):
+        """Migrate the legacy JSON file and open (and fill) the SQLite database, once"""
+        with self._prepare_lock:
+            if self._prepared:
+                return
+            self._prepared = True
+            
             try:
-                self.mongo_client = MongoClient(
-                    mongo_uri,
-                    serverSelectionTimeoutMS=5000,
-                    connectTimeoutMS=5000
-                )
-                # Test connection
-                self.mongo_client.admin.command('ping')
-                
-                # Get database and collection
-                db = self.mongo_client['trading_strategies_production']
-                self.mongo_collection = db[self.collection_name]
-                
-                self.mongo_enabled = True
-                print(f"✅ MongoDB connected: {self.collection_name}")
-                
-            except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-                print(f"⚠️  MongoDB connection failed: {e}")
-                print(f"📝 Falling back to JSON-only storage")
-                self.mongo_enabled = False
+                migrated = migrate_json(self.json_file)
+                if migrated:
+                    print(f"📦 Migrated {migrated} trades from {self.json_file} to {self.log_file}")
             except Exception as e:
-                print(f"⚠️  MongoDB error: {e}")
-                self.mongo_enabled = False
+                print(f"⚠️  Error migrating {self.json_file}: {e}")
+            
+            if self.backend != 'sqlite':
+                return
+            self._db = get_trade_db()
+            if os.path.exists(self.log_file):
+                try:
+                    if self._db.count(self.collection_name) == 0:
+                        imported = self._db.save_many(self.collection_name, list(iter_trades(self.log_file)))
+                        if imported:
+                            print(f"📦 Imported {imported} trades from {self.log_file} to SQLite")
+                except Exception as e:
+                    print(f"⚠️  Error importing {self.log_file} to SQLite: {e}")
+    
+    
+    @property
+    def db(self):
+        """Local SQLite database (sqlite backend, else None), prepared on first use"""
+        self._prepare()
+        return self._db
+    
+    
+    @property
+    def mongo_enabled(self) -> bool:
+        """True once the shared MongoDB connection is up"""
+        return self.connection.connected
+    
+    
+    @property
+    def mongo_collection(self):
+        return self.connection.collection(self.collection_name)
+    
+    
+    @property
+    def indexed(self) -> bool:
+        """
+        True when reads are SQL queries on the local SQLite database
+        (sqlite backend and no MongoDB, which takes priority, after waiting
+        for a pending connection like load_trades() does)
+        """
+        return self.db is not None and not self.connection.wait()
     
     
-    def load_trades(self) -> List[Dict]:
+    def load_trades(self, wait: bool = True) -> List[Dict]:
         """
         Load all trades from storage
-        Priority: MongoDB (if available) -> JSON file
+        Priority: MongoDB (if available) -> SQLite or JSON-lines log
+        
+        Args:
+            wait: Wait (up to MONGO_READ_WAIT_SECONDS) for a pending MongoDB
+                connection, so trade IDs continue from the cloud history
         """
         # Try MongoDB first
-        if self.mongo_enabled and self.mongo_collection is not None:
+        connected = self.connection.wait() if wait else self.connection.connected
+        if connected:
             try:
                 trades = list(self.mongo_collection.find({}, {'_id': 0}).sort('trade_id', 1))
                 if trades:
@@ -77,15 +334,23 @@ class TradeStorage:
             except Exception as e:
                 print(f"⚠️  Error reading from MongoDB: {e}")
         
-        # Fallback to JSON
-        if os.path.exists(self.json_file):
+        # Fallback to local storage
+        if self.db is not None:
             try:
-                with open(self.json_file, 'r') as f:
-                    trades = json.load(f)
-                    print(f"📥 Loaded {len(trades)} trades from JSON")
-                    return trades
+                trades = self.db.trades(self.collection_name)
+                print(f"📥 Loaded {len(trades)} trades from SQLite")
+                return trades
+            except Exception as e:
+                print(f"⚠️  Error reading SQLite: {e}")
+                return []
+        
+        if os.path.exists(self.log_file):
+            try:
+                trades = list(iter_trades(self.log_file))
+                print(f"📥 Loaded {len(trades)} trades from JSONL")
+                return trades
             except Exception as e:
-                print(f"⚠️  Error reading JSON: {e}")
+                print(f"⚠️  Error reading JSONL: {e}")
                 return []
         
         return []
@@ -94,61 +359,55 @@ class TradeStorage:
     def save_trade(self, trade_data: Dict) -> bool:
         """
         Save a single trade to storage
-        Saves to BOTH JSON and MongoDB (if enabled)
+        Saves to BOTH local storage (one appended line, or one SQLite
+        insert) and MongoDB (if enabled). Never waits for MongoDB: while
+        the connection is pending the trade is buffered and synced once
+        it is ready.
         
         Returns:
             True if saved successfully to at least one storage
         """
         success = False
         
-        # Save to JSON file
+        # Save locally
         try:
-            trades = self.load_trades()
-            trades.append(trade_data)
-            
-            with open(self.json_file, 'w') as f:
-                json.dump(trades, f, indent=2)
-            
-            print(f"💾 Trade #{trade_data.get('trade_id')} saved to JSON")
+            if self.db is not None:
+                self.db.save(self.collection_name, trade_data)
+            else:
+                append_trade(self.log_file, trade_data)
+            print(f"💾 Trade #{trade_data.get('trade_id')} saved to {'SQLite' if self.db is not None else 'JSONL'}")
             success = True
             
         except Exception as e:
-            print(f"❌ Error saving to JSON: {e}")
+            print(f"❌ Error saving to {self.backend}: {e}")
         
         # Save to MongoDB (if enabled)
-        if self.mongo_enabled and self.mongo_collection is not None:
-            try:
-                # Add timestamp for MongoDB
-                trade_data_copy = trade_data.copy()
-                trade_data_copy['saved_at'] = datetime.utcnow()
-                
-                # Insert or update
-                self.mongo_collection.update_one(
-                    {'trade_id': trade_data['trade_id']},
-                    {'$set': trade_data_copy},
-                    upsert=True
-                )
-                
-                print(f"☁️  Trade #{trade_data.get('trade_id')} synced to MongoDB")
-                success = True
-                
-            except Exception as e:
-                print(f"⚠️  Error saving to MongoDB: {e}")
+        trade_data_copy = trade_data.copy()
+        trade_data_copy['saved_at'] = datetime.utcnow()
+        
+        synced = self.connection.write(self.collection_name, trade_data_copy)
+        if synced is None:
+            print(f"⏳ Trade #{trade_data.get('trade_id')} queued for MongoDB")
+        success = success or bool(synced)
         
         return success
     
     
     def get_next_trade_id(self) -> int:
         """Get the next trade ID"""
+        if self.indexed:
+            return self.db.last_trade_id(self.collection_name) + 1
         trades = self.load_trades()
         if trades:
             return trades[-1]['trade_id'] + 1
         return 1
     
     
-    def get_stats(self) -> Dict:
-        """Get trading statistics"""
-        trades = self.load_trades()
+    def get_stats(self, trades: List[Dict] = None) -> Dict:
+        """Get trading statistics (of `trades` when already loaded)"""
+        if trades is None and self.indexed:
+            return self.db.stats(self.collection_name)
+        trades = self.load_trades() if trades is None else trades
         
         if not trades:
             return {
@@ -171,10 +430,34 @@ class TradeStorage:
         }
     
     
+    def trade_pnls(self, trades: List[Dict] = None) -> List[float]:
+        """P&L of every trade in trade order (of `trades` when already loaded), e.g. for monte_carlo()"""
+        if trades is None and self.indexed:
+            return self.db.pnls(self.collection_name)
+        trades = self.load_trades() if trades is None else trades
+        return [t.get('pnl', 0) for t in trades]
+    
+    
+    def query_trades(self, since: str = None, until: str = None, limit: int = None) -> List[Dict]:
+        """
+        Trades exited in [since, until] (time strings, prefixes like
+        '2024-12-16' allowed), the most recent `limit` of them; an indexed
+        query on SQLite, a filter over load_trades() otherwise
+        """
+        if self.indexed:
+            return self.db.trades(self.collection_name, since, until, limit)
+        
+        trades = self.load_trades()
+        low, high = time_bounds(since, until)
+        if low or high:
+            trades = [t for t in trades
+                      if (not low or (sortable_time(t.get('exit_time')) or '') >= low)
+                      and (not high or (sortable_time(t.get('exit_time')) or '') <= high)]
+        return trades[-limit:] if limit else trades
+    
+    
     def close(self):
-        """Close MongoDB connection"""
-        if self.mongo_client:
-            self.mongo_client.close()
+        """Nothing to release per handler - the MongoDB client is shared (see close_connections)"""
 
 
 # Example usage:
@@ -207,4 +490,4 @@ if __name__ == '__main__':
     stats = storage.get_stats()
     print(f"\nStats: {stats}")
     
-    storage.close()
+    close_connections()
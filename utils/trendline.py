@@ -0,0 +1,377 @@
+"""
+Incremental trendline tracking for the BTC trendline breakout strategies
+Keeps the recent confirmed swing highs/lows so every closed bar costs O(1)
+instead of rebuilding a DataFrame and rescanning the whole candle window.
+Lines are drawn through the last two swings (classic) or fitted over the
+last K swings with fit_trendline() (multi_pivot mode).
+"""
+import copy
+from collections import deque
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.indicators import ATR, SMA, SwingDetector
+
+TRENDLINE_MODES = ("two_pivot", "multi_pivot")
+
+
+def fit_trendline(indices: Sequence[int], prices: Sequence[float], kind: str, atr: Optional[float],
+                  touch_atr_mult: float = 0.25, slope_weight: float = 1.0) -> Optional[Tuple[int, float, float]]:
+    """
+    Pick the best resistance/support line through any two of the given pivots
+
+    Every candidate pair is scored in one broadcast: the line value of each
+    candidate at each pivot is a (pairs, pivots) matrix. Pivots from the
+    first anchor onwards that close above a resistance line (below a
+    support line) by more than the touch tolerance are violations; pivots
+    within the tolerance are touches. Among the non-violated lines with the
+    right slope sign (descending resistance, ascending support) the highest
+    score wins: touches minus slope_weight * |slope| in ATRs per bar, ties
+    going to the most recent anchors.
+
+    Args:
+        indices: Bar indices of the pivots, oldest first
+        prices: Pivot prices (swing highs for resistance, swing lows for support)
+        kind: "resistance" or "support"
+        atr: Current ATR, used for the touch tolerance and slope normalisation
+        touch_atr_mult: Touch/violation tolerance in ATRs
+        slope_weight: Penalty per ATR-per-bar of slope
+
+    Returns:
+        (anchor_idx, anchor_price, slope) or None if no valid line exists
+    """
+    x = np.asarray(indices, dtype=float)
+    y = np.asarray(prices, dtype=float)
+    if len(x) < 2:
+        return None
+
+    first, second = np.triu_indices(len(x), k=1)
+    slopes = (y[second] - y[first]) / (x[second] - x[first])
+
+    values = y[first][:, None] + slopes[:, None] * (x[None, :] - x[first][:, None])
+    diff = y[None, :] - values
+    in_scope = x[None, :] >= x[first][:, None]
+
+    tolerance = touch_atr_mult * atr if atr else 0.0
+    if kind == "resistance":
+        violated = diff > tolerance
+        slope_ok = slopes < 0
+    else:
+        violated = diff < -tolerance
+        slope_ok = slopes > 0
+
+    valid = slope_ok & ~(violated & in_scope).any(axis=1)
+    if not valid.any():
+        return None
+
+    touches = ((np.abs(diff) <= tolerance) & in_scope).sum(axis=1)
+    score = touches - slope_weight * np.abs(slopes) / (atr if atr else 1.0)
+
+    candidates = np.flatnonzero(valid)
+    order = np.lexsort((x[first][candidates], x[second][candidates], score[candidates]))
+    best = candidates[order[-1]]
+
+    anchor = first[best]
+    return int(indices[anchor]), prices[anchor], float(slopes[best])
+
+
+class TrendlineTracker:
+    """
+    Streaming replacement for the pandas check_entry_signal() pipeline
+
+    Feed every closed candle to update(); check_entry() then only needs a
+    handful of float comparisons. Bar indices are absolute (0 = first bar
+    ever seen), which gives the same line values as the DataFrame version
+    because only index differences enter the trendline maths.
+    """
+
+    def __init__(self, lookback_swing: int = 3, atr_length: int = 14, volume_ma_length: int = 20,
+                 mode: str = "two_pivot", pivots: int = 6, touch_atr_mult: float = 0.25):
+        """
+        Args:
+            lookback_swing: Bars on each side required to confirm a swing
+            atr_length: ATR rolling window
+            volume_ma_length: Volume moving average window
+            mode: "two_pivot" (line through the last two swings) or
+                "multi_pivot" (best line over the last `pivots` swings)
+            pivots: Swings kept per side for multi_pivot fitting
+            touch_atr_mult: Touch/violation tolerance for multi_pivot, in ATRs
+        """
+        if mode not in TRENDLINE_MODES:
+            raise ValueError(f"Unknown trendline mode: {mode}")
+
+        self.lookback = lookback_swing
+        self.atr_length = atr_length
+        self.volume_ma_length = volume_ma_length
+        self.mode = mode
+        self.pivots = pivots
+        self.touch_atr_mult = touch_atr_mult
+
+        self.bar_count = 0
+        self.window = None  # Bars currently retained by the caller (None = all)
+
+        # Streaming indicators (same arithmetic as the batch versions)
+        self._swings = SwingDetector(lookback_swing)
+        self._atr = ATR(atr_length)
+        self._volume_ma = SMA(volume_ma_length)
+
+        self.last_candle = None
+        self.prev_close = None
+
+        # Recent confirmed swings as (bar_index, price), oldest first
+        history = pivots if mode == "multi_pivot" else 2
+        self.swing_highs = deque(maxlen=max(2, history))
+        self.swing_lows = deque(maxlen=max(2, history))
+        self.high_slope = None
+        self.low_slope = None
+
+
+    def update(self, candle: Dict, window: Optional[int] = None):
+        """
+        Add a closed candle
+
+        Args:
+            candle: Dict with timestamp/open/high/low/close/volume
+            window: Number of candles the caller keeps in memory after adding
+                this one. Swings that would have fallen out of that window
+                are ignored, exactly like the DataFrame rebuilt from it.
+        """
+        self.prev_close = self.last_candle['close'] if self.last_candle else None
+        self.last_candle = candle
+        self.window = window
+        self.bar_count += 1
+
+        self._atr.update(candle['high'], candle['low'], candle['close'])
+        self._volume_ma.update(candle['volume'])
+
+        # A swing `lookback` bars back may have just been confirmed
+        swing_high, swing_low = self._swings.update(candle['high'], candle['low'])
+        if swing_high:
+            self.swing_highs.append(swing_high)
+            self.high_slope = self._slope(self.swing_highs)
+        if swing_low:
+            self.swing_lows.append(swing_low)
+            self.low_slope = self._slope(self.swing_lows)
+
+
+    def reconfigured(self, candles: Sequence[Dict], lookback_swing: int = None, atr_length: int = None,
+                     volume_ma_length: int = None, mode: str = None, pivots: int = None) -> "TrendlineTracker":
+        """
+        Copy of this tracker with new indicator settings
+
+        Only the indicators whose settings are given are rebuilt, by
+        replaying `candles` - the latest bars this tracker has seen, as the
+        caller still holds them; the others keep their state. This tracker
+        is left untouched, so a rejected setting changes nothing.
+        """
+        mode = self.mode if mode is None else mode
+        if mode not in TRENDLINE_MODES:
+            raise ValueError(f"Unknown trendline mode: {mode}")
+        if len(candles) > self.bar_count:
+            raise ValueError("More candles than the tracker has seen")
+
+        tracker = copy.copy(self)
+        first = self.bar_count - len(candles)
+
+        if atr_length is not None:
+            tracker.atr_length = atr_length
+            tracker._atr = ATR(atr_length)
+            for c in candles:
+                tracker._atr.update(c['high'], c['low'], c['close'])
+
+        if volume_ma_length is not None:
+            tracker.volume_ma_length = volume_ma_length
+            tracker._volume_ma = SMA(volume_ma_length)
+            for c in candles:
+                tracker._volume_ma.update(c['volume'])
+
+        if lookback_swing is not None or mode != self.mode or pivots is not None:
+            tracker.lookback = self.lookback if lookback_swing is None else lookback_swing
+            tracker.mode = mode
+            tracker.pivots = self.pivots if pivots is None else pivots
+            history = tracker.pivots if mode == "multi_pivot" else 2
+            tracker.swing_highs = deque(maxlen=max(2, history))
+            tracker.swing_lows = deque(maxlen=max(2, history))
+            tracker.high_slope = tracker.low_slope = None
+
+            # Absolute bar indices continue where the retained bars start
+            tracker._swings = SwingDetector(tracker.lookback)
+            tracker._swings.bar_count = first
+            for c in candles:
+                swing_high, swing_low = tracker._swings.update(c['high'], c['low'])
+                if swing_high:
+                    tracker.swing_highs.append(swing_high)
+                    tracker.high_slope = tracker._slope(tracker.swing_highs)
+                if swing_low:
+                    tracker.swing_lows.append(swing_low)
+                    tracker.low_slope = tracker._slope(tracker.swing_lows)
+
+        return tracker
+
+
+    @staticmethod
+    def _slope(swings):
+        if len(swings) < 2:
+            return None
+        (idx1, price1), (idx2, price2) = swings[-2], swings[-1]
+        if idx2 == idx1:
+            return 0.0
+        return (price2 - price1) / (idx2 - idx1)
+
+
+    def _bars_in_window(self) -> int:
+        if self.window is None:
+            return self.bar_count
+        return min(self.bar_count, self.window)
+
+
+    def _visible(self, swings):
+        """Swings the windowed DataFrame would still detect (need `lookback` bars on the left)"""
+        first_idx = self.bar_count - self._bars_in_window() + self.lookback
+        return [s for s in swings if s[0] >= first_idx]
+
+
+    @staticmethod
+    def line_value_at(line, target_idx):
+        """Value of an (anchor_idx, anchor_price, slope) line at target_idx"""
+        anchor_idx, anchor_price, slope = line
+        return anchor_price + slope * (target_idx - anchor_idx)
+
+
+    def _trendline(self, swings, slope, kind):
+        """Active resistance/support line for the current mode, or None"""
+        if len(swings) < 2:
+            return None
+
+        if self.mode == "multi_pivot":
+            return fit_trendline([s[0] for s in swings], [s[1] for s in swings], kind,
+                                 self.atr, self.touch_atr_mult)
+
+        # Two-pivot: descending highs for resistance, ascending lows for support
+        (idx1, price1), (idx2, price2) = swings[-2], swings[-1]
+        if (kind == "resistance" and price2 < price1) or (kind == "support" and price2 > price1):
+            return idx1, price1, slope
+        return None
+
+
+    @property
+    def atr(self) -> Optional[float]:
+        """Rolling-mean ATR of the latest bar, None until the window is full"""
+        if self._bars_in_window() < self.atr_length:
+            return None
+        return self._atr.value
+
+
+    @property
+    def volume_ma(self) -> Optional[float]:
+        """Volume moving average of the latest bar, None until the window is full"""
+        if self._bars_in_window() < self.volume_ma_length:
+            return None
+        return self._volume_ma.value
+
+
+    def breakout(self, allow_long: bool = True, allow_short: bool = True) -> Optional[Tuple[str, float]]:
+        """
+        Trendline cross on the latest bar, before any volume/ATR filter
+
+        Only depends on the swing/line state, so it can be computed once and
+        shared by every parameter variant using the same indicators.
+
+        Returns:
+            (direction, reference_swing_price) or None. The reference is the
+            last visible swing low for LONG (swing high for SHORT), falling
+            back to the bar's own low/high.
+        """
+        i = self.bar_count - 1
+        if i < 1:
+            return None
+
+        curr = self.last_candle
+        curr_close = curr['close']
+        prev_close = self.prev_close
+
+        swing_highs = self._visible(self.swing_highs)
+        swing_lows = self._visible(self.swing_lows)
+
+        # LONG setup: breakout above descending highs
+        line = self._trendline(swing_highs, self.high_slope, "resistance") if allow_long else None
+        if line is not None:
+            line_prev = self.line_value_at(line, i - 1)
+            line_curr = self.line_value_at(line, i)
+
+            if prev_close <= line_prev and curr_close > line_curr:
+                return 'LONG', (swing_lows[-1][1] if swing_lows else curr['low'])
+
+        if not allow_short:
+            return None
+
+        # SHORT setup: breakdown below ascending lows
+        line = self._trendline(swing_lows, self.low_slope, "support")
+        if line is not None:
+            line_prev = self.line_value_at(line, i - 1)
+            line_curr = self.line_value_at(line, i)
+
+            if prev_close >= line_prev and curr_close < line_curr:
+                return 'SHORT', (swing_highs[-1][1] if swing_highs else curr['high'])
+
+        return None
+
+
+    def check_entry(self, volume_ma_mult: float, atr_sl_mult: float,
+                    target_atr_mult: Optional[float] = None, allow_short: bool = True,
+                    allow_long: bool = True) -> Optional[Dict]:
+        """
+        Check for trendline breakout/breakdown on the latest bar
+
+        Args:
+            volume_ma_mult: Volume must exceed this multiple of its MA
+            atr_sl_mult: Stop distance beyond the reference swing, in ATRs
+            target_atr_mult: Target distance in ATRs (None = no fixed target)
+            allow_short: Also look for ascending-trendline breakdowns
+            allow_long: Look for descending-trendline breakouts
+
+        Returns:
+            dict with entry info (including direction) or None
+        """
+        # A LONG breakout that fails the filters does not fall through to SHORT
+        cross = self.breakout(allow_long, allow_short)
+        if cross is None:
+            return None
+
+        entry_atr = self._confirm_volume_and_atr(volume_ma_mult)
+        if entry_atr is None:
+            return None
+
+        direction, ref_price = cross
+        curr = self.last_candle
+        sign = 1 if direction == 'LONG' else -1
+        return self._signal(direction, curr, entry_atr,
+                            ref_price - sign * atr_sl_mult * entry_atr,
+                            None if target_atr_mult is None else curr['close'] + sign * target_atr_mult * entry_atr)
+
+
+    def _confirm_volume_and_atr(self, volume_ma_mult):
+        """Volume + ATR filters shared by both directions, returns entry ATR or None"""
+        vol_ma = self.volume_ma
+        if vol_ma is not None and self.last_candle['volume'] <= volume_ma_mult * vol_ma:
+            return None
+
+        entry_atr = self.atr
+        if entry_atr is None or entry_atr <= 0:
+            return None
+        return entry_atr
+
+
+    @staticmethod
+    def _signal(direction, candle, entry_atr, stop_loss, target):
+        signal = {
+            'direction': direction,
+            'entry_price': float(candle['close']),
+            'atr': float(entry_atr),
+            'stop_loss': float(stop_loss),
+            'timestamp': candle['timestamp']
+        }
+        if target is not None:
+            signal['target'] = float(target)
+        return signal
@@ -1,12 +1,16 @@
-import json
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.monte_carlo import monte_carlo
+from utils.trade_storage import TradeStorage
 
 def compare_strategies():
     """Compare 1-min vs 5-min strategy performance"""
     
     files = {
-        "1-MIN": "trades_1min.json",
-        "5-MIN": "trades_5min.json"
+        "1-MIN": ("trades_1min.json", "volume_trades_1min"),
+        "5-MIN": ("trades_5min.json", "volume_trades_5min")
     }
     
     print("\n" + "="*80)
@@ -15,14 +19,8 @@ def compare_strategies():
     
     results = {}
     
-    for timeframe, filename in files.items():
-        if not os.path.exists(filename):
-            print(f"{timeframe}: No data yet ({filename})")
-            results[timeframe] = None
-            continue
-        
-        with open(filename, 'r') as f:
-            trades = json.load(f)
+    for timeframe, (filename, collection) in files.items():
+        trades = TradeStorage(json_file=filename, collection_name=collection).load_trades()
         
         if not trades:
             print(f"{timeframe}: No trades yet")
@@ -53,6 +51,9 @@ def compare_strategies():
         
         expectancy = (win_rate/100 * avg_win) - ((100-win_rate)/100 * abs(avg_loss)) if total > 0 else 0
         
+        # Spread of outcomes over resampled trade orders
+        mc = monte_carlo(trades, 100_000)
+        
         results[timeframe] = {
             'total': total,
             'wins': win_count,
@@ -64,7 +65,10 @@ def compare_strategies():
             'avg_win': avg_win,
             'avg_loss': avg_loss,
             'avg_duration': avg_duration,
-            'expectancy': expectancy
+            'expectancy': expectancy,
+            'mc_pnl_low': mc['pnl']['ci_low'],
+            'mc_max_dd': mc['max_drawdown']['p95'],
+            'risk_of_ruin': mc['risk_of_ruin']
         }
     
     # Print comparison
@@ -81,7 +85,10 @@ def compare_strategies():
             ("Avg Win $", 'avg_win', True),
             ("Avg Loss $", 'avg_loss', False),
             ("Avg Duration (min)", 'avg_duration', False),
-            ("Expectancy $", 'expectancy', True)
+            ("Expectancy $", 'expectancy', True),
+            ("MC P&L 2.5% $", 'mc_pnl_low', True),
+            ("MC Max DD 95% $", 'mc_max_dd', False),
+            ("Risk of Ruin %", 'risk_of_ruin', False)
         ]
         
         for label, key, higher_is_better in metrics:
@@ -92,7 +99,7 @@ def compare_strategies():
             if key in ['total', 'wins', 'losses']:
                 s1 = f"{val_1min:.0f}"
                 s5 = f"{val_5min:.0f}"
-            elif key in ['win_rate', 'total_pnl_pct']:
+            elif key in ['win_rate', 'total_pnl_pct', 'risk_of_ruin']:
                 s1 = f"{val_1min:+.2f}%"
                 s5 = f"{val_5min:+.2f}%"
             elif key in ['avg_duration']:
@@ -3,7 +3,6 @@ import json
 import datetime as dt
 import time
 import os
-from collections import deque
 from colorama import init, Fore, Style
 
 # Initialize colorama
@@ -18,6 +17,7 @@ except:
 # -------------------------------------
 WEBSOCKET_URL = "wss://socket.india.delta.exchange"
 SYMBOL = "BTCUSD"
+STRATEGY_NAME = "volume_5min"  # Position book key
 
 # Strategy Parameters (MODERATE SETTINGS - 5 MINUTE)
 CANDLE_INTERVAL = 5  # 5-minute candles
@@ -39,6 +39,9 @@ import sys
 parent_dir = os.path.dirname(SCRIPT_DIR)
 sys.path.insert(0, parent_dir)
 from utils.trade_storage import TradeStorage
+from utils.indicators import DeltaVolume, VolumeSignals
+from utils.exit_policies import ExitEngine, FixedTarget, SignalExit, StopLoss, TimeExit
+from utils.position_book import get_book
 
 # Initialize storage handler (JSON + MongoDB if configured)
 storage = TradeStorage(
@@ -51,14 +54,21 @@ entry_price = 0
 entry_time = None
 trade_id = 1
 
-# Candle history (store last N minutes)
-candle_history = deque(maxlen=10)
+# Candle history (last 10 candles): signal rules as streak counters over a
+# columnar ring buffer, O(1) per candle
+signal_state = VolumeSignals(MIN_DELTA_BUY, MIN_DELTA_SELL, MIN_BUY_PERCENT, MIN_SELL_PERCENT,
+                             CONSECUTIVE_CANDLES, history=10)
+
+# Exit checks in priority order, at the current price
+exit_engine = ExitEngine(FixedTarget("TAKE_PROFIT", fill="close"),
+                         StopLoss("STOP_LOSS", fill="close"),
+                         SignalExit(signal_state.delta_reversal, "DELTA_REVERSAL"),
+                         TimeExit(max_minutes=MAX_HOLD_MINUTES))
+exit_state = None  # exit_policies.OpenPosition of current_position
 
 # Current minute tracking
 current_minute = None
-buy_volume = 0
-sell_volume = 0
-total_trades = 0
+bar_volume = DeltaVolume()  # Aggressor buy/sell volume of the candle being built
 minute_open = 0
 minute_high = 0
 minute_low = float('inf')
@@ -72,13 +82,16 @@ current_price = 0
 # -------------------------------------
 def print_current_market_state():
     """Print current candle state to console"""
-    total_volume = buy_volume + sell_volume
+    stats = bar_volume.stats()
+    total_volume = stats['total_volume']
     if total_volume == 0:
         return
     
-    delta = buy_volume - sell_volume
-    buy_pct = (buy_volume / total_volume * 100) if total_volume > 0 else 0
-    sell_pct = (sell_volume / total_volume * 100) if total_volume > 0 else 0
+    buy_volume = stats['buy_volume']
+    sell_volume = stats['sell_volume']
+    delta = stats['delta']
+    buy_pct = stats['buy_pct']
+    sell_pct = stats['sell_pct']
     
     # Determine candle color
     is_green = minute_close >= minute_open
@@ -186,7 +199,7 @@ def print_current_market_state():
     print(f"{'-'*80}")
     
     if buy_ready:
-        remaining = max(0, CONSECUTIVE_CANDLES - len([c for c in list(candle_history) if c.get('delta', 0) > MIN_DELTA_BUY and c.get('buy_pct', 0) > MIN_BUY_PERCENT and c.get('is_green', False)]))
+        remaining = signal_state.remaining("LONG")
         if CONSECUTIVE_CANDLES == 1:
             msg = "✅ BUY signal! Will trigger when current candle closes"
         else:
@@ -197,7 +210,7 @@ def print_current_market_state():
         else:
             print(msg)
     elif sell_ready:
-        remaining = max(0, CONSECUTIVE_CANDLES - len([c for c in list(candle_history) if c.get('delta', 0) < MIN_DELTA_SELL and c.get('sell_pct', 0) > MIN_SELL_PERCENT and not c.get('is_green', True)]))
+        remaining = signal_state.remaining("SHORT")
         if CONSECUTIVE_CANDLES == 1:
             msg = "✅ SELL signal! Will trigger when current candle closes"
         else:
@@ -215,35 +228,17 @@ def print_current_market_state():
 
 def finalize_candle():
     """Finalize current minute candle and add to history"""
-    global candle_history, buy_volume, sell_volume, minute_open, minute_high, minute_low, minute_close
+    global minute_open, minute_high, minute_low, minute_close
     
     if current_minute is None:
         return
     
-    total_volume = buy_volume + sell_volume
+    stats = bar_volume.stats()
+    total_volume = stats['total_volume']
     if total_volume == 0:
         return
     
-    delta = buy_volume - sell_volume
-    buy_pct = (buy_volume / total_volume * 100) if total_volume > 0 else 0
-    sell_pct = (sell_volume / total_volume * 100) if total_volume > 0 else 0
-    
-    candle = {
-        'timestamp': current_minute,
-        'open': minute_open,
-        'high': minute_high,
-        'low': minute_low,
-        'close': minute_close,
-        'buy_volume': buy_volume,
-        'sell_volume': sell_volume,
-        'total_volume': total_volume,
-        'delta': delta,
-        'buy_pct': buy_pct,
-        'sell_pct': sell_pct,
-        'is_green': minute_close >= minute_open
-    }
-    
-    candle_history.append(candle)
+    signal_state.update(minute_open, minute_close, stats['delta'], stats['buy_pct'], stats['sell_pct'])
     
     # Check for signals after adding new candle
     check_signals()
@@ -255,11 +250,9 @@ def finalize_candle():
 
 def reset_minute():
     """Reset counters for new minute"""
-    global buy_volume, sell_volume, total_trades, minute_open, minute_high, minute_low, minute_close
+    global minute_open, minute_high, minute_low, minute_close
     
-    buy_volume = 0
-    sell_volume = 0
-    total_trades = 0
+    bar_volume.reset()
     minute_open = current_price
     minute_high = current_price
     minute_low = current_price
@@ -277,69 +270,22 @@ def check_signals():
     if current_position:
         return
     
-    # Need at least CONSECUTIVE_CANDLES
-    if len(candle_history) < CONSECUTIVE_CANDLES:
-        return
-    
-    # Get last N candles
-    recent_candles = list(candle_history)[-CONSECUTIVE_CANDLES:]
-    
-    # Check BUY signal
-    buy_signal = check_buy_signal(recent_candles)
-    if buy_signal:
+    # Check BUY signal (CONSECUTIVE_CANDLES qualifying candles, rising close)
+    if signal_state.buy_signal:
         open_position("LONG")
         return
     
     # Check SELL signal
-    sell_signal = check_sell_signal(recent_candles)
-    if sell_signal:
+    if signal_state.sell_signal:
         open_position("SHORT")
 
 
-def check_buy_signal(candles):
-    """Check if BUY conditions met"""
-    for candle in candles:
-        # All conditions must be true
-        if candle['delta'] < MIN_DELTA_BUY:
-            return False
-        if candle['buy_pct'] < MIN_BUY_PERCENT:
-            return False
-        if not candle['is_green']:
-            return False
-    
-    # Check price rising (only if we have multiple candles to compare)
-    if len(candles) > 1:
-        if candles[-1]['close'] <= candles[0]['close']:
-            return False
-    
-    return True
-
-
-def check_sell_signal(candles):
-    """Check if SELL conditions met"""
-    for candle in candles:
-        # All conditions must be true
-        if candle['delta'] > MIN_DELTA_SELL:
-            return False
-        if candle['sell_pct'] < MIN_SELL_PERCENT:
-            return False
-        if candle['is_green']:
-            return False
-    
-    # Check price falling (only if we have multiple candles to compare)
-    if len(candles) > 1:
-        if candles[-1]['close'] >= candles[0]['close']:
-            return False
-    
-    return True
-
-
 # -------------------------------------
 # POSITION MANAGEMENT
 # -------------------------------------
 def open_position(direction):
     """Open a new position"""
-    global current_position, entry_price, entry_time, trade_id
+    global current_position, entry_price, entry_time, exit_state, trade_id
     
     current_position = direction
     entry_price = current_price
@@ -368,84 +314,28 @@ def open_position(direction):
     print(f"💰 Entry Price: ${entry_price:,.2f}")
     print(f"🎯 Take Profit: ${take_profit:,.2f} (+{TAKE_PROFIT_PCT}%)")
     print(f"🛑 Stop Loss: ${stop_loss:,.2f} (-{STOP_LOSS_PCT}%)")
-    print(f"📊 Last Candle Delta: {candle_history[-1]['delta']:+,.0f}")
+    print(f"📊 Last Candle Delta: {signal_state.last('delta'):+,.0f}")
     print(f"{'='*80}\n")
+    
+    exit_state = exit_engine.open(direction, entry_price, stop_loss, take_profit, entry_time=entry_time.timestamp())
+    get_book().open(STRATEGY_NAME, SYMBOL, direction, entry_price, stop_loss=stop_loss, target=take_profit)
 
 
 def manage_position():
     """Check if position should be closed"""
-    global current_position, entry_price, entry_time, trade_id
-    
     if not current_position:
         return
     
-    # Calculate P&L
-    if current_position == "LONG":
-        pnl = current_price - entry_price
-        pnl_pct = (pnl / entry_price) * 100
-        take_profit = entry_price * (1 + TAKE_PROFIT_PCT / 100)
-        stop_loss = entry_price * (1 - STOP_LOSS_PCT / 100)
-        
-        # Check exit conditions
-        if current_price >= take_profit:
-            close_position("TAKE_PROFIT", pnl, pnl_pct)
-        elif current_price <= stop_loss:
-            close_position("STOP_LOSS", pnl, pnl_pct)
-        elif check_delta_reversal("LONG"):
-            close_position("DELTA_REVERSAL", pnl, pnl_pct)
-        elif check_time_exit():
-            close_position("TIME_EXIT", pnl, pnl_pct)
-    
-    else:  # SHORT
-        pnl = entry_price - current_price
+    result = exit_engine.update(exit_state, current_price)
+    if result:
+        pnl = exit_state.direction * (current_price - entry_price)
         pnl_pct = (pnl / entry_price) * 100
-        take_profit = entry_price * (1 - TAKE_PROFIT_PCT / 100)
-        stop_loss = entry_price * (1 + STOP_LOSS_PCT / 100)
-        
-        # Check exit conditions
-        if current_price <= take_profit:
-            close_position("TAKE_PROFIT", pnl, pnl_pct)
-        elif current_price >= stop_loss:
-            close_position("STOP_LOSS", pnl, pnl_pct)
-        elif check_delta_reversal("SHORT"):
-            close_position("DELTA_REVERSAL", pnl, pnl_pct)
-        elif check_time_exit():
-            close_position("TIME_EXIT", pnl, pnl_pct)
-
-
-def check_delta_reversal(position_type):
-    """Check if volume delta has reversed"""
-    if len(candle_history) < 2:
-        return False
-    
-    recent = list(candle_history)[-2:]
-    
-    if position_type == "LONG":
-        # Exit LONG if strong selling appears
-        for candle in recent:
-            if candle['delta'] < -200:
-                return True
-    else:
-        # Exit SHORT if strong buying appears
-        for candle in recent:
-            if candle['delta'] > 200:
-                return True
-    
-    return False
-
-
-def check_time_exit():
-    """Check if max hold time exceeded"""
-    if entry_time is None:
-        return False
-    
-    time_elapsed = (dt.datetime.now() - entry_time).total_seconds() / 60
-    return time_elapsed >= MAX_HOLD_MINUTES
+        close_position(result[1], pnl, pnl_pct)
 
 
 def close_position(reason, pnl, pnl_pct):
     """Close current position and log trade"""
-    global current_position, entry_price, entry_time, trade_id
+    global current_position, entry_price, entry_time, exit_state, trade_id
     
     exit_time = dt.datetime.now()
     duration = (exit_time - entry_time).total_seconds() / 60
@@ -499,11 +389,13 @@ def close_position(reason, pnl, pnl_pct):
     
     # Save using unified storage (JSON + MongoDB if configured)
     storage.save_trade(trade_data)
+    get_book().close(STRATEGY_NAME, current_price)
     
     # Reset position
     current_position = None
     entry_price = 0
     entry_time = None
+    exit_state = None
     trade_id += 1
 
 
@@ -512,7 +404,7 @@ def close_position(reason, pnl, pnl_pct):
 # -------------------------------------
 def on_message(ws, message):
     """Handle incoming WebSocket messages"""
-    global current_minute, buy_volume, sell_volume, total_trades
+    global current_minute
     global current_price, minute_open, minute_high, minute_low, minute_close
     
     try:
@@ -535,7 +427,7 @@ def on_message(ws, message):
 
 def process_trade(trade):
     """Process individual trade"""
-    global current_minute, buy_volume, sell_volume, total_trades
+    global current_minute
     global current_price, minute_open, minute_high, minute_low, minute_close
     
     price = float(trade.get("price", 0))
@@ -561,15 +453,11 @@ def process_trade(trade):
         reset_minute()
     
     # Update volume
-    if is_buy:
-        buy_volume += size
-    else:
-        sell_volume += size
-    
-    total_trades += 1
+    bar_volume.add(size, is_buy)
     
     # Update price
     current_price = price
+    get_book().mark(SYMBOL, price)
     minute_close = price
     if minute_open == 0:
         minute_open = price
@@ -577,7 +465,7 @@ def process_trade(trade):
     minute_low = min(minute_low, price)
     
     # Update display every 20 trades (approximately every few seconds)
-    if total_trades % 20 == 0:
+    if bar_volume.trades % 20 == 0:
         print_current_market_state()
 
 